@@ -35,9 +35,15 @@ Recomendation_system = st.Page(
     
 )
 
+Team_analytics = st.Page(
+    page = "page_views/team_analytics.py",
+    title = "Team Analytics",
+    
+)
+
 #navigation
 pg = st.navigation(
-    pages = [About_Me_Page, Project_Overview, Visualisasi_Model, Machine_learning, Recomendation_system]
+    pages = [About_Me_Page, Project_Overview, Visualisasi_Model, Machine_learning, Recomendation_system, Team_analytics]
 )
 
 st.logo("assets/icon.png")
@@ -0,0 +1,251 @@
+"""
+Benchmark jalur rekomendasi pemain pada populasi sintetis.
+
+Untuk setiap ukuran populasi dibuat database SQLite sintetis (skema Player /
+Player_Attributes seperti dataset Kaggle), lalu diukur: waktu build feature
+store, cold load, latensi query tunggal (p50/p99), throughput batch,
+recall@k terhadap brute force, dan peak RSS untuk setiap mesin (brute
+force, IVF, int8). Hasil ditulis sebagai JSON agar regresi antar versi
+bisa dilacak.
+
+    python benchmarks/recommender_bench.py --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from soccer.ann import load_or_build_index, measure_recall
+from soccer.features import NUMERIC_FEATURES
+from soccer.quantize import top_k_similar_quantized
+from soccer.similarity import top_k_similar, top_k_similar_batch
+from soccer.store import build_feature_store, open_feature_store
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+ENGINES = ['exact', 'ivf', 'int8']
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Batas waktu satu proses mesin (detik) sebelum dianggap macet
+ENGINE_TIMEOUT_S = 3600
+
+
+# DATABASE SINTETIS
+def make_synthetic_database(path, n_players, snapshots_per_player=3, seed=42, chunk_size=50_000):
+    """
+    Membuat database dengan tabel Player dan Player_Attributes berisi pemain
+    sintetis. Atribut dibangkitkan dari beberapa "tipe pemain" agar struktur
+    cluster-nya menyerupai data asli.
+    """
+    rng = np.random.default_rng(seed)
+    attribute_cols = [col for col in NUMERIC_FEATURES if col != 'passing']
+    archetypes = rng.integers(35, 85, size=(12, len(attribute_cols)))
+
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE Player (id INTEGER PRIMARY KEY, player_api_id INTEGER UNIQUE, player_name TEXT, "
+        "player_fifa_api_id INTEGER, birthday TEXT, height REAL, weight INTEGER)"
+    )
+    conn.execute(
+        "CREATE TABLE Player_Attributes (id INTEGER PRIMARY KEY, player_fifa_api_id INTEGER, "
+        "player_api_id INTEGER, date TEXT, preferred_foot TEXT, "
+        + ", ".join(f"{col} INTEGER" for col in attribute_cols) + ")"
+    )
+    row_id = 1
+    for start in range(0, n_players, chunk_size):
+        ids = np.arange(start, min(start + chunk_size, n_players))
+        conn.executemany(
+            "INSERT INTO Player VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((int(i) + 1, int(i) + 1, f"Player {i}", int(i) + 1, '1990-01-01 00:00:00', 180.0, 170) for i in ids)
+        )
+        base = archetypes[rng.integers(0, len(archetypes), len(ids))] + rng.normal(0, 6, (len(ids), len(attribute_cols)))
+        feet = np.where(rng.random(len(ids)) < 0.25, 'left', 'right')
+        rows = []
+        for snapshot in range(snapshots_per_player):
+            values = np.clip(base + rng.normal(0, 2, base.shape) + snapshot, 1, 99).astype(int)
+            date = f"{2010 + snapshot}-08-01 00:00:00"
+            for i, player_id in enumerate(ids):
+                rows.append((row_id, int(player_id) + 1, int(player_id) + 1, date, feet[i], *values[i].tolist()))
+                row_id += 1
+        conn.executemany(f"INSERT INTO Player_Attributes VALUES ({', '.join('?' * (5 + len(attribute_cols)))})", rows)
+        conn.commit()
+    conn.close()
+
+
+# PENGUKURAN
+def peak_rss_mb():
+    """
+    Peak resident set size proses saat ini dalam MB (None jika tidak tersedia).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS melaporkan byte
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def latency_summary(seconds):
+    milliseconds = np.asarray(seconds) * 1000
+    return {
+        'p50_ms': float(np.percentile(milliseconds, 50)),
+        'p99_ms': float(np.percentile(milliseconds, 99)),
+        'mean_ms': float(milliseconds.mean()),
+    }
+
+
+def run_engine(db_path, store_dir, engine, k, n_queries, batch_size, result_queue):
+    """
+    Dijalankan di proses terpisah agar cold load dan peak RSS setiap mesin
+    terukur tanpa pengaruh mesin lain.
+    """
+    start = time.perf_counter()
+    store = open_feature_store(db_path, store_dir)
+    if engine == 'ivf':
+        index = load_or_build_index(store.normalized, store.version, index_dir=os.path.join(store.path, 'ivf'))
+    cold_load = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    queries = rng.choice(len(store), min(n_queries, len(store)), replace=False)
+
+    def query(idx):
+        if engine == 'ivf':
+            return index.search(store.normalized[idx], k, exclude=idx)
+        if engine == 'int8':
+            return top_k_similar_quantized(store.quantized, store.normalized, idx, k)
+        return top_k_similar(store.normalized, idx, k)
+
+    timings = []
+    for idx in queries:
+        start = time.perf_counter()
+        query(idx)
+        timings.append(time.perf_counter() - start)
+
+    batch = rng.choice(len(store), min(batch_size, len(store)), replace=False)
+    start = time.perf_counter()
+    if engine == 'exact':
+        top_k_similar_batch(store.normalized, batch, k)
+    else:
+        for idx in batch:
+            query(idx)
+    batch_seconds = time.perf_counter() - start
+
+    # Recall@k terhadap brute force pada query acak lain (di luar pengukuran latensi)
+    recall, _ = measure_recall(lambda idx, k: query(idx), store.normalized, k=k, n_queries=n_queries, seed=1)
+
+    result_queue.put({
+        'engine': engine,
+        'cold_load_s': cold_load,
+        'single_query': latency_summary(timings),
+        'batch_queries_per_s': len(batch) / batch_seconds,
+        'recall_at_k': recall,
+        'peak_rss_mb': peak_rss_mb(),
+    })
+
+
+def wait_for_result(process, result_queue, timeout=ENGINE_TIMEOUT_S, poll_s=5):
+    """
+    Menunggu hasil proses mesin. Jika proses berhenti tanpa hasil (crash)
+    atau melewati `timeout`, dikembalikan pesan error agar benchmark tidak macet.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return result_queue.get(timeout=poll_s), None
+        except queue.Empty:
+            if not process.is_alive():
+                return None, f"proses berhenti dengan exit code {process.exitcode}"
+    process.terminate()
+    return None, f"melewati batas waktu {timeout} detik"
+
+
+def benchmark_size(n_players, workdir, k, n_queries, batch_size, engines):
+    db_path = os.path.join(workdir, f"synthetic_{n_players}.sqlite")
+    store_dir = os.path.join(workdir, f"store_{n_players}")
+    if not os.path.exists(db_path):
+        start = time.perf_counter()
+        make_synthetic_database(db_path, n_players)
+        print(f"  database sintetis dibuat dalam {time.perf_counter() - start:.1f} detik")
+
+    start = time.perf_counter()
+    store = build_feature_store(db_path, store_dir, force=True)
+    feature_build = time.perf_counter() - start
+
+    index_build = None
+    if 'ivf' in engines:
+        start = time.perf_counter()
+        load_or_build_index(store.normalized, store.version, index_dir=os.path.join(store.path, 'ivf'))
+        index_build = time.perf_counter() - start
+
+    context = multiprocessing.get_context('spawn')
+    engine_results = []
+    for engine in engines:
+        result_queue = context.Queue()
+        process = context.Process(
+            target=run_engine, args=(db_path, store_dir, engine, k, n_queries, batch_size, result_queue)
+        )
+        process.start()
+        result, error = wait_for_result(process, result_queue)
+        process.join()
+        if error is not None:
+            engine_results.append({'engine': engine, 'error': error})
+            print(f"  {engine}: gagal ({error})")
+            continue
+        engine_results.append(result)
+        print(f"  {engine}: p50 {result['single_query']['p50_ms']:.2f} ms, recall@{k} {result['recall_at_k']:.3f}")
+
+    return {
+        'n_players': n_players,
+        'feature_build_s': feature_build,
+        'ivf_build_s': index_build,
+        'engines': engine_results,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark sistem rekomendasi pemain.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Jumlah pemain sintetis")
+    parser.add_argument('--engines', nargs='+', default=ENGINES, choices=ENGINES)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200, help="Jumlah query tunggal per mesin")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Jumlah pemain untuk uji throughput batch")
+    parser.add_argument('--workdir', default=None, help="Folder database sintetis (default: folder sementara)")
+    parser.add_argument('--output', default=None, help="Path file JSON hasil")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='recommender_bench_')
+    os.makedirs(workdir, exist_ok=True)
+    results = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'k': args.k,
+        'sizes': [],
+    }
+    for n_players in args.sizes:
+        print(f"Benchmark {n_players} pemain...")
+        results['sizes'].append(
+            benchmark_size(n_players, workdir, args.k, args.queries, args.batch_size, args.engines)
+        )
+
+    output = args.output or os.path.join(RESULTS_DIR, f"recommender_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Hasil disimpan di {output}")
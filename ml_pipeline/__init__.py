@@ -0,0 +1,3 @@
+"""
+Modul pendukung untuk pipeline machine learning generik.
+"""
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import joblib
+
+
+DEFAULT_CACHE_DIR = os.environ.get('ML_CACHE_DIR', os.path.join("Data", "ml_cache"))
+
+# Batas total ukuran cache di disk (default 2 GB)
+DEFAULT_MAX_BYTES = int(os.environ.get('ML_CACHE_MAX_BYTES', 2 << 30))
+
+CACHE_SUFFIX = '.joblib'
+DIR_SUFFIX = '.dir'
+
+
+# KUNCI CACHE
+def content_hash(data, chunk_size=1 << 20):
+    """
+    Hash SHA-256 dari isi file yang diunggah (bytes atau objek file).
+    """
+    digest = hashlib.sha256()
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        digest.update(data)
+    else:
+        data.seek(0)
+        for chunk in iter(lambda: data.read(chunk_size), b''):
+            digest.update(chunk)
+        data.seek(0)
+    return digest.hexdigest()
+
+
+def cache_key(kind, **params):
+    """
+    Kunci entri cache: jenis artefak ditambah hash parameter
+    (misalnya hash dataset, kolom target, dan jenis masalah).
+    """
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return f"{kind}-{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+
+# CACHE ARTEFAK DI DISK
+class DiskCache:
+    """
+    Menyimpan artefak (data hasil pra-pemrosesan, preprocessor, model) dengan
+    joblib di satu direktori sehingga bisa dipakai ulang lintas sesi dan
+    tetap ada setelah server dimulai ulang. Jika total ukuran melebihi
+    `max_bytes`, entri yang paling lama tidak diakses dihapus.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + CACHE_SUFFIX)
+
+    def get(self, key):
+        """
+        Mengembalikan artefak untuk `key`, atau None jika belum ada.
+        Waktu akses diperbarui agar entri ini tidak segera dieviksi.
+        """
+        path = self._path(key)
+        try:
+            value = joblib.load(path)
+            os.utime(path)
+        except (FileNotFoundError, EOFError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Menulis artefak ke file sementara lalu memindahkannya (atomik),
+        kemudian menjalankan eviksi berdasarkan ukuran.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        joblib.dump(value, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def get_or_compute(self, key, compute):
+        """
+        Mengambil artefak dari disk, atau menjalankan `compute()` lalu menyimpannya.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def get_or_build_dir(self, key, build):
+        """
+        Entri berupa direktori (misalnya dataset kolumnar). Jika belum ada,
+        `build(path)` mengisi direktori sementara yang lalu dipindahkan ke
+        tempatnya. Mengembalikan path direktori entri.
+        """
+        path = os.path.join(self.cache_dir, key + DIR_SUFFIX)
+        if os.path.isdir(path):
+            os.utime(path)
+            self.hits += 1
+            return path
+        self.misses += 1
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        try:
+            build(tmp_path)
+            try:
+                os.replace(tmp_path, path)
+            except OSError:
+                # Sesi lain sudah lebih dulu membangun entri yang sama
+                if not os.path.isdir(path):
+                    raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        self.evict()
+        return path
+
+    def entries(self):
+        """
+        Daftar (path, ukuran, waktu akses terakhir) semua entri.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if name.endswith(CACHE_SUFFIX):
+                    stat = os.stat(path)
+                    entries.append((path, stat.st_size, stat.st_mtime))
+                elif name.endswith(DIR_SUFFIX):
+                    size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+                    entries.append((path, size, os.stat(path).st_mtime))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def evict(self):
+        """
+        Menghapus entri tertua sampai total ukuran cache <= `max_bytes`.
+        """
+        with self._lock:
+            entries = sorted(self.entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                if path.endswith(DIR_SUFFIX):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+
+    def stats(self):
+        entries = self.entries()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+        }
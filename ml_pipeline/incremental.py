@@ -0,0 +1,283 @@
+import os
+import time
+
+import numpy as np
+from sklearn.linear_model import SGDClassifier, SGDRegressor
+from sklearn.preprocessing import StandardScaler
+
+from ml_pipeline.ingest import CHUNK_ROWS
+from ml_pipeline.training import CORE_BUDGET, TrainingCancelled, train_model
+
+
+# Dataset yang ukurannya di atas batas ini (byte) dilatih secara out-of-core
+IN_MEMORY_MAX_BYTES = int(os.environ.get('ML_IN_MEMORY_MAX_BYTES', 512 << 20))
+
+# Parameter pelatihan bertahap; ikut menjadi bagian kunci cache model
+INCREMENTAL_PARAMS = {'epochs': 3, 'alpha': 1e-4, 'huber_epsilon': 1.35, 'random_state': 42}
+
+# Setiap baris ke-HOLDOUT_EVERY dipisahkan untuk evaluasi
+HOLDOUT_EVERY = 10
+
+# Kolom kategorikal dengan kategori sebanyak ini atau kurang di-one-hot,
+# sisanya dipakai sebagai kode yang distandardisasi
+MAX_ONE_HOT = 32
+
+# Jumlah baris sampel untuk random forest pembanding
+COMPARISON_SAMPLE_ROWS = 50_000
+
+
+def needs_out_of_core(dataset, max_bytes=IN_MEMORY_MAX_BYTES):
+    return dataset.nbytes > max_bytes
+
+
+def is_holdout(rows):
+    return rows % HOLDOUT_EVERY == 0
+
+
+# ENCODING FITUR PER CHUNK
+class ChunkEncoder:
+    """
+    Mengubah DataFrame fitur (kolom numerik dan kode kategori) menjadi
+    matriks untuk model linear: kolom numerik dan kode kategori dengan
+    banyak nilai distandardisasi (statistik dikumpulkan per chunk),
+    kolom kategori kecil di-one-hot. Kolom numerik lebih dulu di-clip ke
+    kuantil CLIP_QUANTILE dari sketsa ingestion, agar nilai ekstrem
+    (misalnya AveOccup) tidak membuat SGD divergen.
+    """
+
+    def __init__(self, dataset):
+        self.feature_columns = dataset.feature_columns
+        self.one_hot = {
+            col: len(dataset.meta['vocabularies'][col])
+            for col in self.feature_columns
+            if dataset.schema[col] == 'category' and len(dataset.meta['vocabularies'][col]) <= MAX_ONE_HOT
+        }
+        self.scaled = [col for col in self.feature_columns if col not in self.one_hot]
+        # Dataset lama tanpa batas clipping di meta tidak di-clip
+        columns = dataset.meta['columns']
+        self.clip_min = np.nan_to_num(np.array([
+            columns[col].get('clip_min', -np.inf) if dataset.schema[col] == 'numeric' else -np.inf for col in self.scaled
+        ], dtype=np.float64), nan=-np.inf)
+        self.clip_max = np.nan_to_num(np.array([
+            columns[col].get('clip_max', np.inf) if dataset.schema[col] == 'numeric' else np.inf for col in self.scaled
+        ], dtype=np.float64), nan=np.inf)
+        self.scaler = StandardScaler()
+
+    def _scaled_values(self, X):
+        return np.clip(X[self.scaled].to_numpy(dtype=np.float64), self.clip_min, self.clip_max)
+
+    def partial_fit(self, X):
+        if self.scaled:
+            self.scaler.partial_fit(self._scaled_values(X))
+        return self
+
+    def transform(self, X):
+        blocks = []
+        if self.scaled:
+            blocks.append(self.scaler.transform(self._scaled_values(X)))
+        for col, n_categories in self.one_hot.items():
+            codes = X[col].to_numpy()
+            blocks.append((codes[:, None] == np.arange(n_categories)).astype(np.float64))
+        return np.hstack(blocks) if blocks else np.empty((len(X), 0))
+
+
+# MODEL LINEAR YANG DILATIH BERTAHAP
+class IncrementalModel:
+    """
+    Model SGD (regresi logistik untuk klasifikasi, regresi linear dengan
+    loss Huber untuk regresi) yang dilatih dengan partial_fit per chunk.
+    Target regresi distandardisasi saat pelatihan dan dikembalikan ke skala
+    asli saat prediksi; loss Huber membatasi langkah dari galat besar.
+    """
+
+    def __init__(self, problem_type, encoder, params=None):
+        params = {**INCREMENTAL_PARAMS, **(params or {})}
+        self.problem_type = problem_type
+        self.encoder = encoder
+        if problem_type == 'Klasifikasi':
+            self.estimator = SGDClassifier(loss='log_loss', alpha=params['alpha'], random_state=params['random_state'])
+        elif problem_type == 'Regresi':
+            self.estimator = SGDRegressor(
+                loss='huber', epsilon=params['huber_epsilon'], alpha=params['alpha'], random_state=params['random_state']
+            )
+        else:
+            raise ValueError(f"Jenis masalah tidak dikenal: {problem_type}")
+        self.classes_ = None
+        self.y_mean, self.y_scale = 0.0, 1.0
+
+    def partial_fit(self, X, y):
+        Xt = self.encoder.transform(X)
+        if self.problem_type == 'Klasifikasi':
+            self.estimator.partial_fit(Xt, y, classes=self.classes_)
+        else:
+            self.estimator.partial_fit(Xt, (np.asarray(y, dtype=np.float64) - self.y_mean) / self.y_scale)
+        return self
+
+    def predict(self, X):
+        predictions = self.estimator.predict(self.encoder.transform(X))
+        if self.problem_type == 'Regresi':
+            predictions = predictions * self.y_scale + self.y_mean
+        return predictions
+
+
+# AKUMULASI METRIK PER CHUNK
+class ChunkMetrics:
+    """
+    Metrik evaluasi yang dijumlahkan per chunk: confusion matrix untuk
+    klasifikasi, jumlah galat kuadrat dan momen target untuk regresi.
+    """
+
+    def __init__(self, problem_type, classes=None):
+        self.problem_type = problem_type
+        self.classes = classes
+        self.n = 0
+        self.confusion = np.zeros((len(classes), len(classes)), dtype=np.int64) if classes is not None else None
+        self.sum_squared_error = 0.0
+        self.sum_y = 0.0
+        self.sum_y_squared = 0.0
+
+    def update(self, y_true, y_pred):
+        y_true = np.asarray(y_true)
+        self.n += len(y_true)
+        if self.problem_type == 'Klasifikasi':
+            n_classes = len(self.classes)
+            true_idx = np.searchsorted(self.classes, y_true)
+            pred_idx = np.searchsorted(self.classes, y_pred)
+            self.confusion += np.bincount(true_idx * n_classes + pred_idx, minlength=n_classes ** 2).reshape(n_classes, n_classes)
+        else:
+            y_true = y_true.astype(np.float64)
+            self.sum_squared_error += float(np.sum((y_true - y_pred) ** 2))
+            self.sum_y += float(y_true.sum())
+            self.sum_y_squared += float(np.sum(y_true ** 2))
+
+    def result(self):
+        if self.n == 0:
+            return {}
+        if self.problem_type == 'Klasifikasi':
+            return {
+                'accuracy': float(np.trace(self.confusion) / self.n),
+                'confusion_matrix': self.confusion.tolist(),
+            }
+        total = self.sum_y_squared - self.sum_y ** 2 / self.n
+        return {
+            'mse': self.sum_squared_error / self.n,
+            'r2': 1.0 - self.sum_squared_error / total if total > 0 else 0.0,
+        }
+
+
+def _training_rows(start, stop):
+    rows = np.arange(start, stop)
+    return rows[~is_holdout(rows)]
+
+
+def _comparison_sample(n_rows, sample_rows, random_state):
+    """
+    Indeks acak (terurut) baris latih untuk random forest pembanding,
+    tanpa membuat permutasi seluruh baris.
+    """
+    rng = np.random.default_rng(random_state)
+    candidates = np.unique(rng.integers(0, n_rows, size=2 * sample_rows)) if n_rows else np.empty(0, np.int64)
+    candidates = candidates[~is_holdout(candidates)]
+    return np.sort(rng.permutation(candidates)[:sample_rows])
+
+
+# PELATIHAN OUT-OF-CORE
+def train_incremental(dataset, budget=CORE_BUDGET, chunk_rows=CHUNK_ROWS, params=None, progress=None, should_stop=None):
+    """
+    Melatih IncrementalModel di atas ColumnarDataset per chunk, sehingga
+    memori sebanding dengan `chunk_rows`, bukan ukuran dataset:
+    satu lintasan untuk statistik standardisasi dan daftar kelas,
+    `epochs` lintasan partial_fit (urutan baris diacak di dalam chunk),
+    lalu evaluasi pada baris holdout (setiap baris ke-HOLDOUT_EVERY).
+
+    Sebagai pembanding, random forest dilatih pada sampel baris latih
+    (COMPARISON_SAMPLE_ROWS) dan dievaluasi pada holdout yang sama;
+    skornya adalah perkiraan (batas bawah) akurasi random forest di
+    memori. Mengembalikan (model, laporan).
+    """
+    params = {**INCREMENTAL_PARAMS, **(params or {})}
+    problem_type = dataset.meta['problem_type']
+    rng = np.random.default_rng(params['random_state'])
+    n_chunks = -(-dataset.n_rows // chunk_rows)
+    total_steps = n_chunks * (params['epochs'] + 1) + 2
+    step = 0
+
+    def advance():
+        nonlocal step
+        if should_stop is not None and should_stop():
+            raise TrainingCancelled()
+        step += 1
+        if progress is not None:
+            progress(step, total_steps)
+
+    # Model linear hanya memakai satu core
+    cores, waited = budget.acquire(1)
+    try:
+        start = time.perf_counter()
+        encoder = ChunkEncoder(dataset)
+        model = IncrementalModel(problem_type, encoder, params)
+        classes = set()
+        y_stats = StandardScaler()
+        for chunk_start in range(0, dataset.n_rows, chunk_rows):
+            rows = _training_rows(chunk_start, min(chunk_start + chunk_rows, dataset.n_rows))
+            X, y = dataset.rows(rows)
+            if problem_type == 'Klasifikasi':
+                # Kelas diambil dari seluruh baris agar kelas yang hanya ada di holdout tetap dikenal
+                classes.update(np.unique(dataset.target(chunk_start, chunk_start + chunk_rows)).tolist())
+            elif len(rows):
+                y_stats.partial_fit(y.to_numpy(dtype=np.float64).reshape(-1, 1))
+            if len(rows):
+                encoder.partial_fit(X)
+            advance()
+        if problem_type == 'Klasifikasi':
+            model.classes_ = np.array(sorted(classes))
+        elif y_stats.n_samples_seen_:
+            model.y_mean, model.y_scale = float(y_stats.mean_[0]), float(y_stats.scale_[0])
+
+        for _ in range(params['epochs']):
+            for chunk_start in range(0, dataset.n_rows, chunk_rows):
+                rows = _training_rows(chunk_start, min(chunk_start + chunk_rows, dataset.n_rows))
+                if len(rows):
+                    X, y = dataset.rows(rows)
+                    order = rng.permutation(len(rows))
+                    model.partial_fit(X.iloc[order], y.iloc[order])
+                advance()
+        fit_seconds = time.perf_counter() - start
+    finally:
+        budget.release(cores)
+
+    # Random forest pembanding pada sampel (core diatur oleh train_model)
+    sample = _comparison_sample(dataset.n_rows, COMPARISON_SAMPLE_ROWS, params['random_state'])
+    X_sample, y_sample = dataset.rows(sample)
+    forest, forest_report = train_model(X_sample, y_sample, problem_type, budget=budget, should_stop=should_stop)
+    del X_sample, y_sample
+    advance()
+
+    metrics = ChunkMetrics(problem_type, model.classes_)
+    forest_metrics = ChunkMetrics(problem_type, model.classes_)
+    for chunk_start in range(0, dataset.n_rows, chunk_rows):
+        rows = np.arange(chunk_start, min(chunk_start + chunk_rows, dataset.n_rows))
+        rows = rows[is_holdout(rows)]
+        X, y = dataset.rows(rows)
+        metrics.update(y, model.predict(X))
+        forest_metrics.update(y, forest.predict(X))
+    advance()
+
+    n_holdout = -(-dataset.n_rows // HOLDOUT_EVERY)
+    report = {
+        'mode': 'out_of_core',
+        'n_rows': dataset.n_rows,
+        'n_train': dataset.n_rows - n_holdout,
+        'n_holdout': n_holdout,
+        'chunk_rows': chunk_rows,
+        'epochs': params['epochs'],
+        'cores_used': cores,
+        'cores_total': budget.total,
+        'wait_seconds': waited,
+        'fit_seconds': fit_seconds,
+        'holdout': metrics.result(),
+        'forest_sample_rows': len(sample),
+        'forest_fit_seconds': forest_report['fit_seconds'],
+        'forest_holdout': forest_metrics.result(),
+    }
+    return model, report
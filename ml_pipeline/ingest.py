@@ -0,0 +1,314 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from sklearn.preprocessing import LabelEncoder
+
+from ml_pipeline.sketch import QuantileSketch
+
+
+# Versi format dataset kolumnar; ikut menjadi bagian kunci cache dataset
+INGEST_FORMAT_VERSION = 2
+
+# Jumlah baris per chunk saat membaca CSV
+CHUNK_ROWS = 100_000
+
+# Jumlah baris awal yang dipakai untuk menentukan tipe kolom
+SAMPLE_ROWS = 10_000
+
+# Nilai pengganti untuk kategori yang hilang (sama dengan pipeline di memori)
+MISSING_CATEGORY = 'missing'
+
+# Kuantil bawah/atas tiap kolom numerik yang disimpan sebagai batas clipping model linear
+CLIP_QUANTILE = 0.01
+
+# Tipe kolom di disk: fitur numerik float32 (tipe yang dipakai pohon sklearn), kode kategori int32
+NUMERIC_DTYPE = np.float32
+CODE_DTYPE = np.int32
+
+
+# SKEMA KOLOM
+def infer_schema(uploaded_file, sample_rows=SAMPLE_ROWS):
+    """
+    Menentukan kolom numerik dan kategorikal dari sampel baris awal.
+    Kolom yang ternyata memuat teks di luar sampel dikoreksi oleh
+    `_non_numeric_columns` saat ingestion.
+    """
+    uploaded_file.seek(0)
+    sample = pd.read_csv(uploaded_file, nrows=sample_rows)
+    uploaded_file.seek(0)
+    return {
+        col: 'numeric' if is_numeric_dtype(sample[col]) and sample[col].dtype != bool else 'category'
+        for col in sample.columns
+    }
+
+
+def _non_numeric_columns(uploaded_file, schema, chunk_rows):
+    """
+    Lintasan penuh atas kolom yang dianggap numerik (dibaca sebagai teks):
+    kolom yang memiliki nilai non-numerik di luar sampel awal, misalnya
+    kolom yang kosong semua di sampel tetapi berisi teks di chunk berikutnya.
+    """
+    numeric = [col for col, kind in schema.items() if kind == 'numeric']
+    found = set()
+    uploaded_file.seek(0)
+    for chunk in pd.read_csv(uploaded_file, usecols=numeric, dtype='str', chunksize=chunk_rows):
+        for col in numeric:
+            if col not in found:
+                values = chunk[col]
+                if (pd.to_numeric(values, errors='coerce').isna() & values.notna()).any():
+                    found.add(col)
+    uploaded_file.seek(0)
+    return [col for col in numeric if col in found]
+
+
+def _read_chunks(uploaded_file, schema, chunk_rows):
+    """
+    Membaca CSV per chunk dengan dtype eksplisit. Nilai non-numerik di
+    kolom numerik membuat pembacaan gagal (ValueError), bukan menjadi NaN.
+    """
+    dtypes = {col: 'float64' if kind == 'numeric' else 'str' for col, kind in schema.items()}
+    uploaded_file.seek(0)
+    yield from pd.read_csv(uploaded_file, dtype=dtypes, chunksize=chunk_rows, keep_default_na=True)
+
+
+# DATASET KOLUMNAR DI DISK
+class ColumnarDataset:
+    """
+    Dataset hasil ingestion: satu file biner per kolom (dibuka sebagai
+    memmap) dan meta.json berisi skema, statistik, dan kosakata kategori.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.n_rows = self.meta['n_rows']
+        self.schema = self.meta['schema']
+        self.target_column = self.meta['target_column']
+
+    @property
+    def feature_columns(self):
+        return [col for col in self.schema if col != self.target_column]
+
+    @property
+    def nbytes(self):
+        """
+        Ukuran data kolom (byte) yang akan dimuat jika dataset dibaca ke memori.
+        """
+        return self.n_rows * len(self.schema) * np.dtype(NUMERIC_DTYPE).itemsize
+
+    def column(self, name):
+        dtype = NUMERIC_DTYPE if self.schema[name] == 'numeric' else CODE_DTYPE
+        if self.n_rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, f'{name}.bin'), dtype=dtype, mode='r', shape=(self.n_rows,))
+
+    def features(self, start=0, stop=None):
+        """
+        Matriks fitur (baris start..stop) sebagai DataFrame.
+        """
+        return pd.DataFrame({col: np.asarray(self.column(col)[start:stop]) for col in self.feature_columns})
+
+    def target(self, start=0, stop=None):
+        y = np.asarray(self.column(self.target_column)[start:stop])
+        if self.meta['target_dtype'] == 'int64':
+            y = y.astype(np.int64)
+        return pd.Series(y, name=self.target_column)
+
+    def rows(self, indices):
+        """
+        (X, y) untuk baris-baris tertentu (indeks terurut), dibaca langsung dari memmap.
+        """
+        X = pd.DataFrame({col: np.asarray(self.column(col)[indices]) for col in self.feature_columns})
+        y = np.asarray(self.column(self.target_column)[indices])
+        if self.meta['target_dtype'] == 'int64':
+            y = y.astype(np.int64)
+        return X, pd.Series(y, name=self.target_column)
+
+    def iter_chunks(self, chunk_rows=CHUNK_ROWS):
+        """
+        Iterasi (X, y) per chunk tanpa memuat seluruh dataset ke memori.
+        """
+        for start in range(0, self.n_rows, chunk_rows):
+            stop = min(start + chunk_rows, self.n_rows)
+            yield self.features(start, stop), self.target(start, stop)
+
+    def label_encoders(self):
+        """
+        LabelEncoder per kolom kategorikal, setara dengan hasil fit di memori.
+        """
+        encoders = {}
+        for col, classes in self.meta['vocabularies'].items():
+            le = LabelEncoder()
+            le.classes_ = np.array(classes, dtype=object)
+            encoders[col] = le
+        return encoders
+
+    def to_training_data(self):
+        """
+        (X, y, label_encoders) seperti keluaran preprocess_dataset.
+        """
+        return self.features(), self.target(), self.label_encoders()
+
+
+# INGESTION CSV SECARA STREAMING
+def ingest_csv(uploaded_file, target_column, problem_type, path, chunk_rows=CHUNK_ROWS):
+    """
+    Membaca CSV per chunk dan menulis setiap kolom langsung ke file di
+    `path`, sambil menghitung statistik kolom dalam satu lintasan: jumlah
+    nilai hilang, sketsa kuantil untuk median perkiraan (kolom numerik),
+    dan kosakata kategori. Setelah itu kolom di disk dirapikan: nilai
+    numerik yang hilang diisi median, kode kategori diurutkan seperti
+    LabelEncoder. Memori yang dipakai sebanding dengan ukuran chunk.
+
+    Jika kolom yang dianggap numerik dari sampel ternyata memuat teks di
+    chunk berikutnya, kolom tersebut dijadikan kategorikal (seperti hasil
+    pd.read_csv atas seluruh file) lalu ingestion diulang; nilai teks tidak
+    pernah diam-diam menjadi NaN.
+    """
+    schema = infer_schema(uploaded_file)
+    if target_column not in schema:
+        raise ValueError(f"Kolom target '{target_column}' tidak ditemukan di dataset.")
+
+    os.makedirs(path, exist_ok=True)
+    reinferred = []
+    while True:
+        # Target klasifikasi nonnumerik di-encode seperti kolom kategorikal lain
+        if problem_type == 'Regresi' and schema[target_column] != 'numeric':
+            raise ValueError(f"Kolom target '{target_column}' harus numerik untuk regresi.")
+        try:
+            stats = _stream_columns(uploaded_file, schema, target_column, path, chunk_rows)
+            break
+        except ValueError:
+            columns = _non_numeric_columns(uploaded_file, schema, chunk_rows)
+            if not columns:
+                raise
+            for col in columns:
+                schema[col] = 'category'
+            reinferred += columns
+
+    n_rows = stats['n_rows']
+    medians, vocabularies, columns_meta = {}, {}, {}
+    for col, kind in schema.items():
+        if kind == 'numeric':
+            sketch = stats['sketches'][col]
+            median = sketch.median()
+            if stats['integral'][col]:
+                # Kolom bilangan bulat diisi dengan median bulat
+                median = float(np.round(median))
+            if col == target_column and problem_type == 'Klasifikasi':
+                # Sama seperti pipeline di memori: target numerik tidak diisi median
+                median = np.nan
+            medians[col] = median
+            columns_meta[col] = {
+                'missing': stats['missing'][col], 'min': sketch.min, 'max': sketch.max,
+                'approx_median': median,
+                'clip_min': sketch.quantile(CLIP_QUANTILE), 'clip_max': sketch.quantile(1 - CLIP_QUANTILE),
+            }
+        else:
+            vocabularies[col] = sorted(stats['vocabularies'][col], key=str)
+            columns_meta[col] = {'missing': stats['missing'][col], 'n_categories': len(vocabularies[col])}
+
+    # Lintasan kedua di atas file kolom (bukan CSV): isi median dan urutkan kode kategori
+    for col, kind in schema.items():
+        if n_rows == 0:
+            break
+        if kind == 'numeric':
+            values = np.memmap(os.path.join(path, f'{col}.bin'), dtype=NUMERIC_DTYPE, mode='r+', shape=(n_rows,))
+            if not np.isnan(medians[col]):
+                for start in range(0, n_rows, chunk_rows):
+                    block = values[start:start + chunk_rows]
+                    block[np.isnan(block)] = medians[col]
+            values.flush()
+        else:
+            first_seen = stats['vocabularies'][col]
+            rank = {value: i for i, value in enumerate(vocabularies[col])}
+            remap = [rank[value] for value in first_seen]
+            if col == target_column:
+                # Kode -1 (target hilang) mengambil elemen terakhir: kelas terbanyak (modus)
+                remap.append(rank[first_seen[int(np.argmax(stats['target_counts']))]] if first_seen else 0)
+            remap = np.array(remap, dtype=CODE_DTYPE)
+            codes = np.memmap(os.path.join(path, f'{col}.bin'), dtype=CODE_DTYPE, mode='r+', shape=(n_rows,))
+            for start in range(0, n_rows, chunk_rows):
+                codes[start:start + chunk_rows] = remap[codes[start:start + chunk_rows]]
+            codes.flush()
+
+    target_dtype = 'float32'
+    if problem_type == 'Klasifikasi':
+        if schema[target_column] != 'numeric':
+            target_dtype = 'int64'
+        elif stats['integral'][target_column]:
+            target_dtype = 'int64'
+
+    meta = {
+        'format_version': INGEST_FORMAT_VERSION,
+        'n_rows': n_rows,
+        'schema': schema,
+        'target_column': target_column,
+        'problem_type': problem_type,
+        'target_dtype': target_dtype,
+        'vocabularies': {col: [str(v) for v in vocab] for col, vocab in vocabularies.items()},
+        'columns': columns_meta,
+        'reinferred_columns': reinferred,
+    }
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return ColumnarDataset(path)
+
+
+def _stream_columns(uploaded_file, schema, target_column, path, chunk_rows):
+    """
+    Lintasan tunggal atas CSV: menulis kolom ke disk (kode kategori sesuai
+    urutan kemunculan pertama) sambil mengumpulkan statistik. Target
+    kategorikal yang hilang ditulis sebagai -1 dan jumlah tiap kelasnya
+    dihitung untuk pengisian dengan modus.
+    """
+    sketches = {col: QuantileSketch() for col, kind in schema.items() if kind == 'numeric'}
+    vocabularies = {col: {} for col, kind in schema.items() if kind == 'category'}
+    missing = dict.fromkeys(schema, 0)
+    integral = {col: True for col in sketches}
+    target_counts = np.zeros(0, dtype=np.int64)
+    n_rows = 0
+
+    files = {col: open(os.path.join(path, f'{col}.bin'), 'wb') for col in schema}
+    try:
+        for chunk in _read_chunks(uploaded_file, schema, chunk_rows):
+            n_rows += len(chunk)
+            for col, kind in schema.items():
+                values = chunk[col]
+                missing[col] += int(values.isna().sum())
+                if kind == 'numeric':
+                    array = values.to_numpy(dtype=np.float64)
+                    sketches[col].update(array)
+                    array.astype(NUMERIC_DTYPE).tofile(files[col])
+                    if integral[col]:
+                        finite = array[~np.isnan(array)]
+                        integral[col] = bool(np.all(finite == np.round(finite)))
+                elif col == target_column:
+                    codes, uniques = pd.factorize(values, sort=False)
+                    vocabulary = vocabularies[col]
+                    local = np.array([vocabulary.setdefault(value, len(vocabulary)) for value in uniques], dtype=CODE_DTYPE)
+                    encoded = np.where(codes >= 0, local[codes], -1).astype(CODE_DTYPE)
+                    encoded.tofile(files[col])
+                    counts = np.bincount(encoded[encoded >= 0], minlength=len(vocabulary))
+                    target_counts = np.concatenate([target_counts, np.zeros(len(counts) - len(target_counts), np.int64)]) + counts
+                else:
+                    codes, uniques = pd.factorize(values.fillna(MISSING_CATEGORY), sort=False)
+                    vocabulary = vocabularies[col]
+                    local = np.array([vocabulary.setdefault(value, len(vocabulary)) for value in uniques], dtype=CODE_DTYPE)
+                    local[codes].tofile(files[col])
+    finally:
+        for f in files.values():
+            f.close()
+
+    return {
+        'n_rows': n_rows,
+        'sketches': sketches,
+        'vocabularies': {col: list(vocabulary) for col, vocabulary in vocabularies.items()},
+        'missing': missing,
+        'integral': integral,
+        'target_counts': target_counts,
+    }
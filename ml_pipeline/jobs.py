@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from ml_pipeline.incremental import train_incremental
+from ml_pipeline.training import TrainingCancelled, train_model
+
+
+# Jumlah pelatihan yang boleh berjalan bersamaan (core tetap dibatasi CoreBudget)
+DEFAULT_MAX_WORKERS = int(os.environ.get('ML_TRAINING_WORKERS', 2))
+
+# Jumlah job selesai yang tetap disimpan agar hasilnya bisa diambil sesi lain
+MAX_FINISHED_JOBS = 100
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+# JOB PELATIHAN
+class TrainingJob:
+    """
+    Satu pelatihan model di latar belakang: status, progres (pohon yang
+    sudah dibangun, atau langkah chunk untuk pelatihan out-of-core),
+    permintaan pembatalan, serta hasil atau error.
+    """
+
+    def __init__(self, key, unit='pohon'):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.unit = unit
+        self.status = QUEUED
+        self.completed = 0
+        self.total = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def progress(self):
+        if not self.total:
+            return 0.0
+        return self.completed / self.total
+
+    @property
+    def active(self):
+        return self.status not in FINISHED_STATES
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def _update_progress(self, completed, total):
+        self.completed, self.total = completed, total
+
+
+class JobManager:
+    """
+    Menjalankan pelatihan di thread pool agar skrip Streamlit tidak
+    menunggu. Job dengan kunci yang sama (dataset + parameter) yang masih
+    berjalan dipakai bersama, sehingga sesi lain tidak melatih ulang.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='training')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def submit_training(self, key, X, y, problem_type, on_done=None):
+        """
+        Menjadwalkan pelatihan random forest dan mengembalikan job-nya (atau
+        job aktif dengan kunci yang sama). `on_done(result)` dipanggil di
+        thread pelatihan setelah model selesai, misalnya untuk menyimpan ke disk.
+        """
+        def train(progress, should_stop):
+            return train_model(X, y, problem_type, progress=progress, should_stop=should_stop)
+        return self._submit(key, train, on_done, unit='pohon')
+
+    def submit_incremental_training(self, key, dataset, on_done=None):
+        """
+        Seperti submit_training, tetapi melatih model out-of-core per chunk
+        di atas ColumnarDataset.
+        """
+        def train(progress, should_stop):
+            return train_incremental(dataset, progress=progress, should_stop=should_stop)
+        return self._submit(key, train, on_done, unit='langkah')
+
+    def _submit(self, key, train, on_done, unit):
+        with self._lock:
+            for job in self._jobs.values():
+                if job.key == key and job.active:
+                    return job
+            job = TrainingJob(key, unit)
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, train, on_done)
+        return job
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def _run(self, job, train, on_done):
+        if job.cancel_requested():
+            self._finish(job, CANCELLED)
+            return
+        job.status = RUNNING
+        try:
+            job.result = train(job._update_progress, job.cancel_requested)
+            if on_done is not None:
+                on_done(job.result)
+        except TrainingCancelled:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, FAILED)
+        else:
+            self._finish(job, DONE)
+
+    def _finish(self, job, status):
+        job.finished_at = time.time()
+        job.status = status
+
+    def _prune(self):
+        finished = sorted(
+            (job for job in self._jobs.values() if not job.active), key=lambda job: job.finished_at
+        )
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
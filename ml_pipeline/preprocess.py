@@ -0,0 +1,55 @@
+import io
+
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from sklearn.preprocessing import LabelEncoder
+
+
+# MEMBACA DATASET YANG DIUNGGAH
+def read_dataset(data, file_name):
+    """
+    Membaca isi file yang diunggah (bytes) sebagai DataFrame berdasarkan ekstensinya.
+    """
+    if file_name.endswith('.csv'):
+        return pd.read_csv(io.BytesIO(data))
+    if file_name.endswith('.xlsx'):
+        return pd.read_excel(io.BytesIO(data))
+    raise ValueError("Format file tidak didukung. Mohon unggah file .csv atau .xlsx.")
+
+
+# PRA-PEMROSESAN OTOMATIS
+def preprocess_dataset(df, target_column, problem_type):
+    """
+    Memisahkan fitur dan target, mengisi nilai yang hilang, dan meng-encode
+    kolom kategorikal. Mengembalikan (X, y, label_encoders).
+    """
+    if target_column not in df.columns:
+        raise ValueError(f"Kolom target '{target_column}' tidak ditemukan di dataset.")
+
+    X = df.drop(columns=[target_column])
+    y = df[target_column]
+
+    # Inisialisasi dictionary untuk menyimpan LabelEncoder
+    label_encoders = {}
+
+    # Tangani nilai yang hilang dan encode kolom kategorikal
+    for col in X.columns:
+        if not is_numeric_dtype(X[col]):
+            le = LabelEncoder()
+            X[col] = le.fit_transform(X[col].fillna('missing'))
+            label_encoders[col] = le
+        else:
+            # Isi nilai numerik yang hilang dengan median
+            X[col] = X[col].fillna(X[col].median())
+
+    # Tangani nilai yang hilang di kolom target (jika ada)
+    if problem_type == 'Klasifikasi':
+        if not is_numeric_dtype(y):
+            le = LabelEncoder()
+            y = pd.Series(le.fit_transform(y.fillna(y.mode()[0])), name=target_column)
+            label_encoders[target_column] = le
+    elif problem_type == 'Regresi':
+        if is_numeric_dtype(y):
+            y = y.fillna(y.median())
+
+    return X, y, label_encoders
@@ -0,0 +1,67 @@
+import numpy as np
+
+
+# SKETSA KUANTIL (GAYA T-DIGEST)
+class QuantileSketch:
+    """
+    Ringkasan distribusi nilai numerik yang bisa diperbarui per chunk
+    dengan memori tetap: sekumpulan centroid (rata-rata, bobot) yang
+    batasnya mengikuti fungsi skala t-digest, sehingga centroid di ekor
+    distribusi tetap kecil dan kuantil (misalnya median) cukup akurat.
+    """
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """
+        Menambahkan satu chunk nilai (NaN diabaikan).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._merge(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(len(values))]))
+
+    def _merge(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Posisi kuantil titik tengah tiap centroid, dipetakan ke skala k (arcsin)
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5)
+        bucket = np.floor(k).astype(np.int64)
+        _, bucket = np.unique(bucket, return_inverse=True)
+        merged_weights = np.bincount(bucket, weights=weights)
+        self.means = np.bincount(bucket, weights=means * weights) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q):
+        """
+        Perkiraan kuantil ke-`q` (0..1), interpolasi linear antar centroid.
+        """
+        if self.count == 0:
+            return np.nan
+        if len(self.means) == 1:
+            return float(self.means[0])
+        positions = (np.cumsum(self.weights) - self.weights / 2) / self.count
+        positions = np.concatenate([[0.0], positions, [1.0]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q, positions, values))
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def to_dict(self):
+        return {
+            'compression': self.compression, 'count': self.count, 'min': self.min, 'max': self.max,
+            'means': self.means.tolist(), 'weights': self.weights.tolist(),
+        }
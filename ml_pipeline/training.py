@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+
+# Parameter model; ikut menjadi bagian kunci cache model
+MODEL_PARAMS = {'n_estimators': 100, 'random_state': 42}
+
+# Jumlah pohon minimum yang ditambahkan per langkah pelatihan bertahap
+TREES_PER_STEP = 10
+
+
+class TrainingCancelled(Exception):
+    """
+    Pelatihan dihentikan atas permintaan pengguna.
+    """
+
+
+def available_cores():
+    """
+    Jumlah core yang boleh dipakai proses ini (menghormati CPU affinity/cgroup
+    jika tersedia).
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# ANGGARAN CORE PER PROSES
+class CoreBudget:
+    """
+    Anggaran core untuk seluruh proses. Setiap pelatihan meminta sejumlah
+    core; jika semua core sedang dipakai sesi lain, pelatihan menunggu
+    sampai ada core yang dilepas sehingga total thread tidak melebihi anggaran.
+    """
+
+    def __init__(self, total=None):
+        self.total = max(1, int(total or available_cores()))
+        self.in_use = 0
+        self.active = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, requested=None):
+        """
+        Menunggu sampai minimal satu core bebas, lalu memberikan
+        min(requested, core bebas). Mengembalikan (core diberikan, lama menunggu).
+        """
+        requested = self.total if requested is None else max(1, min(int(requested), self.total))
+        start = time.perf_counter()
+        with self._condition:
+            while self.in_use >= self.total:
+                self._condition.wait()
+            granted = min(requested, self.total - self.in_use)
+            self.in_use += granted
+            self.active += 1
+        return granted, time.perf_counter() - start
+
+    def release(self, granted):
+        with self._condition:
+            self.in_use -= granted
+            self.active -= 1
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            return {'total': self.total, 'in_use': self.in_use, 'active': self.active}
+
+
+CORE_BUDGET = CoreBudget(os.environ.get('ML_CORE_BUDGET'))
+
+
+# MELATIH MODEL
+def build_model(problem_type, **params):
+    """
+    Model yang sesuai berdasarkan jenis masalah.
+    """
+    params = {**MODEL_PARAMS, **params}
+    if problem_type == 'Klasifikasi':
+        return RandomForestClassifier(**params)
+    if problem_type == 'Regresi':
+        return RandomForestRegressor(**params)
+    raise ValueError(f"Jenis masalah tidak dikenal: {problem_type}")
+
+
+def train_model(X, y, problem_type, budget=CORE_BUDGET, max_cores=None, progress=None, should_stop=None):
+    """
+    Melatih model yang sesuai berdasarkan jenis masalah. Pohon-pohon random
+    forest dilatih paralel dengan core dari `budget`, bertahap dengan
+    warm_start sehingga `progress(pohon_selesai, total_pohon)` bisa
+    dilaporkan dan `should_stop()` diperiksa di antara langkah (memicu
+    TrainingCancelled). Hasil model sama dengan sekali fit karena
+    random_state tetap. Mengembalikan (model, laporan penggunaan core).
+    """
+    cores, waited = budget.acquire(max_cores)
+    try:
+        other_jobs = budget.stats()['active'] - 1
+        n_estimators = MODEL_PARAMS['n_estimators']
+        step = max(TREES_PER_STEP, cores)
+        model = build_model(problem_type, n_jobs=cores, warm_start=True)
+        start = time.perf_counter()
+        built = 0
+        while built < n_estimators:
+            if should_stop is not None and should_stop():
+                raise TrainingCancelled()
+            built = min(built + step, n_estimators)
+            model.set_params(n_estimators=built)
+            model.fit(X, y)
+            if progress is not None:
+                progress(built, n_estimators)
+        fit_seconds = time.perf_counter() - start
+    finally:
+        budget.release(cores)
+
+    # Prediksi berikutnya berjalan di luar anggaran, jadi kembali ke satu thread
+    model.set_params(n_jobs=None, warm_start=False)
+    report = {
+        'cores_used': cores,
+        'cores_total': budget.total,
+        'other_jobs': other_jobs,
+        'wait_seconds': waited,
+        'fit_seconds': fit_seconds,
+    }
+    return model, report
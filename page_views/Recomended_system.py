@@ -1,30 +1,74 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import sqlite3
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from fuzzywuzzy import process
-from sklearn.preprocessing import StandardScaler
-
-# FUNGSI UNTUK MEMUAT DATA SQLITE 
-@st.cache_data
-def load_sql_data(db_path):
+import os
+from soccer.ann import load_or_build_index
+from soccer.cache import ResultCache, query_signature
+from soccer.features import NUMERIC_FEATURES, weight_vector
+from soccer.history import load_or_build_point_in_time_index
+from soccer.quantize import top_k_similar_quantized
+from soccer.search import NameSearchIndex
+from soccer.similarity import (
+    similarity_contributions, top_contributions, top_k_similar, top_k_similar_among, top_k_weighted_similar
+)
+from soccer.store import DEFAULT_DB_PATH, database_signature, open_feature_store
+from soccer.trajectory import load_or_build_trajectory_index
+
+# FUNGSI UNTUK MEMBUKA FEATURE STORE
+@st.cache_resource
+def get_feature_store(db_path, db_signature):
     """
-    Memuat data dari database SQLite.
-    Akan menangani kesalahan jika file tidak ditemukan.
+    Membuka artefak rekomendasi yang sudah dihitung (matriks fitur memmap,
+    tabel lookup pemain, statistik scaler). Artefak hanya dibangun ulang saat
+    isi database berubah; signature membuat cache ikut diperbarui.
     """
     try:
-        # PENTING: Mengubah path file agar sesuai dengan struktur direktori Anda
-        db_path = "Data/database.sqlite"
-        conn = sqlite3.connect(db_path)
-        player_df = pd.read_sql_query("SELECT * FROM Player", conn)
-        player_attr_df = pd.read_sql_query("SELECT * FROM Player_Attributes", conn)
-        conn.close()
-        return player_df, player_attr_df
+        return open_feature_store(db_path)
     except Exception as e:
-        st.error(f"Terjadi kesalahan saat memuat database SQLite: {e}. Pastikan file 'database.sqlite' ada di direktori yang sama.")
-        return None, None
+        st.error(f"Terjadi kesalahan saat memuat database SQLite: {e}. Pastikan file 'database.sqlite' ada di folder Data/.")
+        return None
+
+# FUNGSI UNTUK MEMUAT INDEKS ANN
+@st.cache_resource
+def get_player_index(store_version, _store):
+    """
+    Memuat (atau membangun sekali) indeks kesamaan pemain yang disimpan di
+    folder versi feature store, sehingga ikut diperbarui saat data berubah.
+    """
+    return load_or_build_index(_store.normalized, store_version, index_dir=os.path.join(_store.path, 'ivf'))
+
+# FUNGSI UNTUK MEMBANGUN INDEKS PENCARIAN NAMA
+@st.cache_resource
+def get_name_search_index(store_version, _store):
+    """
+    Membangun indeks trigram atas nama pemain sekali per versi feature store.
+    """
+    return NameSearchIndex(_store.players['player_name'])
+
+# FUNGSI UNTUK MEMUAT INDEKS PER TANGGAL
+@st.cache_resource
+def get_history_index(store_version, _store):
+    """
+    Memuat (atau membangun sekali) indeks kesamaan per musim dari seluruh
+    riwayat Player_Attributes.
+    """
+    return load_or_build_point_in_time_index(DEFAULT_DB_PATH, _store)
+
+# FUNGSI UNTUK MEMUAT INDEKS TRAJEKTORI RATING
+@st.cache_resource
+def get_trajectory_index(store_version, _store):
+    """
+    Memuat (atau membangun sekali) trajektori overall rating/potensi setiap pemain.
+    """
+    return load_or_build_trajectory_index(DEFAULT_DB_PATH, _store)
+
+# CACHE HASIL REKOMENDASI UNTUK SELURUH SESI
+@st.cache_resource
+def get_result_cache():
+    """
+    Cache LRU hasil rekomendasi yang dibagi semua sesi dalam satu proses.
+    """
+    return ResultCache(maxsize=512)
 
 # SISTEM REKOMENDASI
 
@@ -32,56 +76,38 @@ st.title("Sistem Rekomendasi Pemain Bola")
 st.write("Halaman ini menggunakan sistem rekomendasi Content-Based Filtering untuk menemukan pemain serupa berdasarkan atribut teknis mereka.")
 st.write("---")
 
-# Muat data pemain dari database SQLite
-player_df, player_attr_df = load_sql_data("database.sqlite")
-
-if player_df is not None and player_attr_df is not None:
-    # PRA-PEMROSESAN DATA
-    st.info("Memproses data pemain...")
-
-    # Gabungkan data pemain dan atribut, pilih atribut terbaru
-    latest_attr_df = player_attr_df.sort_values('date').drop_duplicates('player_api_id', keep='last')
-    combined_df = pd.merge(player_df, latest_attr_df, on='player_api_id', how='inner')
-
-    # Membuat kolom 'passing' baru yang hilang
-    combined_df['passing'] = (combined_df['short_passing'] + combined_df['long_passing']) / 2
-
-    # fitur numerik yang akan digunakan untuk rekomendasi
-    numeric_features = [
-        'overall_rating', 'potential', 'crossing', 'finishing', 'heading_accuracy',
-        'short_passing', 'volleys', 'dribbling', 'curve', 'free_kick_accuracy',
-        'long_passing', 'ball_control', 'acceleration', 'sprint_speed',
-        'agility', 'reactions', 'balance', 'shot_power', 'jumping',
-        'stamina', 'strength', 'long_shots', 'aggression', 'interceptions',
-        'positioning', 'passing', 'vision', 'penalties', 'marking',
-        'standing_tackle', 'sliding_tackle'
-    ]
-    
-    # Tangani missing values dengan median
-    for col in numeric_features:
-        combined_df[col].fillna(combined_df[col].median(), inplace=True)
-        
-    # Normalisasi data numerik
-    scaler = StandardScaler()
-    scaled_features = scaler.fit_transform(combined_df[numeric_features])
-    scaled_features_df = pd.DataFrame(scaled_features, columns=numeric_features)
-    
-    # Membuat vektor fitur
-    features_for_recommender = scaled_features_df.copy()
-    
-    # Menambahkan data non-numerik untuk pencarian
-    combined_df['full_name_and_id'] = combined_df['player_name'] + ' - ' + combined_df['player_api_id'].astype(str)
-    
-    st.success("Data pemain berhasil dimuat dan diproses!")
+# Buka artefak rekomendasi yang sudah dihitung dari database SQLite
+try:
+    store = get_feature_store(DEFAULT_DB_PATH, database_signature(DEFAULT_DB_PATH))
+except FileNotFoundError:
+    st.error("File 'database.sqlite' tidak ditemukan. Pastikan file ada di folder Data/.")
+    store = None
+
+if store is not None:
+    combined_df = store.players
+    # Vektor fitur yang sudah dinormalisasi (L2) untuk cosine similarity
+    features_for_recommender = store.normalized
 
     # SISTEM REKOMENDASI INTERAKTIF
     st.subheader("Pilih Pemain Acuan")
     
-    # Pilihan pemain
-    player_names = combined_df['full_name_and_id'].tolist()
-    # Mengubah st.selectbox untuk memungkinkan pencarian
+    # Cari pemain di server; hanya kandidat terbaik yang dikirim ke browser
+    name_index = get_name_search_index(store.version, store)
+    search_query = st.text_input(
+        "Ketik nama pemain yang ingin Anda cari kesamaannya:",
+        placeholder="Contoh: Messi, Muller, Ze Roberto"
+    )
+    if search_query:
+        matches = name_index.search(search_query, limit=20)
+        player_names = combined_df['full_name_and_id'].iloc[[idx for idx, _ in matches]].tolist()
+    else:
+        # Tanpa kata kunci tampilkan pemain dengan rating tertinggi
+        player_names = combined_df.nlargest(20, 'overall_rating')['full_name_and_id'].tolist()
+
+    if search_query and not player_names:
+        st.warning(f"Tidak ada pemain yang cocok dengan '{search_query}'.")
     player_to_compare = st.selectbox(
-        "Pilih pemain yang ingin Anda cari kesamaannya (Anda bisa mengetik nama di sini):",
+        "Pilih pemain acuan:",
         options=player_names
     )
 
@@ -90,33 +116,262 @@ if player_df is not None and player_attr_df is not None:
         min_value=1, max_value=20, value=5
     )
 
+    # Pilihan mesin pencarian: eksak atau indeks aproksimasi (ANN)
+    search_engine = st.radio(
+        "Mesin pencarian:",
+        ("Eksak", "Indeks ANN (IVF)", "Terkuantisasi (int8)", "Arketipe (cluster-pruned)"),
+        horizontal=True
+    )
+    if search_engine == "Indeks ANN (IVF)":
+        n_probe = st.slider(
+            "Jumlah cluster yang diperiksa (recall vs. kecepatan):",
+            min_value=1, max_value=64, value=8
+        )
+    if search_engine == "Arketipe (cluster-pruned)":
+        n_archetype_lists = store.archetypes.index.n_lists
+        if n_archetype_lists <= 1:
+            # Database kecil hanya punya satu arketipe: slider tidak bisa dibuat (min = max)
+            n_archetype_clusters = 1
+        else:
+            n_archetype_clusters = st.slider(
+                "Jumlah arketipe terdekat yang diperiksa:",
+                min_value=1, max_value=n_archetype_lists, value=min(3, n_archetype_lists)
+            )
+
+    # Filter atribut diterapkan lewat bitmap sebelum penilaian kesamaan
+    with st.expander("Filter pemain"):
+        foot_choice = st.radio("Kaki utama:", ("Semua", "Kiri", "Kanan"), horizontal=True)
+        min_overall = st.slider("Rating keseluruhan minimal:", min_value=0, max_value=99, value=0)
+        min_potential = st.slider("Potensi minimal:", min_value=0, max_value=99, value=0)
+        potential_above_overall = st.checkbox("Potensi lebih tinggi dari rating saat ini")
+    preferred_foot = {"Kiri": "left", "Kanan": "right"}.get(foot_choice)
+    candidates = store.filters.candidates(
+        preferred_foot=preferred_foot,
+        min_overall=min_overall,
+        min_potential=min_potential,
+        potential_above_overall=potential_above_overall
+    )
+
+    # Bobot per atribut diterapkan saat query, tanpa menghitung ulang scaler
+    with st.expander("Bobot atribut"):
+        st.write("Naikkan bobot atribut yang paling penting (misalnya 2 = dua kali lebih diperhatikan).")
+        weight_columns = st.columns(3)
+        attribute_weights = {}
+        for i, feature in enumerate(NUMERIC_FEATURES):
+            with weight_columns[i % 3]:
+                attribute_weights[feature] = st.slider(
+                    feature.replace('_', ' ').title(),
+                    min_value=0.0, max_value=3.0, value=1.0, step=0.5,
+                    key=f"weight_{feature}"
+                )
+    try:
+        weights = weight_vector(attribute_weights)
+    except ValueError as e:
+        st.warning(str(e))
+        st.stop()
+    use_weights = bool((weights != 1).any())
+
+    # Mode point-in-time: bandingkan atribut pemain sebagaimana pada musim tertentu
+    use_history = st.checkbox("Gunakan atribut pada musim tertentu (point-in-time)")
+    if use_history:
+        history_index = get_history_index(store.version, store)
+        as_of = st.selectbox(
+            "Atribut per tanggal:",
+            options=history_index.cutoffs[::-1]
+        )
+
+    def find_recommendations(player_id_to_compare, player_idx):
+        """
+        Menjalankan query rekomendasi sesuai pilihan mesin, filter, bobot,
+        dan mode point-in-time. Mengembalikan dict berisi indeks pemain,
+        atribut penentu setiap hasil, serta rating dan tanggal snapshot
+        (hanya pada mode point-in-time).
+        """
+        history_ratings, snapshot_date = None, None
+        query_vector, feature_weights = features_for_recommender[player_idx], None
+
+        # Hitung Cosine Similarity hanya untuk pemain yang dipilih
+        # dan ambil top N rekomendasi (selain pemain itu sendiri)
+        if use_history:
+            # Filter rating dan bobot memakai atribut pada tanggal snapshot; kaki utama dari data terbaru
+            foot_rows = store.filters.candidates(preferred_foot=preferred_foot)
+            feature_weights = weights if use_weights else None
+            history_rows, _, snapshot_date, query_row = history_index.similar(
+                player_id_to_compare, as_of, num_recommendations, weights=feature_weights,
+                player_ids=None if foot_rows is None else store.players['player_api_id'].to_numpy()[foot_rows],
+                min_overall=min_overall, min_potential=min_potential,
+                potential_above_overall=potential_above_overall
+            )
+            player_indices, found = store.indices_of(history_index.row_player_ids[history_rows])
+            # Hanya pemain yang ada di feature store yang bisa ditampilkan
+            history_rows, player_indices = history_rows[found], player_indices[found]
+            history_ratings = np.asarray(history_index.row_ratings[history_rows])
+            query_vector, result_vectors = history_index.row_vectors[query_row], history_index.row_vectors[history_rows]
+        elif use_weights:
+            player_indices, _ = top_k_weighted_similar(
+                store.features, player_idx, weights, num_recommendations, candidates=candidates
+            )
+            query_vector, result_vectors = store.features[player_idx], store.features[player_indices]
+            feature_weights = weights
+        else:
+            if candidates is not None:
+                player_indices, _ = top_k_similar_among(features_for_recommender, player_idx, candidates, num_recommendations)
+            elif search_engine == "Indeks ANN (IVF)":
+                player_index = get_player_index(store.version, store)
+                player_indices, _ = player_index.search(
+                    features_for_recommender[player_idx], num_recommendations,
+                    n_probe=n_probe, exclude=player_idx
+                )
+            elif search_engine == "Arketipe (cluster-pruned)":
+                player_indices, _ = store.archetypes.search(
+                    features_for_recommender[player_idx], num_recommendations,
+                    n_clusters=n_archetype_clusters, exclude=player_idx
+                )
+            elif search_engine == "Terkuantisasi (int8)":
+                player_indices, _ = top_k_similar_quantized(
+                    store.quantized, features_for_recommender, player_idx, num_recommendations
+                )
+            else:
+                player_indices, _ = top_k_similar(features_for_recommender, player_idx, num_recommendations)
+            result_vectors = features_for_recommender[player_indices]
+
+        # Atribut penentu: kontribusi per fitur, dihitung untuk semua hasil sekaligus
+        contributions = similarity_contributions(query_vector, result_vectors, feature_weights)
+        return {
+            'player_indices': player_indices,
+            'contributions': top_contributions(contributions, NUMERIC_FEATURES),
+            'history_ratings': history_ratings,
+            'snapshot_date': snapshot_date,
+        }
+
+    result_cache = get_result_cache()
+
     if st.button("Cari Rekomendasi"):
         if player_to_compare:
             # Dapatkan indeks pemain yang dipilih
             player_id_to_compare = int(player_to_compare.split(' - ')[-1])
-            player_idx = combined_df[combined_df['player_api_id'] == player_id_to_compare].index[0]
-            
-            # Hitung Cosine Similarity
-            cosine_sim = cosine_similarity(features_for_recommender)
-            sim_scores = list(enumerate(cosine_sim[player_idx]))
-            
-            # Urutkan berdasarkan skor kesamaan
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-            
-            # Dapatkan top N rekomendasi (selain pemain itu sendiri)
-            sim_scores = sim_scores[1:num_recommendations + 1]
-            player_indices = [i[0] for i in sim_scores]
-            
-            recommended_players = combined_df.iloc[player_indices]
-            
-            st.subheader(f"Pemain yang direkomendasikan untuk {player_to_compare.split(' - ')[0]}:")
-            
-            # Tampilkan hasil
-            display_df = recommended_players[['player_name', 'overall_rating', 'potential', 'preferred_foot']].copy()
-            display_df.rename(columns={
-                'player_name': 'Nama Pemain',
-                'overall_rating': 'Rating Keseluruhan',
-                'potential': 'Potensi',
-                'preferred_foot': 'Kaki Utama'
-            }, inplace=True)
-            st.dataframe(display_df)
\ No newline at end of file
+            player_idx = store.index_of(player_id_to_compare)
+
+            # Query identik (pemain, k, mesin, filter, bobot) diambil dari cache
+            query_key = query_signature(
+                player_api_id=player_id_to_compare,
+                k=num_recommendations,
+                engine=search_engine,
+                n_probe=n_probe if search_engine == "Indeks ANN (IVF)" else None,
+                n_clusters=n_archetype_clusters if search_engine == "Arketipe (cluster-pruned)" else None,
+                filters=(foot_choice, min_overall, min_potential, potential_above_overall),
+                weights=weights if use_weights else None,
+                as_of=as_of if use_history else None
+            )
+            try:
+                result = result_cache.get_or_compute(
+                    store.version, query_key,
+                    lambda: find_recommendations(player_id_to_compare, player_idx)
+                )
+            except KeyError:
+                st.warning("Pemain ini belum memiliki atribut pada tanggal tersebut.")
+                st.stop()
+
+            # Simpan hasil di sesi agar tetap tampil saat halaman di-rerun
+            st.session_state['recommendation'] = (store.version, player_to_compare, result)
+
+    if st.session_state.get('recommendation', (None,))[0] == store.version:
+        _, recommended_for, result = st.session_state['recommendation']
+
+        recommended_players = combined_df.iloc[result['player_indices']].copy()
+        if result['history_ratings'] is not None:
+            # Tampilkan rating sebagaimana tercatat pada tanggal tersebut
+            recommended_players[['overall_rating', 'potential']] = result['history_ratings']
+            st.caption(f"Atribut per {result['snapshot_date']}.")
+        recommended_players['top_attributes'] = [
+            ", ".join(f"{name.replace('_', ' ')} ({value:+.2f})" for name, value in row)
+            for row in result['contributions']
+        ]
+
+        st.subheader(f"Pemain yang direkomendasikan untuk {recommended_for.split(' - ')[0]}:")
+
+        # Tampilkan hasil
+        display_df = recommended_players[['player_name', 'overall_rating', 'potential', 'preferred_foot', 'top_attributes']].copy()
+        display_df.rename(columns={
+            'player_name': 'Nama Pemain',
+            'overall_rating': 'Rating Keseluruhan',
+            'potential': 'Potensi',
+            'preferred_foot': 'Kaki Utama',
+            'top_attributes': 'Atribut Penentu'
+        }, inplace=True)
+        st.dataframe(display_df)
+
+    cache_stats = result_cache.stats()
+    st.caption(
+        f"Cache rekomendasi: {cache_stats['size']}/{cache_stats['maxsize']} entri, "
+        f"{cache_stats['hits']} hit, {cache_stats['misses']} miss."
+    )
+
+    # PEMAIN DENGAN PERKEMBANGAN SERUPA (DTW atas riwayat rating)
+    st.write("---")
+    st.subheader("Pemain dengan Perkembangan Serupa")
+    st.write("Membandingkan perkembangan Rating Keseluruhan dan Potensi pemain acuan dari waktu ke waktu dengan semua pemain lain.")
+    if st.button("Cari Perkembangan Serupa") and player_to_compare:
+        trajectory_index = get_trajectory_index(store.version, store)
+        player_id_to_compare = int(player_to_compare.split(' - ')[-1])
+        try:
+            similar_ids, distances, search_stats = result_cache.get_or_compute(
+                store.version,
+                query_signature(trajectory_of=player_id_to_compare, k=num_recommendations),
+                lambda: trajectory_index.search(player_id_to_compare, num_recommendations)
+            )
+            st.session_state['trajectory'] = (store.version, player_id_to_compare, similar_ids, distances, search_stats)
+        except KeyError:
+            # Pemain tanpa snapshot overall rating/potensi yang valid tidak punya trajektori
+            st.session_state.pop('trajectory', None)
+            st.warning("Pemain ini belum memiliki riwayat rating untuk dibandingkan.")
+
+    if st.session_state.get('trajectory', (None,))[0] == store.version:
+        _, trajectory_player, similar_ids, distances, search_stats = st.session_state['trajectory']
+        trajectory_index = get_trajectory_index(store.version, store)
+        similar_players = combined_df.iloc[store.indices_of(similar_ids)[0]]
+
+        trajectory_df = pd.DataFrame({
+            'Nama Pemain': similar_players['player_name'].to_numpy(),
+            'Jumlah Snapshot': [len(trajectory_index.trajectory(player_id)) for player_id in similar_ids],
+            'Jarak DTW': np.round(distances, 2),
+        })
+        st.dataframe(trajectory_df, hide_index=True)
+        st.caption(
+            f"DTW dihitung untuk {search_stats['dtw_computed']} dari {search_stats['candidates']} pemain "
+            f"({search_stats['pruned_by_lower_bound']} dipangkas oleh batas bawah, "
+            f"{search_stats['dtw_abandoned']} dihentikan lebih awal)."
+        )
+
+        # Bandingkan trajektori overall rating pemain acuan dengan 3 pemain teratas
+        chart_ids = [trajectory_player] + list(similar_ids[:3])
+        chart_names = combined_df.iloc[store.indices_of(np.array(chart_ids))[0]]['full_name_and_id'].tolist()
+        chart_df = pd.DataFrame({
+            name: pd.Series(trajectory_index.trajectory(player_id)[:, 0])
+            for name, player_id in zip(chart_names, chart_ids)
+        })
+        chart_df.index.name = "Snapshot ke-"
+        st.line_chart(chart_df)
+
+    # JELAJAHI ARKETIPE PEMAIN (hasil clustering yang sudah disimpan di feature store)
+    st.write("---")
+    st.subheader("Jelajahi Arketipe Pemain")
+    archetype_info = store.archetypes.info['archetypes']
+    selected_archetype = st.selectbox(
+        "Pilih arketipe:",
+        options=range(len(archetype_info)),
+        format_func=lambda i: f"{i + 1}. {archetype_info[i]['name']} ({archetype_info[i]['size']} pemain)"
+    )
+    archetype = archetype_info[selected_archetype]
+    st.write("Atribut paling menonjol: " + ", ".join(name.replace('_', ' ') for name in archetype['top_attributes']))
+    st.bar_chart(pd.Series(archetype['profile'], index=NUMERIC_FEATURES, name="Rata-rata (z-score)"))
+
+    members = combined_df.iloc[store.archetypes.members(selected_archetype)]
+    members_df = members.nlargest(20, 'overall_rating')[['player_name', 'overall_rating', 'potential', 'preferred_foot']]
+    members_df.rename(columns={
+        'player_name': 'Nama Pemain',
+        'overall_rating': 'Rating Keseluruhan',
+        'potential': 'Potensi',
+        'preferred_foot': 'Kaki Utama'
+    }, inplace=True)
+    st.dataframe(members_df)
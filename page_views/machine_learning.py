@@ -1,80 +1,142 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+import matplotlib.pyplot as plt
+import seaborn as sns
 from sklearn.metrics import accuracy_score, confusion_matrix, mean_squared_error, r2_score
-from sklearn.preprocessing import LabelEncoder
+from ml_pipeline.cache import DiskCache, cache_key, content_hash
+from ml_pipeline.incremental import INCREMENTAL_PARAMS, needs_out_of_core
+from ml_pipeline.ingest import INGEST_FORMAT_VERSION, ColumnarDataset, ingest_csv
+from ml_pipeline.jobs import JobManager
+from ml_pipeline.preprocess import preprocess_dataset, read_dataset
+from ml_pipeline.training import MODEL_PARAMS
 
 
-# FUNGSI UNTUK MEMUAT DAN MEMPROSES DATA
+# CACHE ARTEFAK DI DISK (DIBAGI SEMUA SESI)
 @st.cache_resource
-def load_and_preprocess_data(uploaded_file, target_column, problem_type):
+def get_disk_cache():
     """
-    Memuat data, melakukan pra-pemrosesan generik, dan membagi data.
+    Cache artefak pipeline di disk, dengan kunci hash isi file yang diunggah.
     """
-    try:
-        if uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
-        elif uploaded_file.name.endswith('.xlsx'):
-            df = pd.read_excel(uploaded_file)
-        else:
-            st.error("Format file tidak didukung. Mohon unggah file .csv atau .xlsx.")
-            return None, None, None, None, None
-
-        if target_column not in df.columns:
-            st.error(f"Kolom target '{target_column}' tidak ditemukan di dataset.")
-            return None, None, None, None, None
+    return DiskCache()
 
-        # PRA-PEMROSESAN OTOMATIS
-        # Pisahkan fitur dan target
-        X = df.drop(columns=[target_column])
-        y = df[target_column]
+# FUNGSI UNTUK MENGHITUNG HASH FILE YANG DIUNGGAH
+def uploaded_file_hash(uploaded_file):
+    """
+    Hash isi file yang diunggah. Disimpan per file_id di sesi agar file
+    besar tidak di-hash ulang setiap rerun.
+    """
+    hashes = st.session_state.setdefault('uploaded_file_hashes', {})
+    if uploaded_file.file_id not in hashes:
+        hashes[uploaded_file.file_id] = content_hash(uploaded_file)
+    return hashes[uploaded_file.file_id]
 
-        # Inisialisasi dictionary untuk menyimpan LabelEncoder
-        label_encoders = {}
-        
-        # Tangani nilai yang hilang dan encode kolom kategorikal
-        for col in X.columns:
-            if X[col].dtype == 'object':
-                le = LabelEncoder()
-                # Tangani NaN sebelum encoding
-                X[col].fillna('missing', inplace=True)
-                X[col] = le.fit_transform(X[col])
-                label_encoders[col] = le
-            else:
-                # Isi nilai numerik yang hilang dengan median
-                X[col].fillna(X[col].median(), inplace=True)
-        
-        # Tangani nilai yang hilang di kolom target (jika ada)
-        if problem_type == 'Klasifikasi':
-            if y.dtype == 'object':
-                le = LabelEncoder()
-                y.fillna(y.mode()[0], inplace=True)
-                y = le.fit_transform(y)
-                label_encoders[target_column] = le
-        elif problem_type == 'Regresi':
-            if y.dtype in ['int64', 'float64']:
-                y.fillna(y.median(), inplace=True)
-            
-        return X, y, df, label_encoders, y.dtype
+# FUNGSI UNTUK MEMUAT DATASET CSV KOLUMNAR
+@st.cache_resource
+def load_columnar_dataset(dataset_key, target_column, problem_type, _uploaded_file):
+    """
+    CSV dibaca per chunk dan disimpan kolumnar di disk (memori tetap kecil).
+    Mengembalikan ColumnarDataset, atau None jika file tidak bisa diproses.
+    """
+    try:
+        path = get_disk_cache().get_or_build_dir(
+            dataset_key,
+            lambda tmp_path: ingest_csv(_uploaded_file, target_column, problem_type, tmp_path)
+        )
+        return ColumnarDataset(path)
+    except ValueError as e:
+        st.error(str(e))
+    except Exception as e:
+        st.error(f"Terjadi kesalahan saat memuat atau memproses data: {e}")
+    return None
 
+# FUNGSI UNTUK MEMUAT DAN MEMPROSES DATA
+@st.cache_resource
+def load_and_preprocess_data(dataset_key, file_name, target_column, problem_type, _uploaded_file):
+    """
+    Memuat data, melakukan pra-pemrosesan generik, dan membagi data.
+    Hasil disimpan di disk dengan kunci hash isi file, kolom target, dan
+    jenis masalah, sehingga file yang sama tidak diproses ulang di sesi lain.
+    """
+    try:
+        if file_name.endswith('.csv'):
+            dataset = load_columnar_dataset(dataset_key, target_column, problem_type, _uploaded_file)
+            if dataset is None:
+                return None, None, None
+            return dataset.to_training_data()
+        return get_disk_cache().get_or_compute(
+            dataset_key,
+            lambda: preprocess_dataset(read_dataset(_uploaded_file.getvalue(), file_name), target_column, problem_type)
+        )
+    except ValueError as e:
+        st.error(str(e))
     except Exception as e:
         st.error(f"Terjadi kesalahan saat memuat atau memproses data: {e}")
-        return None, None, None, None, None
+    return None, None, None
 
-# FUNGSI UNTUK MELATIH MODEL
+# PENGELOLA JOB PELATIHAN DI LATAR BELAKANG
 @st.cache_resource
-def train_model(X, y, problem_type):
+def get_job_manager():
     """
-    Melatih model yang sesuai berdasarkan jenis masalah.
+    Thread pool pelatihan yang dibagi semua sesi dalam satu proses.
     """
-    if problem_type == 'Klasifikasi':
-        model = RandomForestClassifier(n_estimators=100, random_state=42)
-    elif problem_type == 'Regresi':
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
-    
-    model.fit(X, y)
-    return model
+    return JobManager()
+
+# FUNGSI UNTUK MEMUAT MODEL YANG SUDAH DILATIH
+@st.cache_resource
+def load_trained_model(model_key):
+    """
+    Memuat (model, laporan pelatihan) dari disk. Jika belum ada, KeyError
+    dilempar (dan tidak di-cache) sehingga pemanggilan berikutnya memeriksa ulang.
+    """
+    cached = get_disk_cache().get(model_key)
+    if cached is None:
+        raise KeyError(model_key)
+    return cached
+
+# FUNGSI UNTUK MEMULAI PELATIHAN DI LATAR BELAKANG
+def start_training(model_key, X, y, problem_type, dataset=None):
+    """
+    Menjadwalkan pelatihan (atau bergabung dengan job yang sama dari sesi
+    lain) dan mencatat job-nya di sesi. Jika `dataset` diberikan, model
+    dilatih out-of-core per chunk. Model disimpan ke disk setelah selesai.
+    """
+    disk_cache = get_disk_cache()
+    on_done = lambda result: disk_cache.put(model_key, result)
+    if dataset is not None:
+        job = get_job_manager().submit_incremental_training(model_key, dataset, on_done=on_done)
+    else:
+        job = get_job_manager().submit_training(model_key, X, y, problem_type, on_done=on_done)
+    st.session_state.setdefault('training_jobs', {})[model_key] = job.id
+    return job
+
+# TAMPILAN PROGRES PELATIHAN (diperbarui tanpa menjalankan ulang seluruh halaman)
+@st.fragment(run_every=1.0)
+def show_training_progress(job_id):
+    """
+    Menampilkan progres job dan tombol pembatalan. Setelah job berhenti,
+    seluruh halaman dijalankan ulang untuk menampilkan hasilnya.
+    """
+    job = get_job_manager().get(job_id)
+    if job is None or not job.active:
+        st.rerun()
+    if job.status == 'queued':
+        st.info(f"Pelatihan menunggu giliran (job {job.id}).")
+    else:
+        st.progress(job.progress, text=f"Melatih model... {job.completed}/{job.total or '?'} {job.unit} (job {job.id})")
+    st.caption("Anda dapat membuka halaman lain; pelatihan tetap berjalan dan hasilnya muncul saat kembali ke halaman ini.")
+    if st.button("Batalkan Pelatihan"):
+        get_job_manager().cancel(job.id)
+
+# FUNGSI UNTUK MENAMPILKAN CONFUSION MATRIX
+def plot_confusion_matrix(cm):
+    st.subheader("Confusion Matrix")
+    fig, ax = plt.subplots(figsize=(8, 6))
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax)
+    ax.set_title('Confusion Matrix')
+    ax.set_xlabel('Prediksi')
+    ax.set_ylabel('Aktual')
+    st.pyplot(fig)
 
 #  FUNGSI UNTUK MENAMPILKAN METRIK
 def display_metrics(y_true, y_pred, problem_type):
@@ -86,14 +148,7 @@ def display_metrics(y_true, y_pred, problem_type):
         accuracy = accuracy_score(y_true, y_pred)
         st.metric("Akurasi", f"{accuracy:.2f}")
 
-        st.subheader("Confusion Matrix")
-        cm = confusion_matrix(y_true, y_pred)
-        fig, ax = plt.subplots(figsize=(8, 6))
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax)
-        ax.set_title('Confusion Matrix')
-        ax.set_xlabel('Prediksi')
-        ax.set_ylabel('Aktual')
-        st.pyplot(fig)
+        plot_confusion_matrix(confusion_matrix(y_true, y_pred))
     
     elif problem_type == 'Regresi':
         st.subheader("Metrik Performa (Regresi)")
@@ -106,6 +161,43 @@ def display_metrics(y_true, y_pred, problem_type):
         with col2:
             st.metric("R-squared", f"{r2:.2f}")
 
+# FUNGSI UNTUK MENAMPILKAN METRIK PELATIHAN OUT-OF-CORE
+def display_out_of_core_metrics(report, problem_type):
+    """
+    Metrik model out-of-core pada baris holdout, dibandingkan dengan random
+    forest yang dilatih pada sampel baris (perkiraan random forest di memori).
+    """
+    holdout, forest = report['holdout'], report['forest_holdout']
+    st.caption(
+        f"Evaluasi pada {report['n_holdout']:,} baris holdout. Random forest pembanding dilatih pada "
+        f"{report['forest_sample_rows']:,} dari {report['n_train']:,} baris latih, jadi skornya adalah "
+        "perkiraan (cenderung lebih rendah) dari random forest yang dilatih di memori."
+    )
+    if problem_type == 'Klasifikasi':
+        st.subheader("Metrik Performa (Klasifikasi, Holdout)")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Akurasi Model Out-of-Core", f"{holdout['accuracy']:.2f}")
+        with col2:
+            st.metric(
+                "Akurasi Random Forest (Sampel)", f"{forest['accuracy']:.2f}",
+                delta=f"{forest['accuracy'] - holdout['accuracy']:+.2f}", delta_color='off'
+            )
+        plot_confusion_matrix(np.array(holdout['confusion_matrix']))
+
+    elif problem_type == 'Regresi':
+        st.subheader("Metrik Performa (Regresi, Holdout)")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("MSE Model Out-of-Core", f"{holdout['mse']:.2f}")
+            st.metric("R-squared Model Out-of-Core", f"{holdout['r2']:.2f}")
+        with col2:
+            st.metric("MSE Random Forest (Sampel)", f"{forest['mse']:.2f}")
+            st.metric(
+                "R-squared Random Forest (Sampel)", f"{forest['r2']:.2f}",
+                delta=f"{forest['r2'] - holdout['r2']:+.2f}", delta_color='off'
+            )
+
 # APLIKASI STREAMLIT UTAMA
 st.title("Pipeline Machine Learning Generik dengan Streamlit")
 st.write("Unggah dataset Anda dan tentukan jenis masalah untuk melatih model.")
@@ -123,17 +215,74 @@ if uploaded_file:
     target_column = st.text_input("3. Masukkan Nama Kolom Target:", placeholder="Contoh: Survived, Churn, MedHouseVal, house_price")
 
     if target_column:
-        X, y, df, label_encoders, y_dtype = load_and_preprocess_data(uploaded_file, target_column, problem_type)
+        # Kunci dataset: hash isi file + kolom target + jenis masalah + versi format ingestion
+        dataset_key = cache_key(
+            'dataset', file_hash=uploaded_file_hash(uploaded_file), target_column=target_column, problem_type=problem_type,
+            format_version=INGEST_FORMAT_VERSION
+        )
+        dataset = None
+        if uploaded_file.name.endswith('.csv'):
+            dataset = load_columnar_dataset(dataset_key, target_column, problem_type, uploaded_file)
+        out_of_core = dataset is not None and needs_out_of_core(dataset)
+
+        if out_of_core:
+            # Dataset terlalu besar untuk dimuat: hanya skema kolom yang dipakai di halaman ini
+            st.info(
+                f"Dataset berukuran {dataset.nbytes / 2**20:,.1f} MB ({dataset.n_rows:,} baris) melebihi batas memori, "
+                "sehingga model linear dilatih bertahap per chunk (out-of-core)."
+            )
+            X, y, label_encoders = dataset.features(0, 0), None, dataset.label_encoders()
+            model_key = cache_key('incremental-model', dataset_key=dataset_key, problem_type=problem_type, params=INCREMENTAL_PARAMS)
+        elif uploaded_file.name.endswith('.csv') and dataset is None:
+            # CSV gagal diproses; pesan error sudah ditampilkan
+            X = y = None
+        else:
+            X, y, label_encoders = load_and_preprocess_data(dataset_key, uploaded_file.name, target_column, problem_type, uploaded_file)
+            model_key = cache_key('trained-model', dataset_key=dataset_key, problem_type=problem_type, params=MODEL_PARAMS)
+
+        if X is not None and (y is not None or out_of_core):
+            # Latih model di latar belakang (atau ambil model yang sudah ada di disk)
+            training_dataset = dataset if out_of_core else None
+            try:
+                model, training_report = load_trained_model(model_key)
+            except KeyError:
+                job = get_job_manager().get(st.session_state.get('training_jobs', {}).get(model_key))
+                if job is None:
+                    job = start_training(model_key, X, y, problem_type, training_dataset)
+
+                if job.active:
+                    show_training_progress(job.id)
+                    st.stop()
+                elif job.status == 'done':
+                    model, training_report = job.result
+                else:
+                    if job.status == 'cancelled':
+                        st.warning("Pelatihan dibatalkan.")
+                    else:
+                        st.error(f"Pelatihan gagal: {job.error}")
+                    if st.button("Latih Ulang Model"):
+                        start_training(model_key, X, y, problem_type, training_dataset)
+                        st.rerun()
+                    st.stop()
 
-        if X is not None and y is not None:
-            # Latih model
-            with st.spinner('Melatih model...'):
-                model = train_model(X, y, problem_type)
             st.success('Model berhasil dilatih!')
-            
-            # Tampilkan metrik performa pada data pelatihan
-            y_pred = model.predict(X)
-            display_metrics(y, y_pred, problem_type)
+            if out_of_core:
+                st.caption(
+                    f"Pelatihan out-of-core: {training_report['epochs']} epoch atas chunk {training_report['chunk_rows']:,} baris, "
+                    f"fit {training_report['fit_seconds']:.1f} detik; random forest pembanding fit "
+                    f"{training_report['forest_fit_seconds']:.1f} detik."
+                )
+                display_out_of_core_metrics(training_report, problem_type)
+            else:
+                st.caption(
+                    f"Pelatihan memakai {training_report['cores_used']} dari {training_report['cores_total']} core "
+                    f"({training_report['other_jobs']} pelatihan lain berjalan bersamaan), "
+                    f"menunggu core {training_report['wait_seconds']:.1f} detik, fit {training_report['fit_seconds']:.1f} detik."
+                )
+
+                # Tampilkan metrik performa pada data pelatihan
+                y_pred = model.predict(X)
+                display_metrics(y, y_pred, problem_type)
 
             st.write("---")
             st.subheader("Prediksi Data Baru")
@@ -154,11 +303,14 @@ if uploaded_file:
                         # Pra-proses data input baru
                         for col in X.columns:
                             if col in df_new.columns:
-                                if X[col].dtype == 'object' and col in label_encoders:
-                                    df_new[col].fillna('missing', inplace=True)
-                                    df_new[col] = label_encoders[col].transform(df_new[col])
-                                elif X[col].dtype in ['int64', 'float64']:
-                                    df_new[col].fillna(df_new[col].median(), inplace=True)
+                                if col in label_encoders:
+                                    # Kategori yang tidak dikenal saat pelatihan diberi kode -1
+                                    codes = {str(category): code for code, category in enumerate(label_encoders[col].classes_)}
+                                    values = df_new[col].fillna('missing').astype(str)
+                                    df_new[col] = values.map(codes).fillna(-1).astype(np.int64)
+                                else:
+                                    values = pd.to_numeric(df_new[col], errors='coerce')
+                                    df_new[col] = values.fillna(values.median())
                             else:
                                 st.warning(f"Kolom '{col}' tidak ditemukan di dataset baru. Prediksi tidak dapat dilakukan.")
                                 st.stop()
@@ -0,0 +1,123 @@
+import streamlit as st
+from soccer.elo import load_or_update_team_ratings
+from soccer.match_events import load_or_build_match_events
+from soccer.store import DEFAULT_DB_PATH, database_signature
+from soccer.teams import (
+    average_possession, league_table, load_leagues, load_matches, load_teams, match_possession,
+    team_event_summary, team_results
+)
+
+# FUNGSI UNTUK MEMUAT DATA PERTANDINGAN
+@st.cache_data
+def load_match_data(db_path, db_signature):
+    """
+    Memuat liga, tim, dan hasil pertandingan (hanya kolom yang dibutuhkan).
+    Signature database membuat cache ikut diperbarui saat database berubah.
+    """
+    try:
+        return load_leagues(db_path), load_teams(db_path), team_results(load_matches(db_path))
+    except Exception as e:
+        st.error(f"Terjadi kesalahan saat memuat data pertandingan: {e}. Pastikan file '{db_path}' tersedia.")
+        return None, None, None
+
+# FUNGSI UNTUK MEMUAT TABEL EVENT PERTANDINGAN
+@st.cache_resource
+def get_match_events(db_path, db_signature):
+    """
+    Membuka tabel event (gol, tembakan, kartu, penguasaan bola) hasil parsing
+    XML tabel Match. Parsing hanya dilakukan sekali lalu disimpan di disk.
+    """
+    events = load_or_build_match_events(db_path)
+    return events.to_frame(), match_possession(events.to_frame(['possession']))
+
+# FUNGSI UNTUK MEMUAT RATING ELO TIM
+@st.cache_resource
+def get_team_ratings(db_path, db_signature):
+    """
+    Membuka riwayat rating Elo tim; hanya pertandingan baru yang dihitung.
+    """
+    return load_or_update_team_ratings(db_path)
+
+# ==================================
+# KONTEN HALAMAN: ANALITIK TIM & PERTANDINGAN
+# ==================================
+st.header("Analitik Tim & Pertandingan")
+st.write("Halaman ini merangkum performa tim dari database sepak bola Eropa: klasemen per musim, rekap hasil, serta statistik event pertandingan (gol, tembakan, kartu, penguasaan bola).")
+st.write("---")
+
+# Muat data pertandingan dan tabel event dari database SQLite
+try:
+    db_signature = database_signature(DEFAULT_DB_PATH)
+    leagues_df, teams_df, results_df = load_match_data(DEFAULT_DB_PATH, db_signature)
+except FileNotFoundError:
+    st.error("File 'database.sqlite' tidak ditemukan. Pastikan file ada di folder Data/.")
+    results_df = None
+
+if results_df is not None:
+    events_df, possession_df = get_match_events(DEFAULT_DB_PATH, db_signature)
+    team_ratings = get_team_ratings(DEFAULT_DB_PATH, db_signature)
+    team_names = teams_df.set_index('team_api_id')['team_long_name']
+
+    # PILIH LIGA DAN MUSIM
+    col1, col2 = st.columns(2)
+    with col1:
+        league_id = st.selectbox(
+            "Pilih liga:",
+            options=leagues_df['league_id'].tolist(),
+            format_func=lambda i: leagues_df.set_index('league_id').loc[i, 'league_name']
+        )
+    league_results = results_df[results_df['league_id'] == league_id]
+    with col2:
+        season = st.selectbox("Pilih musim:", options=sorted(league_results['season'].unique(), reverse=True))
+
+    # KLASEMEN
+    st.subheader(f"Klasemen Musim {season}")
+    table = league_table(results_df, league_id, season)
+    season_end = results_df.loc[(results_df['league_id'] == league_id) & (results_df['season'] == season), 'date'].max()
+    table['elo'] = team_ratings.ratings_as_of(season_end, table['team_api_id']).round(0).astype(int).to_numpy()
+    table.insert(0, 'Tim', table.pop('team_api_id').map(team_names))
+    table.index = range(1, len(table) + 1)
+    table.rename(columns={
+        'played': 'Main', 'won': 'Menang', 'drawn': 'Seri', 'lost': 'Kalah',
+        'goals_for': 'Gol', 'goals_against': 'Kebobolan', 'points': 'Poin', 'goal_difference': 'Selisih Gol',
+        'elo': 'Elo Akhir Musim'
+    }, inplace=True)
+    st.dataframe(table)
+
+    # REKAP TIM
+    st.write("---")
+    st.subheader("Rekap Tim")
+    season_results = league_results[league_results['season'] == season]
+    team_id = st.selectbox(
+        "Pilih tim:",
+        options=sorted(season_results['team_api_id'].unique(), key=lambda i: team_names.get(i, '')),
+        format_func=lambda i: team_names.get(i, str(i))
+    )
+    team_season = season_results[season_results['team_api_id'] == team_id]
+    summary = team_event_summary(events_df, team_season['match_api_id'], team_id)
+    possession = average_possession(team_season, possession_df)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Menang / Seri / Kalah", " / ".join(str(int((team_season['result'] == r).sum())) for r in 'WDL'))
+    col2.metric("Gol (Kebobolan)", f"{team_season['goals_for'].sum()} ({team_season['goals_against'].sum()})")
+    col3.metric("Tembakan Tepat Sasaran", summary['shots_on_target'])
+    col4.metric("Rata-rata Penguasaan Bola", f"{possession:.1f}%" if possession is not None else "-")
+    st.write(f"Kartu kuning: {summary['yellow_cards']} | Kartu merah: {summary['red_cards']}")
+
+    st.write("**Perkembangan rating Elo**")
+    elo_history = team_ratings.series(team_id).set_index('date')
+    st.line_chart(elo_history['elo'].rename("Elo"))
+
+    st.write("**Distribusi menit gol**")
+    st.bar_chart(summary['goals_by_minute'].rename("Jumlah gol"))
+
+    st.write("**Hasil pertandingan**")
+    team_matches = team_season[['date', 'venue', 'opponent_api_id', 'goals_for', 'goals_against', 'result']].copy()
+    team_matches['opponent_api_id'] = team_matches['opponent_api_id'].map(team_names)
+    team_matches['venue'] = team_matches['venue'].map({'home': 'Kandang', 'away': 'Tandang'})
+    team_matches['date'] = team_matches['date'].dt.date
+    team_matches.rename(columns={
+        'date': 'Tanggal', 'venue': 'Lokasi', 'opponent_api_id': 'Lawan',
+        'goals_for': 'Gol', 'goals_against': 'Kebobolan', 'result': 'Hasil'
+    }, inplace=True)
+    st.dataframe(team_matches, hide_index=True)
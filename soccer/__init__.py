@@ -0,0 +1,3 @@
+"""
+Modul pendukung untuk sistem rekomendasi pemain sepak bola.
+"""
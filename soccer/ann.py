@@ -0,0 +1,239 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from soccer.similarity import top_k_indices
+
+
+INDEX_FORMAT_VERSION = 1
+
+
+# K-MEANS SFERIS (PURE NUMPY)
+def assign_to_centroids(vectors, centroids, chunk_size=65536):
+    """
+    Menentukan centroid terdekat (inner product terbesar) untuk setiap vektor,
+    diproses per potongan agar memori tetap terbatas.
+    """
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk_size):
+        block = np.asarray(vectors[start:start + chunk_size], dtype=np.float32)
+        labels[start:start + chunk_size] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors, n_clusters, n_iter=20, sample_size=100_000, seed=42):
+    """
+    K-means pada vektor yang sudah dinormalisasi (cosine). Centroid dilatih
+    pada sampel data agar waktu build tetap wajar untuk jutaan baris.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    if n > sample_size:
+        sample = np.asarray(vectors[np.sort(rng.choice(n, sample_size, replace=False))], dtype=np.float32)
+    else:
+        sample = np.asarray(vectors, dtype=np.float32)
+    n_clusters = max(1, min(n_clusters, len(sample)))
+
+    centroids = sample[rng.choice(len(sample), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = assign_to_centroids(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        counts = np.bincount(labels, minlength=n_clusters)
+
+        # Cluster kosong diisi ulang dengan titik acak dari sampel
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = sums / norms
+    return centroids
+
+
+# INDEKS IVF (INVERTED FILE)
+class IVFIndex:
+    """
+    Indeks nearest-neighbour aproksimasi berbasis coarse quantizer (IVF).
+    Vektor dikelompokkan per centroid dan disimpan berurutan per list,
+    sehingga query hanya menilai `n_probe` list terdekat lalu me-ranking
+    ulang kandidatnya dengan skor cosine yang eksak.
+    """
+
+    def __init__(self, centroids, offsets, ids, vectors, meta=None):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+        self.vectors = vectors
+        self.meta = meta or {}
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, normalized, n_lists=None, n_iter=20, sample_size=100_000, seed=42):
+        """
+        Membangun indeks dari matriks fitur yang sudah dinormalisasi.
+        Jumlah list default ~ sqrt(N).
+        """
+        n = len(normalized)
+        if n_lists is None:
+            n_lists = max(1, int(np.sqrt(n)))
+        centroids = spherical_kmeans(normalized, n_lists, n_iter=n_iter, sample_size=sample_size, seed=seed)
+        return cls.from_assignments(normalized, centroids.astype(np.float32), assign_to_centroids(normalized, centroids))
+
+    @classmethod
+    def from_assignments(cls, normalized, centroids, labels):
+        """
+        Menyusun list IVF dari centroid dan label cluster yang sudah diketahui
+        (misalnya saat memperbarui sebagian baris tanpa melatih ulang k-means).
+        """
+        ids = np.argsort(labels, kind='stable').astype(np.int64)
+        counts = np.bincount(labels, minlength=len(centroids))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        vectors = np.asarray(normalized, dtype=np.float32)[ids]
+        return cls(centroids, offsets, ids, vectors)
+
+    def labels(self):
+        """
+        Label cluster untuk setiap baris asli (kebalikan dari susunan list).
+        """
+        labels = np.empty(len(self.ids), dtype=np.int32)
+        labels[self.ids] = np.repeat(np.arange(self.n_lists, dtype=np.int32), np.diff(self.offsets))
+        return labels
+
+    def save(self, index_dir, signature=None):
+        """
+        Menyimpan indeks sebagai file .npy di folder sementara lalu
+        me-rename-nya ke `index_dir`, sehingga file yang sedang di-memory-map
+        proses lain tidak pernah ditimpa dan indeks setengah jadi tidak
+        pernah terlihat.
+        """
+        tmp_dir = f"{index_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name in ('centroids', 'offsets', 'ids', 'vectors'):
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), getattr(self, name))
+        meta = {
+            'format_version': INDEX_FORMAT_VERSION,
+            'n_lists': int(self.n_lists),
+            'n_vectors': int(len(self.ids)),
+            'dim': int(self.vectors.shape[1]),
+            'signature': signature,
+        }
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        try:
+            os.rename(tmp_dir, index_dir)
+        except OSError:
+            existing = read_index_meta(index_dir)
+            if existing is not None and existing.get('signature') == signature:
+                # Proses lain sudah lebih dulu menyimpan indeks yang sama
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            else:
+                # Indeks lama dipindahkan dulu; proses yang masih memetakannya tetap aman
+                stale_dir = f"{index_dir}.stale-{os.getpid()}-{threading.get_ident()}"
+                os.rename(index_dir, stale_dir)
+                os.rename(tmp_dir, index_dir)
+                shutil.rmtree(stale_dir, ignore_errors=True)
+        self.meta = meta
+
+    @classmethod
+    def load(cls, index_dir, mmap=True):
+        """
+        Memuat indeks dari disk. Dengan mmap=True array dipetakan ke memori
+        (read-only) sehingga dapat dibagi antar proses.
+        """
+        meta = read_index_meta(index_dir)
+        if meta is None:
+            raise FileNotFoundError(f"Indeks tidak ditemukan di '{index_dir}'.")
+        mmap_mode = 'r' if mmap else None
+        arrays = {
+            name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ('centroids', 'offsets', 'ids', 'vectors')
+        }
+        return cls(meta=meta, **arrays)
+
+    def search(self, query, k, n_probe=8, exclude=None):
+        """
+        Mencari k vektor paling mirip dengan `query` (sudah dinormalisasi).
+        `n_probe` adalah pengatur recall/latensi: semakin besar, semakin
+        banyak list yang dinilai dan semakin mendekati hasil eksak.
+        Mengembalikan (indeks baris asli, skor).
+        """
+        query = np.asarray(query, dtype=np.float32)
+        n_probe = max(1, min(n_probe, self.n_lists))
+        probe = top_k_indices(self.centroids @ query, n_probe)
+
+        scores, ids = [], []
+        for list_id in probe:
+            start, end = self.offsets[list_id], self.offsets[list_id + 1]
+            if start == end:
+                continue
+            scores.append(self.vectors[start:end] @ query)
+            ids.append(self.ids[start:end])
+        if not scores:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = np.concatenate(scores)
+        ids = np.concatenate(ids)
+        if exclude is not None:
+            scores[ids == exclude] = -np.inf
+        best = top_k_indices(scores, k)
+        best = best[np.isfinite(scores[best])]
+        return ids[best], scores[best]
+
+
+def read_index_meta(index_dir):
+    """
+    Membaca metadata indeks, atau None jika indeks belum ada / formatnya lama.
+    """
+    try:
+        with open(os.path.join(index_dir, 'meta.json')) as f:
+            meta = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if meta.get('format_version') != INDEX_FORMAT_VERSION:
+        return None
+    return meta
+
+
+def load_or_build_index(normalized, signature, index_dir, **build_kwargs):
+    """
+    Memuat indeks dari disk jika signature-nya cocok dengan data saat ini,
+    jika tidak membangun ulang dan menyimpannya.
+    """
+    meta = read_index_meta(index_dir)
+    if meta is None or meta.get('signature') != signature:
+        IVFIndex.build(normalized, **build_kwargs).save(index_dir, signature)
+    return IVFIndex.load(index_dir)
+
+
+# EVALUASI RECALL / LATENSI
+def measure_recall(search, normalized, k=10, n_queries=200, seed=0):
+    """
+    Membandingkan hasil sebuah mesin pencarian dengan brute force pada
+    sejumlah query acak. `search(query_idx, k)` mengembalikan (indeks, skor)
+    tanpa pemain acuan, misalnya `lambda idx, k: index.search(normalized[idx], k, exclude=idx)`.
+    Mengembalikan (recall@k rata-rata, latensi rata-rata dalam milidetik).
+    """
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(len(normalized), min(n_queries, len(normalized)), replace=False)
+    hits, expected, elapsed = 0, 0, 0.0
+    for query_idx in queries:
+        exact = np.asarray(normalized @ np.asarray(normalized[query_idx], dtype=np.float32))
+        exact[query_idx] = -np.inf
+        truth = set(top_k_indices(exact, k).tolist())
+
+        start = time.perf_counter()
+        found, _ = search(query_idx, k)
+        elapsed += time.perf_counter() - start
+        hits += len(truth.intersection(np.asarray(found).tolist()))
+        expected += len(truth)
+    return hits / max(expected, 1), elapsed / max(len(queries), 1) * 1000
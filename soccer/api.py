@@ -0,0 +1,323 @@
+"""
+Layanan HTTP untuk sistem rekomendasi pemain.
+
+Bangun feature store terlebih dahulu, lalu jalankan beberapa worker:
+
+    python -m soccer.store
+    uvicorn soccer.api:app --workers 4
+
+Setiap worker membuka matriks fitur yang sama sebagai memmap read-only,
+sehingga halaman memorinya dibagi melalui page cache sistem operasi dan
+pemakaian memori tidak bertambah per worker.
+
+Setelah `python -m soccer.refresh` (atau build ulang store) mengaktifkan
+versi baru, setiap worker membaca ulang manifest paling lama
+STORE_CHECK_SECONDS kemudian dan beralih ke versi itu tanpa restart.
+"""
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+
+from soccer.ann import load_or_build_index
+from soccer.quantize import top_k_similar_quantized
+from soccer.search import NameSearchIndex
+from soccer.cache import ResultCache, query_signature
+from soccer.features import NUMERIC_FEATURES, weight_vector
+from soccer.similarity import (
+    similarity_contributions, top_contributions, top_k_similar, top_k_similar_among,
+    top_k_similar_batch, top_k_weighted_similar,
+)
+from soccer.store import DEFAULT_DB_PATH, DEFAULT_STORE_DIR, FeatureStore, open_feature_store, read_manifest
+
+
+DB_PATH = os.environ.get('SOCCER_DB_PATH', DEFAULT_DB_PATH)
+STORE_DIR = os.environ.get('SOCCER_STORE_DIR', DEFAULT_STORE_DIR)
+MAX_RECOMMENDATIONS = 100
+MAX_BATCH_PLAYERS = 10_000
+RESULT_CACHE_SIZE = int(os.environ.get('SOCCER_RESULT_CACHE_SIZE', 4096))
+STORE_CHECK_SECONDS = float(os.environ.get('SOCCER_STORE_CHECK_SECONDS', 5))
+
+
+# MODEL REQUEST / RESPONSE
+class PlayerSummary(BaseModel):
+    player_api_id: int
+    player_name: str
+    overall_rating: float
+    potential: float
+    preferred_foot: Optional[str] = None
+
+
+class AttributeContribution(BaseModel):
+    attribute: str
+    contribution: float
+
+
+class Recommendation(PlayerSummary):
+    similarity: float
+    top_attributes: List[AttributeContribution] = []
+
+
+class RecommendationResponse(BaseModel):
+    store_version: str
+    player: PlayerSummary
+    recommendations: List[Recommendation]
+
+
+class BatchRecommendationRequest(BaseModel):
+    player_api_ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_PLAYERS)
+    k: int = Field(5, ge=1, le=MAX_RECOMMENDATIONS)
+
+
+class SimilarPlayer(BaseModel):
+    player_api_id: int
+    similarity: float
+
+
+class PlayerRecommendations(BaseModel):
+    player_api_id: int
+    recommendations: List[SimilarPlayer]
+
+
+class BatchRecommendationResponse(BaseModel):
+    store_version: str
+    results: List[PlayerRecommendations]
+    missing: List[int]
+
+
+class PlayerSearchResponse(BaseModel):
+    query: str
+    results: List[PlayerSummary]
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    size: int
+    maxsize: int
+
+
+class Archetype(BaseModel):
+    id: int
+    name: str
+    size: int
+    top_attributes: List[str]
+
+
+class HealthResponse(BaseModel):
+    status: str
+    store_version: str
+    n_players: int
+    result_cache: CacheStats
+
+
+# APLIKASI
+@asynccontextmanager
+async def lifespan(app):
+    app.state.store = open_feature_store(DB_PATH, STORE_DIR)
+    app.state.store_checked_at = time.monotonic()
+    app.state.store_lock = threading.Lock()
+    app.state.ivf_index = None
+    app.state.name_index = None
+    app.state.result_cache = ResultCache(maxsize=RESULT_CACHE_SIZE)
+    yield
+
+
+app = FastAPI(title="Rekomendasi Pemain Bola", lifespan=lifespan)
+
+
+def player_summary(store, row_idx, model=PlayerSummary, **extra):
+    """
+    Mengubah satu baris tabel lookup pemain menjadi model response.
+    """
+    row = store.players.iloc[int(row_idx)]
+    foot = row['preferred_foot']
+    return model(
+        player_api_id=int(row['player_api_id']),
+        player_name=row['player_name'],
+        overall_rating=float(row['overall_rating']),
+        potential=float(row['potential']),
+        preferred_foot=foot if isinstance(foot, str) else None,
+        **extra
+    )
+
+
+def current_store(app_state):
+    """
+    Store aktif. Manifest dibaca ulang paling sering sekali per
+    STORE_CHECK_SECONDS; jika versi aktif berubah, store versi baru dibuka.
+    Cache hasil tidak perlu dikosongkan karena kuncinya memuat versi store.
+    """
+    if time.monotonic() - app_state.store_checked_at >= STORE_CHECK_SECONDS:
+        with app_state.store_lock:
+            if time.monotonic() - app_state.store_checked_at >= STORE_CHECK_SECONDS:
+                manifest = read_manifest(STORE_DIR)
+                if manifest is not None and manifest['version'] != app_state.store.version:
+                    version_dir = os.path.join(STORE_DIR, manifest['version'])
+                    if os.path.isdir(version_dir):
+                        app_state.store = FeatureStore(version_dir, manifest)
+                app_state.store_checked_at = time.monotonic()
+    return app_state.store
+
+
+def get_name_index(app_state, store):
+    """
+    Indeks pencarian nama untuk versi `store`, dibangun saat pertama kali dibutuhkan.
+    """
+    name_index = app_state.name_index
+    if name_index is None or name_index[0] != store.version:
+        name_index = (store.version, NameSearchIndex(store.players['player_name']))
+        app_state.name_index = name_index
+    return name_index[1]
+
+
+def get_ivf_index(app_state, store):
+    """
+    Memuat indeks IVF dari folder versi store saat pertama kali dibutuhkan.
+    """
+    ivf_index = app_state.ivf_index
+    if ivf_index is None or ivf_index.meta.get('signature') != store.version:
+        ivf_index = load_or_build_index(store.normalized, store.version, index_dir=os.path.join(store.path, 'ivf'))
+        app_state.ivf_index = ivf_index
+    return ivf_index
+
+
+def parse_weights(weights):
+    """
+    Mengurai parameter bobot "fitur:bobot,fitur:bobot" menjadi vektor bobot,
+    atau None jika tidak ada bobot.
+    """
+    if not weights:
+        return None
+    try:
+        parsed = {}
+        for item in weights.split(','):
+            name, sep, value = item.partition(':')
+            if not sep:
+                raise ValueError(f"'{item}' harus berformat fitur:bobot")
+            parsed[name.strip()] = float(value)
+        return weight_vector(parsed)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Parameter bobot tidak valid: {e}")
+
+
+@app.get('/health', response_model=HealthResponse)
+def health(request: Request):
+    store = current_store(request.app.state)
+    return HealthResponse(
+        status='ok', store_version=store.version, n_players=len(store),
+        result_cache=CacheStats(**request.app.state.result_cache.stats()),
+    )
+
+
+@app.get('/archetypes', response_model=List[Archetype])
+def list_archetypes(request: Request):
+    return [Archetype(**archetype) for archetype in current_store(request.app.state).archetypes.info['archetypes']]
+
+
+@app.get('/players/search', response_model=PlayerSearchResponse)
+def search_players(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=50),
+):
+    store = current_store(request.app.state)
+    matches = get_name_index(request.app.state, store).search(q, limit=limit)
+    return PlayerSearchResponse(query=q, results=[player_summary(store, idx) for idx, _ in matches])
+
+
+@app.get('/recommend/{player_api_id}', response_model=RecommendationResponse)
+def recommend(
+    request: Request,
+    player_api_id: int,
+    k: int = Query(5, ge=1, le=MAX_RECOMMENDATIONS),
+    engine: Literal['exact', 'ivf', 'int8', 'archetype'] = 'exact',
+    n_probe: int = Query(8, ge=1, le=1024),
+    preferred_foot: Optional[Literal['left', 'right']] = None,
+    min_overall: Optional[int] = Query(None, ge=0, le=100),
+    min_potential: Optional[int] = Query(None, ge=0, le=100),
+    potential_above_overall: bool = False,
+    weights: Optional[str] = Query(None, description="Bobot atribut, contoh: sprint_speed:2,acceleration:2"),
+):
+    store = current_store(request.app.state)
+    try:
+        player_idx = store.index_of(player_api_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Pemain {player_api_id} tidak ditemukan.")
+
+    weight_values = parse_weights(weights)
+    query_key = query_signature(
+        player_api_id=player_api_id, k=k, engine=engine,
+        n_probe=n_probe if engine in ('ivf', 'archetype') else None,
+        preferred_foot=preferred_foot, min_overall=min_overall, min_potential=min_potential,
+        potential_above_overall=potential_above_overall, weights=weight_values,
+    )
+
+    def compute():
+        candidates = store.filters.candidates(
+            preferred_foot=preferred_foot,
+            min_overall=min_overall,
+            min_potential=min_potential,
+            potential_above_overall=potential_above_overall,
+        )
+        if weight_values is not None:
+            indices, scores = top_k_weighted_similar(store.features, player_idx, weight_values, k, candidates=candidates)
+        elif candidates is not None:
+            indices, scores = top_k_similar_among(store.normalized, player_idx, candidates, k)
+        elif engine == 'ivf':
+            indices, scores = get_ivf_index(request.app.state, store).search(
+                store.normalized[player_idx], k, n_probe=n_probe, exclude=player_idx
+            )
+        elif engine == 'archetype':
+            indices, scores = store.archetypes.search(store.normalized[player_idx], k, n_clusters=n_probe, exclude=player_idx)
+        elif engine == 'int8':
+            indices, scores = top_k_similar_quantized(store.quantized, store.normalized, player_idx, k)
+        else:
+            indices, scores = top_k_similar(store.normalized, player_idx, k)
+
+        # Atribut penentu untuk semua hasil dalam satu operasi vektor
+        if weight_values is not None:
+            contributions = similarity_contributions(store.features[player_idx], store.features[indices], weight_values)
+        else:
+            contributions = similarity_contributions(store.normalized[player_idx], store.normalized[indices])
+        explanations = top_contributions(contributions, NUMERIC_FEATURES)
+
+        return RecommendationResponse(
+            store_version=store.version,
+            player=player_summary(store, player_idx),
+            recommendations=[
+                player_summary(
+                    store, idx, Recommendation, similarity=float(score),
+                    top_attributes=[AttributeContribution(attribute=name, contribution=value) for name, value in explanation],
+                )
+                for idx, score, explanation in zip(indices, scores, explanations)
+            ],
+        )
+
+    return request.app.state.result_cache.get_or_compute(store.version, query_key, compute)
+
+
+@app.post('/recommend/batch', response_model=BatchRecommendationResponse)
+def recommend_batch(request: Request, body: BatchRecommendationRequest):
+    store = current_store(request.app.state)
+    positions, found = store.indices_of(body.player_api_ids)
+    missing = [int(pid) for pid, ok in zip(body.player_api_ids, found) if not ok]
+
+    indices, scores = top_k_similar_batch(store.normalized, positions[found], body.k)
+    player_ids = store.players['player_api_id'].to_numpy()
+    results = [
+        PlayerRecommendations(
+            player_api_id=int(player_ids[query_idx]),
+            recommendations=[
+                SimilarPlayer(player_api_id=int(player_ids[idx]), similarity=float(score))
+                for idx, score in zip(row_indices, row_scores)
+            ],
+        )
+        for query_idx, row_indices, row_scores in zip(positions[found], indices, scores)
+    ]
+    return BatchRecommendationResponse(store_version=store.version, results=results, missing=missing)
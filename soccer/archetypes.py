@@ -0,0 +1,109 @@
+import json
+import os
+
+import numpy as np
+
+from soccer.ann import IVFIndex, assign_to_centroids, spherical_kmeans
+from soccer.features import NUMERIC_FEATURES
+
+
+ARCHETYPES_DIRNAME = 'archetypes'
+DEFAULT_N_ARCHETYPES = 12
+
+# Kelompok atribut untuk memberi nama arketipe berdasarkan profil centroid
+ARCHETYPE_GROUPS = {
+    "Penyerang finisher": ['finishing', 'positioning', 'volleys', 'shot_power', 'long_shots'],
+    "Target man / duel udara": ['heading_accuracy', 'jumping', 'strength', 'aggression'],
+    "Bek bertahan": ['marking', 'standing_tackle', 'sliding_tackle', 'interceptions'],
+    "Playmaker": ['short_passing', 'long_passing', 'passing', 'vision', 'ball_control'],
+    "Winger cepat": ['crossing', 'dribbling', 'acceleration', 'sprint_speed', 'agility'],
+    "Spesialis bola mati": ['free_kick_accuracy', 'curve', 'penalties'],
+}
+LOW_PROFILE_NAME = "Atribut lapangan rendah (mis. kiper)"
+
+
+# ARKETIPE PEMAIN
+class ArchetypeIndex:
+    """
+    Clustering k-means pemain yang dihitung sekali saat build feature store.
+    Dipakai untuk dua hal: penjelajahan arketipe, dan pencarian kesamaan yang
+    hanya menilai pemain pada beberapa cluster terdekat (cluster-pruned).
+    """
+
+    def __init__(self, index, info):
+        self.index = index
+        self.info = info
+
+    @property
+    def names(self):
+        return [archetype['name'] for archetype in self.info['archetypes']]
+
+    def members(self, archetype_id):
+        """
+        Indeks baris pemain yang termasuk dalam arketipe tertentu.
+        """
+        start, end = self.index.offsets[archetype_id], self.index.offsets[archetype_id + 1]
+        return np.asarray(self.index.ids[start:end])
+
+    def labels(self):
+        return self.index.labels()
+
+    def search(self, query, k, n_clusters=3, exclude=None):
+        """
+        Pencarian kesamaan yang hanya menilai `n_clusters` arketipe terdekat.
+        """
+        return self.index.search(query, k, n_probe=n_clusters, exclude=exclude)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, 'archetypes.json')) as f:
+            info = json.load(f)
+        return cls(IVFIndex.load(path), info)
+
+
+def describe_archetype(profile):
+    """
+    Memberi nama arketipe dari profil rata-rata fitur terstandardisasi.
+    """
+    profile = dict(zip(NUMERIC_FEATURES, profile))
+    group_scores = {
+        name: np.mean([profile[feature] for feature in features])
+        for name, features in ARCHETYPE_GROUPS.items()
+    }
+    best_group = max(group_scores, key=group_scores.get)
+    if group_scores[best_group] <= 0:
+        return LOW_PROFILE_NAME
+    return best_group
+
+
+def build_archetypes(path, normalized, features, n_archetypes=DEFAULT_N_ARCHETYPES, centroids=None, seed=42):
+    """
+    Melatih (atau memakai ulang `centroids`) k-means sferis pada vektor
+    pemain, lalu menyimpan cluster sebagai indeks IVF beserta nama dan
+    profil setiap arketipe di folder `path`.
+    """
+    if centroids is None:
+        centroids = spherical_kmeans(normalized, n_archetypes, seed=seed).astype(np.float32)
+    labels = assign_to_centroids(normalized, centroids)
+    index = IVFIndex.from_assignments(normalized, centroids, labels)
+    index.save(path)
+
+    # Profil arketipe: rata-rata fitur terstandardisasi anggotanya
+    counts = np.bincount(labels, minlength=len(centroids))
+    sums = np.zeros((len(centroids), features.shape[1]))
+    np.add.at(sums, labels, np.asarray(features, dtype=np.float64))
+    profiles = sums / np.maximum(counts, 1)[:, None]
+
+    archetypes = []
+    for archetype_id, profile in enumerate(profiles):
+        top = np.argsort(-profile)[:3]
+        archetypes.append({
+            'id': archetype_id,
+            'name': describe_archetype(profile),
+            'size': int(counts[archetype_id]),
+            'top_attributes': [NUMERIC_FEATURES[i] for i in top],
+            'profile': profile.round(4).tolist(),
+        })
+    with open(os.path.join(path, 'archetypes.json'), 'w') as f:
+        json.dump({'archetypes': archetypes}, f)
+    return ArchetypeIndex(index, {'archetypes': archetypes})
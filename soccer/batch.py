@@ -0,0 +1,41 @@
+import argparse
+import csv
+
+import numpy as np
+
+from soccer.similarity import top_k_similar_batch
+from soccer.store import DEFAULT_DB_PATH, DEFAULT_STORE_DIR, open_feature_store
+
+
+# EKSPOR DAFTAR PEMAIN SERUPA UNTUK SELURUH DATABASE
+def export_similar_players(store, output_path, k=10, batch_size=2048):
+    """
+    Menulis daftar "pemain serupa" untuk semua pemain ke file CSV
+    (player_api_id, rank, similar_player_api_id, similarity).
+    Pemain diproses per batch sehingga memori tetap terbatas.
+    """
+    player_ids = store.players['player_api_id'].to_numpy()
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['player_api_id', 'rank', 'similar_player_api_id', 'similarity'])
+        for start in range(0, len(store), batch_size):
+            query_indices = np.arange(start, min(start + batch_size, len(store)))
+            indices, scores = top_k_similar_batch(store.normalized, query_indices, k)
+            ranks = np.tile(np.arange(1, indices.shape[1] + 1), len(query_indices))
+            writer.writerows(zip(
+                np.repeat(player_ids[query_indices], indices.shape[1]).tolist(),
+                ranks.tolist(),
+                player_ids[indices.ravel()].tolist(),
+                np.round(scores.ravel(), 6).tolist(),
+            ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ekspor daftar pemain serupa untuk seluruh database.")
+    parser.add_argument('output', help="Path file CSV hasil")
+    parser.add_argument('--k', type=int, default=10, help="Jumlah pemain serupa per pemain")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="Path database SQLite")
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help="Folder artefak")
+    args = parser.parse_args()
+
+    export_similar_players(open_feature_store(args.db, args.store), args.output, k=args.k)
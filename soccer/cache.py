@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+# CACHE HASIL REKOMENDASI (LRU)
+class ResultCache:
+    """
+    Cache hasil query rekomendasi untuk seluruh proses, dengan eviksi LRU,
+    batas jumlah entri, dan penghitung hit/miss. Versi feature store
+    menjadi bagian kunci entri, sehingga request yang masih memakai versi
+    lama saat pergantian store tidak menghapus entri versi baru; entri
+    versi lama tersingkir dengan sendirinya oleh LRU.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, version, key, compute):
+        """
+        Mengembalikan hasil yang tersimpan untuk `key`, atau menjalankan
+        `compute()` lalu menyimpannya. Perhitungan dilakukan di luar lock.
+        """
+        entry_key = (version, key)
+        with self._lock:
+            self.version = version
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return self._entries[entry_key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[entry_key] = value
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'version': self.version,
+        }
+
+
+def query_signature(**params):
+    """
+    Kunci cache yang stabil dari parameter query. Array (misalnya vektor
+    bobot) diubah menjadi tuple yang dibulatkan.
+    """
+    items = []
+    for name, value in sorted(params.items()):
+        if isinstance(value, np.ndarray):
+            value = tuple(np.round(value.astype(float), 6).tolist())
+        items.append((name, value))
+    return tuple(items)
@@ -0,0 +1,168 @@
+import os
+import re
+import sqlite3
+import threading
+from urllib.parse import quote
+
+import pandas as pd
+
+
+# Ukuran jendela mmap dan page cache per koneksi
+MMAP_SIZE = 256 << 20
+CACHE_SIZE_KIB = 64 << 10
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+# SIGNATURE DATABASE
+def database_signature(db_path):
+    """
+    Signature murah dari file database (mtime dan ukuran) untuk mendeteksi
+    perubahan tanpa membaca isi file.
+    """
+    stat = os.stat(db_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_only_uri(db_path, immutable=True):
+    """
+    URI SQLite read-only. Dengan `immutable=1` SQLite tidak memakai lock
+    maupun memeriksa perubahan file, sehingga banyak pembaca tidak saling
+    menunggu. Hanya aman jika file tidak diubah selama koneksi terbuka.
+    """
+    uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+    return uri + "&immutable=1" if immutable else uri
+
+
+def connect_read_only(db_path, immutable=True):
+    """
+    Membuka koneksi read-only dengan pragma mmap dan cache yang lebih besar.
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database tidak ditemukan: {db_path}")
+    conn = sqlite3.connect(read_only_uri(db_path, immutable), uri=True, check_same_thread=False)
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+# POOL KONEKSI PER THREAD
+class ConnectionPool:
+    """
+    Menyimpan satu koneksi read-only per thread untuk setiap database.
+    Koneksi dibuka ulang otomatis ketika signature file berubah, sehingga
+    mode immutable tidak pernah membaca versi database yang sudah usang.
+    """
+
+    def __init__(self, immutable=True):
+        self.immutable = immutable
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+
+    def _connections(self):
+        if not hasattr(self._local, 'connections'):
+            self._local.connections = {}
+        return self._local.connections
+
+    def get(self, db_path):
+        """
+        Koneksi milik thread ini untuk `db_path`.
+        """
+        key = os.path.abspath(db_path)
+        signature = database_signature(db_path)
+        connections = self._connections()
+        cached = connections.get(key)
+        if cached is not None:
+            conn, cached_signature = cached
+            if cached_signature == signature:
+                return conn
+            self._discard(conn)
+
+        conn = connect_read_only(db_path, self.immutable)
+        connections[key] = (conn, signature)
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+        conn.close()
+
+    def close_all(self):
+        """
+        Menutup semua koneksi dari semua thread (mis. saat aplikasi berhenti).
+        """
+        with self._lock:
+            connections, self._all = self._all, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+_default_pool = ConnectionPool()
+
+
+def get_connection(db_path):
+    """
+    Koneksi read-only dari pool bawaan proses.
+    """
+    return _default_pool.get(db_path)
+
+
+# QUERY HELPER
+def query_df(db_path, sql, params=(), dtypes=None):
+    """
+    Menjalankan query lewat koneksi pool dan mengembalikan DataFrame.
+    `dtypes` (dict kolom -> dtype) diterapkan langsung pada hasil agar tipe
+    kolom tidak bergantung pada isi data.
+    """
+    df = pd.read_sql_query(sql, get_connection(db_path), params=params)
+    if dtypes:
+        df = df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
+    return df
+
+
+def query_rows(db_path, sql, params=()):
+    """
+    Menjalankan query lewat koneksi pool dan mengembalikan list tuple.
+    """
+    return get_connection(db_path).execute(sql, params).fetchall()
+
+
+def table_columns(db_path, table):
+    """
+    Daftar kolom sebuah tabel sesuai skema database.
+    """
+    _check_identifier(table)
+    return [row[1] for row in query_rows(db_path, f"PRAGMA table_info({table})")]
+
+
+def select_columns(db_path, table, columns=None, where=None, params=(), dtypes=None, order_by=None):
+    """
+    Query terproyeksi: hanya kolom `columns` dari `table` yang dibaca.
+    Nama tabel dan kolom divalidasi terhadap skema sebelum disisipkan ke SQL;
+    nilai filter selalu lewat `params`.
+    """
+    available = table_columns(db_path, table)
+    if not available:
+        raise ValueError(f"Tabel tidak ditemukan: {table}")
+    columns = available if columns is None else list(columns)
+    unknown = [col for col in columns + list(order_by or []) if col not in available]
+    if unknown:
+        raise ValueError(f"Kolom tidak dikenal pada {table}: {unknown}")
+
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if where:
+        sql += f" WHERE {where}"
+    if order_by:
+        sql += f" ORDER BY {', '.join(order_by)}"
+    return query_df(db_path, sql, params, dtypes)
+
+
+def _check_identifier(name):
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Nama tabel tidak valid: {name}")
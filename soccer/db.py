@@ -0,0 +1,174 @@
+import sqlite3
+
+import pandas as pd
+
+from soccer.connection import get_connection, query_df, query_rows
+from soccer.features import NUMERIC_FEATURES
+
+
+# Kolom atribut yang diambil dari database ('passing' diturunkan di pandas)
+ATTRIBUTE_COLUMNS = ['preferred_foot'] + [col for col in NUMERIC_FEATURES if col != 'passing']
+
+LATEST_ATTRIBUTES_INDEX = "idx_player_attributes_player_date"
+
+# Modulus checksum baris atribut (bilangan prima < 2^31 agar jumlahnya muat di INTEGER SQLite)
+CHECKSUM_MODULUS = 2147483647
+
+
+# INDEKS PENDUKUNG
+def ensure_latest_attributes_index(db_path):
+    """
+    Membuat indeks (player_api_id, date) pada Player_Attributes agar pemilihan
+    snapshot terbaru per pemain tidak perlu mengurutkan seluruh tabel.
+    Hanya dipanggil dari langkah build eksplisit (`python -m soccer.store
+    --create-index`): menulis indeks mengubah mtime, ukuran, dan hash file
+    yang dipakai untuk versi feature store, sehingga jalur baca tidak boleh
+    memanggilnya. Tanpa indeks query ROW_NUMBER tetap benar, hanya lebih lambat.
+    Koneksi tulis hanya dibuka jika indeks belum ada; jika database hanya
+    bisa dibaca, langkah ini dilewati.
+    """
+    exists = query_rows(
+        db_path, "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (LATEST_ATTRIBUTES_INDEX,)
+    )
+    if exists:
+        return
+    try:
+        conn = sqlite3.connect(db_path)
+    except sqlite3.OperationalError:
+        return
+    try:
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {LATEST_ATTRIBUTES_INDEX} "
+            "ON Player_Attributes (player_api_id, date DESC, id DESC)"
+        )
+        conn.commit()
+    except sqlite3.OperationalError:
+        pass
+    finally:
+        conn.close()
+
+
+def latest_player_attributes_query(columns=None, player_table=None):
+    """
+    Menyusun query yang memilih snapshot atribut terbaru per pemain,
+    menggabungkannya dengan tabel Player, dan hanya memproyeksikan kolom
+    yang dibutuhkan. Jika `player_table` diisi, hanya pemain yang ada di
+    tabel tersebut (kolom player_api_id) yang diproses.
+    """
+    columns = ATTRIBUTE_COLUMNS if columns is None else columns
+    select_cols = ", ".join(f"a.{col}" for col in columns)
+    player_filter = f"WHERE player_api_id IN (SELECT player_api_id FROM {player_table})" if player_table else ""
+    return f"""
+        WITH ranked AS (
+            SELECT id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY player_api_id ORDER BY date DESC, id DESC
+                   ) AS rn
+            FROM Player_Attributes
+            {player_filter}
+        )
+        SELECT p.player_api_id, p.player_name, a.date, {select_cols}
+        FROM ranked AS r
+        JOIN Player_Attributes AS a ON a.id = r.id
+        JOIN Player AS p ON p.player_api_id = a.player_api_id
+        WHERE r.rn = 1
+        ORDER BY p.player_api_id
+    """
+
+
+# MEMUAT ATRIBUT TERBARU PER PEMAIN
+def load_latest_player_attributes(db_path, columns=None, player_ids=None):
+    """
+    Memuat satu baris per pemain (atribut terbaru + nama) langsung dari
+    SQLite, tanpa menarik seluruh riwayat Player_Attributes ke pandas.
+    `player_ids` membatasi query pada sebagian pemain saja.
+    """
+    if player_ids is None:
+        return query_df(db_path, latest_player_attributes_query(columns))
+
+    # Daftar pemain dimuat ke tabel sementara agar tidak terbatas jumlah parameter;
+    # tabel dihapus lagi karena koneksi pool dipakai ulang
+    conn = get_connection(db_path)
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS selected_players (player_api_id INTEGER PRIMARY KEY)")
+    try:
+        conn.executemany(
+            "INSERT OR IGNORE INTO temp.selected_players VALUES (?)",
+            ((int(player_id),) for player_id in player_ids)
+        )
+        return pd.read_sql_query(latest_player_attributes_query(columns, 'temp.selected_players'), conn)
+    finally:
+        conn.execute("DROP TABLE temp.selected_players")
+        conn.commit()
+
+
+# PENANDA DATA YANG SUDAH DIPROSES
+def attribute_checksum_expression():
+    """
+    Ekspresi SQL checksum satu baris Player_Attributes atas id, pemain,
+    tanggal, dan kolom atribut yang dipakai feature store. Setiap kolom
+    diberi bobot berbeda dan hasilnya dikalikan faktor dari id, sehingga
+    perubahan nilai (UPDATE) pada baris mana pun mengubah jumlah checksum.
+    """
+    terms = [
+        "player_api_id",
+        "COALESCE(CAST(strftime('%s', date) AS INTEGER), 0) * 3",
+        "COALESCE(unicode(preferred_foot), 0) * 5 + COALESCE(length(preferred_foot), 0) * 7",
+    ]
+    terms += [
+        f"COALESCE(CAST({col} AS INTEGER), -1) * {(i + 1) * 7919 % 65521 + 11}"
+        for i, col in enumerate(ATTRIBUTE_COLUMNS) if col != 'preferred_foot'
+    ]
+    row_value = f"(({' + '.join(terms)}) % {CHECKSUM_MODULUS})"
+    return f"((id % 65521 + 1) * {row_value}) % {CHECKSUM_MODULUS}"
+
+
+def attribute_high_water_mark(db_path):
+    """
+    Id dan tanggal terbesar di Player_Attributes, jumlah baris, dan
+    checksum seluruh baris, dipakai untuk mendeteksi baris baru (dan
+    perubahan pada baris lama) pada refresh inkremental.
+    """
+    ((max_id, max_date, n_rows, checksum),) = query_rows(
+        db_path,
+        f"SELECT MAX(id), MAX(date), COUNT(*), TOTAL({attribute_checksum_expression()}) FROM Player_Attributes"
+    )
+    return {'max_id': max_id, 'max_date': max_date, 'n_rows': n_rows, 'checksum': int(checksum)}
+
+
+def load_changed_player_ids(db_path, high_water_mark):
+    """
+    Pemain yang memiliki baris atribut baru sejak `high_water_mark`
+    (id lebih besar atau tanggal lebih baru). Mengembalikan None jika baris
+    lama terhapus atau diubah (jumlah baris atau checksum berbeda) sehingga
+    perlu build ulang penuh.
+    """
+    ((n_old_rows, checksum),) = query_rows(
+        db_path,
+        f"SELECT COUNT(*), TOTAL({attribute_checksum_expression()}) FROM Player_Attributes WHERE id <= ?",
+        (high_water_mark['max_id'],)
+    )
+    if n_old_rows != high_water_mark['n_rows'] or int(checksum) != high_water_mark.get('checksum'):
+        return None
+    rows = query_rows(
+        db_path,
+        "SELECT DISTINCT player_api_id FROM Player_Attributes WHERE id > ? OR date > ?",
+        (high_water_mark['max_id'], high_water_mark['max_date'])
+    )
+    return [player_id for (player_id,) in rows]
+
+
+# MEMUAT SELURUH RIWAYAT ATRIBUT
+def load_player_attribute_history(db_path, columns=None):
+    """
+    Memuat seluruh snapshot Player_Attributes (hanya kolom yang dibutuhkan),
+    terurut per pemain lalu tanggal. Seperti feature store, hanya pemain
+    yang ada di tabel Player yang diambil.
+    """
+    columns = ATTRIBUTE_COLUMNS if columns is None else columns
+    select_cols = ", ".join(columns)
+    return query_df(
+        db_path,
+        f"SELECT id, player_api_id, date, {select_cols} FROM Player_Attributes "
+        "WHERE player_api_id IN (SELECT player_api_id FROM Player) "
+        "ORDER BY player_api_id, date, id"
+    )
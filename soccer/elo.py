@@ -0,0 +1,342 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from soccer.db import CHECKSUM_MODULUS
+from soccer.store import DEFAULT_DB_PATH, remove_old_versions, write_manifest
+from soccer.teams import load_matches
+
+
+DEFAULT_RATINGS_DIR = os.path.join("Data", "team_ratings")
+RATINGS_FORMAT_VERSION = 2
+
+# Parameter Elo (gaya World Football Elo)
+ELO_PARAMS = {
+    'initial': 1500.0,
+    'k': 20.0,
+    'home_advantage': 100.0,
+}
+
+
+# PERHITUNGAN ELO
+def margin_multiplier(goal_difference):
+    """
+    Pengali K berdasarkan selisih gol: 1 untuk selisih <= 1, 1.5 untuk
+    selisih 2, dan (11 + selisih) / 8 untuk selisih lebih besar.
+    """
+    goal_difference = np.abs(goal_difference)
+    return np.select(
+        [goal_difference <= 1, goal_difference == 2],
+        [1.0, 1.5],
+        (11.0 + goal_difference) / 8.0
+    )
+
+
+def match_arrays(matches):
+    """
+    Kolom pertandingan dalam bentuk array numpy, terurut menurut tanggal
+    (tanggal sebagai jumlah hari sejak epoch).
+    """
+    matches = matches.sort_values(['date', 'match_api_id'], kind='stable')
+    return {
+        'match_api_id': matches['match_api_id'].to_numpy(np.int64),
+        'day': matches['date'].to_numpy().astype('datetime64[D]').astype(np.int64),
+        'home': matches['home_team_api_id'].to_numpy(np.int64),
+        'away': matches['away_team_api_id'].to_numpy(np.int64),
+        'home_goal': matches['home_team_goal'].to_numpy(np.int64),
+        'away_goal': matches['away_team_goal'].to_numpy(np.int64),
+    }
+
+
+def match_checksum(arrays):
+    """
+    Checksum pertandingan atas id, tanggal, kedua tim, dan skor (seperti
+    db.attribute_checksum_expression): setiap kolom diberi bobot berbeda
+    dan hasilnya dikalikan faktor dari id. Checksum dijumlahkan per
+    pertandingan sehingga bisa ditambah saat riwayat diperpanjang, dan
+    perubahan skor atau tanggal pertandingan lama mengubah totalnya.
+    """
+    row_value = (
+        arrays['match_api_id'] + arrays['day'] * 3 + arrays['home'] * 5 + arrays['away'] * 7
+        + arrays['home_goal'] * 7919 + arrays['away_goal'] * 15787
+    ) % CHECKSUM_MODULUS
+    return int(np.sum((arrays['match_api_id'] % 65521 + 1) * row_value % CHECKSUM_MODULUS))
+
+
+def compute_elo(arrays, team_ids, ratings, params=ELO_PARAMS):
+    """
+    Memperbarui `ratings` (urutan sesuai `team_ids`) dengan pertandingan di
+    `arrays`. Skor aktual dan pengali selisih gol dihitung sekaligus untuk
+    semua pertandingan; pembaruan rating dilakukan per tanggal secara
+    vektor (semua pertandingan pada tanggal yang sama sekaligus), karena
+    pertandingan pada tanggal berikutnya bergantung pada hasil sebelumnya.
+    Mengembalikan (ratings, log) dengan log berisi rating kedua tim setelah
+    setiap pertandingan.
+    """
+    home = np.searchsorted(team_ids, arrays['home'])
+    away = np.searchsorted(team_ids, arrays['away'])
+    goal_difference = arrays['home_goal'] - arrays['away_goal']
+    actual = np.select([goal_difference > 0, goal_difference < 0], [1.0, 0.0], 0.5)
+    k = params['k'] * margin_multiplier(goal_difference)
+
+    home_after = np.empty(len(home))
+    away_after = np.empty(len(home))
+    bounds = np.flatnonzero(np.diff(arrays['day'])) + 1
+    for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(home)]):
+        h, a = home[start:end], away[start:end]
+        diff = ratings[h] + params['home_advantage'] - ratings[a]
+        expected = 1.0 / (1.0 + 10.0 ** (-diff / 400.0))
+        delta = k[start:end] * (actual[start:end] - expected)
+        np.add.at(ratings, h, delta)
+        np.add.at(ratings, a, -delta)
+        home_after[start:end] = ratings[h]
+        away_after[start:end] = ratings[a]
+
+    log = {
+        'team': np.concatenate([home, away]).astype(np.int32),
+        'day': np.concatenate([arrays['day'], arrays['day']]),
+        'rating': np.concatenate([home_after, away_after]).astype(np.float32),
+    }
+    return ratings, log
+
+
+# RATING PER TANGGAL
+class TeamRatings:
+    """
+    Riwayat rating setiap tim, disimpan terurut per tim lalu tanggal
+    (format CSR: `offsets` menunjuk awal riwayat tiap tim). Rating pada
+    tanggal tertentu cukup dicari dengan searchsorted, tanpa mengulang
+    perhitungan Elo.
+    """
+
+    def __init__(self, team_ids, offsets, days, ratings, final, meta):
+        self.team_ids = team_ids
+        self.offsets = offsets
+        self.days = days
+        self.ratings = ratings
+        self.final = final
+        self.meta = meta
+        self.initial = meta['params']['initial']
+        self._keys = None
+
+    @classmethod
+    def from_log(cls, team_ids, log, final, meta):
+        order = np.lexsort((log['day'], log['team']))
+        team = log['team'][order]
+        offsets = np.searchsorted(team, np.arange(len(team_ids) + 1)).astype(np.int64)
+        return cls(team_ids, offsets, log['day'][order], log['rating'][order], final, meta)
+
+    def log(self):
+        """
+        Riwayat dalam bentuk log (tim, hari, rating) untuk diperpanjang.
+        """
+        team = np.repeat(np.arange(len(self.team_ids), dtype=np.int32), np.diff(self.offsets))
+        return {'team': team, 'day': np.asarray(self.days), 'rating': np.asarray(self.ratings)}
+
+    def ratings_as_of(self, date, team_api_ids=None):
+        """
+        Rating tim setelah semua pertandingan sampai `date` (inklusif).
+        Tim yang belum pernah bertanding memiliki rating awal.
+        """
+        team_api_ids = self.team_ids if team_api_ids is None else np.asarray(team_api_ids, dtype=np.int64)
+        team = np.searchsorted(self.team_ids, team_api_ids)
+        known = (team < len(self.team_ids)) & (self.team_ids[np.minimum(team, len(self.team_ids) - 1)] == team_api_ids)
+        team = np.where(known, team, 0)
+
+        result = np.full(len(team), self.initial, dtype=np.float64)
+        if len(self.days) == 0:
+            return pd.Series(result, index=team_api_ids, name='elo')
+
+        # Posisi terakhir dengan hari <= date di dalam segmen setiap tim, dengan
+        # satu searchsorted atas kunci gabungan (tim, hari)
+        keys, first_day, span = self._day_keys()
+        day = np.datetime64(pd.Timestamp(date).date(), 'D').astype(np.int64)
+        query = team * span + np.clip(day - first_day, -1, span - 2)
+        positions = np.searchsorted(keys, query, side='right') - 1
+        has_rating = known & (positions >= self.offsets[team])
+        result[has_rating] = self.ratings[positions[has_rating]]
+        return pd.Series(result, index=team_api_ids, name='elo')
+
+    def _day_keys(self):
+        """
+        Kunci gabungan tim * span + (hari - hari_pertama) untuk setiap baris
+        riwayat; urutan CSR (tim lalu hari) membuatnya terurut naik. Dihitung
+        sekali lalu disimpan.
+        """
+        if self._keys is None:
+            first_day = int(np.min(self.days))
+            span = int(np.max(self.days)) - first_day + 2
+            team = np.repeat(np.arange(len(self.team_ids), dtype=np.int64), np.diff(self.offsets))
+            self._keys = (team * span + (np.asarray(self.days) - first_day), first_day, span)
+        return self._keys
+
+    def series(self, team_api_id):
+        """
+        Riwayat rating satu tim (tanggal, rating).
+        """
+        team = int(np.searchsorted(self.team_ids, team_api_id))
+        if team >= len(self.team_ids) or self.team_ids[team] != team_api_id:
+            raise KeyError(team_api_id)
+        segment = slice(self.offsets[team], self.offsets[team + 1])
+        return pd.DataFrame({
+            'date': np.asarray(self.days[segment]).astype('datetime64[D]'),
+            'elo': np.asarray(self.ratings[segment]),
+        })
+
+    @property
+    def version(self):
+        """
+        Nama versi dari isi rating: jumlah pertandingan, hari terakhir, serta
+        hash parameter dan checksum pertandingan.
+        """
+        content = json.dumps({'params': self.meta['params'], 'checksum': self.meta['checksum']}, sort_keys=True)
+        content_hash = hashlib.sha256(content.encode()).hexdigest()[:8]
+        return f"{self.meta['n_matches']}-{self.meta['last_day']}-{content_hash}-v{self.meta['format_version']}"
+
+    def save(self, path):
+        """
+        Menyimpan ke direktori sementara (nama memuat pid) lalu me-rename-nya
+        menjadi `path/<versi>/` dan menulis manifest yang menunjuk versi
+        tersebut secara atomik. Mengembalikan direktori versi.
+        """
+        version_dir = os.path.join(path, self.version)
+        tmp_dir = os.path.join(path, f".tmp-{self.version}-{os.getpid()}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name in ('team_ids', 'offsets', 'days', 'ratings', 'final'):
+            np.save(os.path.join(tmp_dir, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        try:
+            os.rename(tmp_dir, version_dir)
+        except OSError:
+            # Proses lain sudah menyimpan versi yang sama
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        write_manifest(path, {'format_version': RATINGS_FORMAT_VERSION, 'version': self.version})
+        remove_old_versions(path, keep=self.version)
+        return version_dir
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = [
+            np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+            for name in ('team_ids', 'offsets', 'days', 'ratings', 'final')
+        ]
+        return cls(*arrays, meta)
+
+
+def build_team_ratings(matches, params=ELO_PARAMS):
+    """
+    Menghitung Elo seluruh pertandingan dari awal.
+    """
+    arrays = match_arrays(matches)
+    team_ids = np.unique(np.concatenate([arrays['home'], arrays['away']]))
+    ratings = np.full(len(team_ids), params['initial'])
+    final, log = compute_elo(arrays, team_ids, ratings, params)
+    return TeamRatings.from_log(team_ids, log, final, _ratings_meta(arrays, params))
+
+
+def extend_team_ratings(team_ratings, new_matches, params=ELO_PARAMS):
+    """
+    Memperpanjang riwayat rating dengan pertandingan baru (tanggal setelah
+    pertandingan terakhir yang sudah dihitung), mulai dari rating akhir.
+    """
+    arrays = match_arrays(new_matches)
+    if len(arrays['day']) == 0:
+        return team_ratings
+    if arrays['day'][0] <= team_ratings.meta['last_day']:
+        raise ValueError("Pertandingan baru harus terjadi setelah pertandingan terakhir yang sudah dihitung.")
+
+    old_ids = np.asarray(team_ratings.team_ids)
+    team_ids = np.union1d(old_ids, np.concatenate([arrays['home'], arrays['away']]))
+    ratings = np.full(len(team_ids), params['initial'])
+    old_pos = np.searchsorted(team_ids, old_ids)
+    ratings[old_pos] = team_ratings.final
+
+    old_log = team_ratings.log()
+    old_log['team'] = old_pos[old_log['team']].astype(np.int32)
+    final, new_log = compute_elo(arrays, team_ids, ratings, params)
+    log = {name: np.concatenate([old_log[name], new_log[name]]) for name in old_log}
+
+    meta = _ratings_meta(arrays, params)
+    meta['n_matches'] += team_ratings.meta['n_matches']
+    meta['checksum'] += team_ratings.meta['checksum']
+    return TeamRatings.from_log(team_ids, log, final, meta)
+
+
+def _ratings_meta(arrays, params):
+    return {
+        'format_version': RATINGS_FORMAT_VERSION,
+        'params': dict(params),
+        'n_matches': int(len(arrays['day'])),
+        'last_day': int(arrays['day'][-1]) if len(arrays['day']) else None,
+        'checksum': match_checksum(arrays),
+    }
+
+
+def load_or_update_team_ratings(db_path=DEFAULT_DB_PATH, path=DEFAULT_RATINGS_DIR, params=ELO_PARAMS):
+    """
+    Membuka rating tim tersimpan dan hanya menghitung pertandingan baru
+    (setelah tanggal terakhir yang sudah diproses). Jika pertandingan lama
+    berubah (jumlah atau checksum id, tanggal, tim, dan skor) atau parameter
+    berbeda, rating dihitung ulang dari awal.
+    """
+    matches = load_matches(db_path)
+    team_ratings = None
+    version_dir = _active_version_dir(path)
+    if version_dir is not None:
+        team_ratings = TeamRatings.load(version_dir)
+        meta = team_ratings.meta
+        if meta['format_version'] != RATINGS_FORMAT_VERSION or meta['params'] != dict(params):
+            team_ratings = None
+
+    if team_ratings is not None:
+        last_date = np.datetime64(team_ratings.meta['last_day'], 'D')
+        seen = matches['date'].to_numpy().astype('datetime64[D]') <= last_date
+        if (
+            int(seen.sum()) != team_ratings.meta['n_matches']
+            or match_checksum(match_arrays(matches[seen])) != team_ratings.meta['checksum']
+        ):
+            team_ratings = None
+        elif seen.all():
+            return team_ratings
+        else:
+            team_ratings = extend_team_ratings(team_ratings, matches[~seen], params)
+
+    if team_ratings is None:
+        team_ratings = build_team_ratings(matches, params)
+    return TeamRatings.load(team_ratings.save(path))
+
+
+def _active_version_dir(path):
+    """
+    Direktori versi rating yang ditunjuk manifest, atau None jika belum ada.
+    """
+    try:
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    version_dir = os.path.join(path, manifest['version'])
+    return version_dir if os.path.isdir(version_dir) else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Menghitung/memperbarui rating Elo tim dari tabel Match.")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="Path database SQLite")
+    parser.add_argument('--ratings-dir', default=DEFAULT_RATINGS_DIR, help="Direktori rating tim")
+    args = parser.parse_args()
+
+    team_ratings = load_or_update_team_ratings(args.db, args.ratings_dir)
+    print(f"Rating {len(team_ratings.team_ids)} tim dari {team_ratings.meta['n_matches']} pertandingan tersimpan di {args.ratings_dir}")
+
+
+if __name__ == '__main__':
+    main()
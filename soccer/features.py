@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+
+# fitur numerik yang digunakan untuk rekomendasi
+NUMERIC_FEATURES = [
+    'overall_rating', 'potential', 'crossing', 'finishing', 'heading_accuracy',
+    'short_passing', 'volleys', 'dribbling', 'curve', 'free_kick_accuracy',
+    'long_passing', 'ball_control', 'acceleration', 'sprint_speed',
+    'agility', 'reactions', 'balance', 'shot_power', 'jumping',
+    'stamina', 'strength', 'long_shots', 'aggression', 'interceptions',
+    'positioning', 'passing', 'vision', 'penalties', 'marking',
+    'standing_tackle', 'sliding_tackle'
+]
+
+
+# PIPELINE FITUR PEMAIN
+def build_player_features(player_df, player_attr_df):
+    """
+    Menggabungkan data pemain dengan atribut terbarunya, melengkapi nilai yang
+    hilang, lalu menstandardisasi fitur numerik.
+    Mengembalikan (combined_df, scaled_features, scaler).
+    """
+    # Gabungkan data pemain dan atribut, pilih atribut terbaru
+    latest_attr_df = player_attr_df.sort_values('date').drop_duplicates('player_api_id', keep='last')
+    combined_df = pd.merge(player_df, latest_attr_df, on='player_api_id', how='inner')
+    return prepare_player_features(combined_df)
+
+
+def prepare_player_features(combined_df):
+    """
+    Menyiapkan fitur dari data yang sudah berisi satu baris per pemain
+    (misalnya hasil query snapshot terbaru langsung dari SQLite).
+    Mengembalikan (combined_df, scaled_features, scaler).
+    """
+    combined_df = combined_df.reset_index(drop=True)
+
+    # Membuat kolom 'passing' baru yang hilang
+    combined_df['passing'] = (combined_df['short_passing'] + combined_df['long_passing']) / 2
+
+    # Tangani missing values dengan median
+    for col in NUMERIC_FEATURES:
+        combined_df[col] = combined_df[col].fillna(combined_df[col].median())
+
+    # Normalisasi data numerik
+    scaler = StandardScaler()
+    scaled_features = scaler.fit_transform(combined_df[NUMERIC_FEATURES])
+
+    # Menambahkan data non-numerik untuk pencarian
+    combined_df['full_name_and_id'] = combined_df['player_name'] + ' - ' + combined_df['player_api_id'].astype(str)
+
+    return combined_df, scaled_features, scaler
+
+
+# VEKTOR BOBOT ATRIBUT
+def weight_vector(weights):
+    """
+    Mengubah dict {nama_fitur: bobot} menjadi vektor bobot sesuai urutan
+    NUMERIC_FEATURES. Fitur yang tidak disebut berbobot 1. Bobot harus
+    bilangan hingga yang tidak negatif, dan minimal satu bobot lebih dari
+    nol (vektor nol tidak punya arah untuk cosine similarity).
+    """
+    vector = np.ones(len(NUMERIC_FEATURES))
+    for name, weight in weights.items():
+        if name not in NUMERIC_FEATURES:
+            raise ValueError(f"Fitur '{name}' tidak dikenal.")
+        if not np.isfinite(weight):
+            raise ValueError(f"Bobot fitur '{name}' harus berupa angka hingga.")
+        if weight < 0:
+            raise ValueError(f"Bobot fitur '{name}' tidak boleh negatif.")
+        vector[NUMERIC_FEATURES.index(name)] = weight
+    if not vector.any():
+        raise ValueError("Minimal satu bobot fitur harus lebih dari nol.")
+    return vector
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+
+
+# Ambang rating yang bitmap-nya disiapkan (rating >= ambang)
+RATING_THRESHOLDS = list(range(40, 100, 5))
+FILTERS_FILENAME = 'filters.npz'
+
+
+# INDEKS FILTER BERBASIS BITMAP
+class FilterIndex:
+    """
+    Bitmap (bit-packed) per atribut pemain yang dihitung saat build store:
+    kaki utama, rating >= ambang, dan potensi > rating saat ini.
+    Filter digabung dengan operasi AND pada bitmap sebelum penilaian
+    kesamaan, sehingga filter yang selektif justru mengurangi pekerjaan.
+    """
+
+    def __init__(self, bitmaps, n_players, overall, potential):
+        self.bitmaps = bitmaps
+        self.n_players = n_players
+        self.overall = overall
+        self.potential = potential
+
+    @classmethod
+    def build(cls, players):
+        """
+        Menyusun bitmap dari tabel lookup pemain (urutan baris sama dengan matriks fitur).
+        """
+        overall = players['overall_rating'].to_numpy(dtype=np.int16)
+        potential = players['potential'].to_numpy(dtype=np.int16)
+        foot = players['preferred_foot'].fillna('').to_numpy(dtype=str)
+
+        masks = {
+            'foot_left': foot == 'left',
+            'foot_right': foot == 'right',
+            'potential_above_overall': potential > overall,
+        }
+        for threshold in RATING_THRESHOLDS:
+            masks[f'overall_ge_{threshold}'] = overall >= threshold
+            masks[f'potential_ge_{threshold}'] = potential >= threshold
+        bitmaps = {name: np.packbits(mask) for name, mask in masks.items()}
+        return cls(bitmaps, len(players), overall, potential)
+
+    def save(self, path):
+        np.savez(
+            os.path.join(path, FILTERS_FILENAME),
+            n_players=self.n_players, overall=self.overall, potential=self.potential,
+            **{f'bitmap_{name}': bitmap for name, bitmap in self.bitmaps.items()}
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(os.path.join(path, FILTERS_FILENAME)) as data:
+            bitmaps = {
+                key[len('bitmap_'):]: data[key] for key in data.files if key.startswith('bitmap_')
+            }
+            return cls(bitmaps, int(data['n_players']), data['overall'], data['potential'])
+
+    def _rating_bitmap(self, prefix, minimum):
+        """
+        Bitmap untuk ambang terbesar yang <= `minimum`; sisa selisihnya
+        disaring ulang pada kandidat.
+        """
+        usable = [t for t in RATING_THRESHOLDS if t <= minimum]
+        return self.bitmaps[f'{prefix}_ge_{usable[-1]}'] if usable else None
+
+    def candidates(self, preferred_foot=None, min_overall=None, min_potential=None, potential_above_overall=False):
+        """
+        Mengembalikan indeks baris pemain yang lolos semua filter,
+        atau None jika tidak ada filter yang aktif.
+        """
+        selected = []
+        if preferred_foot in ('left', 'right'):
+            selected.append(self.bitmaps[f'foot_{preferred_foot}'])
+        if potential_above_overall:
+            selected.append(self.bitmaps['potential_above_overall'])
+        if min_overall:
+            selected.append(self._rating_bitmap('overall', min_overall))
+        if min_potential:
+            selected.append(self._rating_bitmap('potential', min_potential))
+        if not selected:
+            return None
+
+        combined = np.full((self.n_players + 7) // 8, 0xFF, dtype=np.uint8)
+        for bitmap in selected:
+            if bitmap is not None:
+                np.bitwise_and(combined, bitmap, out=combined)
+        indices = np.flatnonzero(np.unpackbits(combined, count=self.n_players))
+
+        # Saring sisa ambang yang tidak tepat berada pada kelipatan bitmap
+        if min_overall and min_overall not in RATING_THRESHOLDS:
+            indices = indices[self.overall[indices] >= min_overall]
+        if min_potential and min_potential not in RATING_THRESHOLDS:
+            indices = indices[self.potential[indices] >= min_potential]
+        return indices
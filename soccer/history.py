@@ -0,0 +1,164 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from soccer.db import load_player_attribute_history
+from soccer.features import NUMERIC_FEATURES
+from soccer.similarity import top_k_similar_among, top_k_weighted_similar
+
+
+# Batas musim: snapshot diambil setiap awal Juli
+SEASON_CUTOFF = "07-01"
+HISTORY_DIRNAME = 'history'
+
+
+# INDEKS KESAMAAN PER TANGGAL
+class PointInTimeIndex:
+    """
+    Indeks kesamaan pemain untuk beberapa tanggal (satu per musim).
+
+    Setiap baris Player_Attributes distandardisasi dan dinormalisasi sekali
+    ke `row_vectors`. Sebuah snapshot hanya menyimpan indeks baris terbaru
+    setiap pemain pada tanggal tersebut, sehingga pemain yang atributnya
+    tidak berubah antar musim memakai baris (dan memori) yang sama.
+    """
+
+    def __init__(self, path):
+        load = lambda name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+        self.path = path
+        self.row_vectors = load('row_vectors')
+        self.row_player_ids = load('row_player_ids')
+        self.row_dates = load('row_dates')
+        self.row_ratings = load('row_ratings')
+        self.snapshot_rows = load('snapshot_rows')
+        self.snapshot_offsets = load('snapshot_offsets')
+        with open(os.path.join(path, 'snapshots.json')) as f:
+            self.cutoffs = json.load(f)['cutoffs']
+
+    def snapshot_for(self, as_of):
+        """
+        Posisi snapshot terakhir dengan tanggal batas <= `as_of` (format YYYY-MM-DD).
+        """
+        pos = int(np.searchsorted(np.array(self.cutoffs), str(as_of)[:10], side='right')) - 1
+        if pos < 0:
+            raise KeyError(f"Tidak ada snapshot sebelum {as_of}.")
+        return pos
+
+    def snapshot(self, pos):
+        """
+        Indeks baris (satu per pemain, terurut berdasarkan player_api_id) untuk snapshot ke-`pos`.
+        """
+        return self.snapshot_rows[self.snapshot_offsets[pos]:self.snapshot_offsets[pos + 1]]
+
+    def similar(self, player_api_id, as_of, k, weights=None, player_ids=None,
+                min_overall=None, min_potential=None, potential_above_overall=False):
+        """
+        Mencari k pemain paling mirip menggunakan atribut setiap pemain
+        sebagaimana tercatat pada tanggal `as_of`. Filter rating memakai
+        rating pada tanggal tersebut; `player_ids` (terurut) membatasi
+        kandidat pada pemain tertentu, dan `weights` memakai cosine
+        berbobot. Mengembalikan (indeks baris riwayat hasil, skor, tanggal
+        snapshot, indeks baris pemain acuan).
+        """
+        pos = self.snapshot_for(as_of)
+        rows = np.asarray(self.snapshot(pos))
+        snapshot_player_ids = self.row_player_ids[rows]
+        query_pos = int(np.searchsorted(snapshot_player_ids, player_api_id))
+        if query_pos >= len(rows) or snapshot_player_ids[query_pos] != player_api_id:
+            raise KeyError(player_api_id)
+        query_row = int(rows[query_pos])
+
+        keep = np.ones(len(rows), dtype=bool)
+        if player_ids is not None:
+            keep &= np.isin(snapshot_player_ids, player_ids, assume_unique=True)
+        ratings = self.row_ratings[rows]
+        if min_overall:
+            keep &= ratings[:, 0] >= min_overall
+        if min_potential:
+            keep &= ratings[:, 1] >= min_potential
+        if potential_above_overall:
+            keep &= ratings[:, 1] > ratings[:, 0]
+        candidates = rows[keep]
+
+        # Cosine berbobot tidak berubah oleh normalisasi baris, jadi vektor ternormalisasi bisa dipakai langsung
+        if weights is not None:
+            best_rows, scores = top_k_weighted_similar(self.row_vectors, query_row, weights, k, candidates=candidates)
+        else:
+            best_rows, scores = top_k_similar_among(self.row_vectors, query_row, candidates, k)
+        return best_rows, scores, self.cutoffs[pos], query_row
+
+
+def season_cutoffs(dates):
+    """
+    Tanggal batas musim (YYYY-07-01) yang mencakup rentang data
+    (`dates` berupa Series string YYYY-MM-DD).
+    """
+    first_year, last_year = int(dates.min()[:4]), int(dates.max()[:4])
+    return [f"{year}-{SEASON_CUTOFF}" for year in range(first_year, last_year + 2)]
+
+
+def build_point_in_time_index(db_path, store, path=None):
+    """
+    Membangun indeks per tanggal dari seluruh riwayat Player_Attributes.
+    Vektor distandardisasi dengan statistik scaler dari feature store agar
+    berada di ruang fitur yang sama dengan rekomendasi saat ini.
+    """
+    path = path or os.path.join(store.path, HISTORY_DIRNAME)
+    history = load_player_attribute_history(db_path)
+    history['passing'] = (history['short_passing'] + history['long_passing']) / 2
+
+    features = history[NUMERIC_FEATURES].astype(np.float64)
+    features = features.fillna(features.median())
+    mean = np.array(store.scaler_stats['mean'])
+    scale = np.array(store.scaler_stats['scale'])
+    vectors = (features.to_numpy() - mean) / scale
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors = (vectors / norms).astype(np.float32)
+
+    player_ids = history['player_api_id'].to_numpy(dtype=np.int64)
+    dates = history['date'].str[:10]
+    cutoffs = season_cutoffs(dates)
+    dates = dates.to_numpy(dtype='U10')
+
+    # Baris sudah terurut per pemain lalu tanggal: baris terbaru sebelum batas
+    # adalah awal grup ditambah jumlah baris bertanggal < batas, dikurangi satu
+    group_starts = np.flatnonzero(np.r_[True, player_ids[1:] != player_ids[:-1]])
+    snapshot_rows = []
+    for cutoff in cutoffs:
+        counts = np.add.reduceat((dates < cutoff).astype(np.int64), group_starts)
+        present = counts > 0
+        snapshot_rows.append((group_starts[present] + counts[present] - 1).astype(np.int64))
+    snapshot_offsets = np.concatenate([[0], np.cumsum([len(rows) for rows in snapshot_rows])])
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    arrays = {
+        'row_vectors': vectors,
+        'row_player_ids': player_ids,
+        'row_dates': dates,
+        'row_ratings': history[['overall_rating', 'potential']].fillna(0).to_numpy(dtype=np.int16),
+        'snapshot_rows': np.concatenate(snapshot_rows),
+        'snapshot_offsets': snapshot_offsets.astype(np.int64),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+    with open(os.path.join(tmp_path, 'snapshots.json'), 'w') as f:
+        json.dump({'cutoffs': cutoffs}, f)
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return PointInTimeIndex(path)
+
+
+def load_or_build_point_in_time_index(db_path, store):
+    """
+    Memuat indeks per tanggal dari folder versi store, atau membangunnya sekali.
+    """
+    path = os.path.join(store.path, HISTORY_DIRNAME)
+    if os.path.isdir(path):
+        return PointInTimeIndex(path)
+    return build_point_in_time_index(db_path, store, path)
@@ -0,0 +1,288 @@
+import argparse
+import io
+import json
+import os
+import shutil
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from soccer.connection import database_signature, get_connection
+from soccer.store import DEFAULT_DB_PATH, hash_file, remove_old_versions, write_manifest
+
+
+DEFAULT_EVENTS_DIR = os.path.join("Data", "match_events")
+EVENTS_FORMAT_VERSION = 1
+
+# Kolom XML pada tabel Match yang diurai, beserta kode jenis event-nya
+EVENT_KINDS = ['goal', 'shoton', 'card', 'possession']
+
+# Kolom tabel event (kolumnar) dan dtype-nya; -1 berarti nilai tidak tersedia
+EVENT_COLUMNS = {
+    'match_api_id': np.int64,
+    'kind': np.int8,
+    'elapsed': np.int16,
+    'elapsed_plus': np.int16,
+    'team_api_id': np.int64,
+    'player_api_id': np.int64,
+    'detail': np.int16,
+    'homepos': np.int8,
+    'awaypos': np.int8,
+}
+
+# Jumlah pertandingan per tugas parsing
+CHUNK_SIZE = 2000
+
+
+# PARSING XML SECARA STREAMING
+def _int_or_missing(text):
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return -1
+
+
+def _event_detail(kind, value):
+    """
+    Keterangan singkat event: tipe gol (n, p, o, ...), jenis kartu (y, r, y2),
+    atau subtype tembakan. Possession tidak memiliki keterangan.
+    """
+    if kind == 'goal':
+        return value.findtext('goal_type') or value.findtext('comment') or ''
+    if kind == 'card':
+        return value.findtext('card_type') or value.findtext('comment') or ''
+    if kind == 'shoton':
+        return value.findtext('subtype') or ''
+    return ''
+
+
+def parse_event_xml(kind, xml_text):
+    """
+    Mengurai satu blob XML (kolom `kind` tabel Match) dengan iterparse:
+    setiap elemen <value> diproses lalu dibuang sehingga memori tidak ikut
+    membesar. Mengembalikan list tuple
+    (elapsed, elapsed_plus, team, player1, detail, homepos, awaypos).
+    """
+    if not xml_text:
+        return []
+    events = []
+    depth = 0
+    for event, elem in ET.iterparse(io.BytesIO(xml_text.encode('utf-8')), events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            continue
+        depth -= 1
+        # Hanya <value> langsung di bawah root (bukan elemen bersarang di <stats>)
+        if elem.tag != 'value' or depth != 1:
+            continue
+        events.append((
+            _int_or_missing(elem.findtext('elapsed')),
+            _int_or_missing(elem.findtext('elapsed_plus')),
+            _int_or_missing(elem.findtext('team')),
+            _int_or_missing(elem.findtext('player1')),
+            _event_detail(kind, elem),
+            _int_or_missing(elem.findtext('homepos')),
+            _int_or_missing(elem.findtext('awaypos')),
+        ))
+        elem.clear()
+    return events
+
+
+def parse_match_chunk(rows):
+    """
+    Mengurai sekumpulan baris (match_api_id, goal, shoton, card, possession)
+    menjadi kolom-kolom event. Dijalankan di proses worker.
+    """
+    columns = {name: [] for name in EVENT_COLUMNS}
+    details = []
+    for match_api_id, *blobs in rows:
+        for kind_code, (kind, xml_text) in enumerate(zip(EVENT_KINDS, blobs)):
+            try:
+                events = parse_event_xml(kind, xml_text)
+            except ET.ParseError:
+                continue
+            for elapsed, elapsed_plus, team, player, detail, homepos, awaypos in events:
+                columns['match_api_id'].append(match_api_id)
+                columns['kind'].append(kind_code)
+                columns['elapsed'].append(elapsed)
+                columns['elapsed_plus'].append(elapsed_plus)
+                columns['team_api_id'].append(team)
+                columns['player_api_id'].append(player)
+                columns['homepos'].append(homepos)
+                columns['awaypos'].append(awaypos)
+                details.append(detail)
+    columns.pop('detail')
+    arrays = {name: np.asarray(values, dtype=EVENT_COLUMNS[name]) for name, values in columns.items()}
+    arrays['detail'] = np.asarray(details, dtype=object)
+    return arrays
+
+
+def _iter_match_chunks(db_path, chunk_size):
+    cursor = get_connection(db_path).execute(
+        f"SELECT match_api_id, {', '.join(EVENT_KINDS)} FROM Match ORDER BY match_api_id"
+    )
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+
+def parse_match_events(db_path, chunk_size=CHUNK_SIZE, max_workers=None):
+    """
+    Membaca kolom XML tabel Match secara bertahap (fetchmany) dan mengurainya
+    paralel di beberapa proses. Jumlah chunk yang sedang diproses dibatasi
+    agar memori tetap kecil. Keterangan event disimpan sebagai kode integer
+    beserta kosakatanya.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    chunks = []
+    if max_workers == 1:
+        chunks = [parse_match_chunk(rows) for rows in _iter_match_chunks(db_path, chunk_size)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for rows in _iter_match_chunks(db_path, chunk_size):
+                pending.append(executor.submit(parse_match_chunk, rows))
+                if len(pending) >= 2 * max_workers:
+                    chunks.append(pending.popleft().result())
+            chunks.extend(future.result() for future in pending)
+
+    columns = {
+        name: np.concatenate([chunk[name] for chunk in chunks]) if chunks else np.empty(0, dtype=dtype)
+        for name, dtype in EVENT_COLUMNS.items() if name != 'detail'
+    }
+    details = np.concatenate([chunk['detail'] for chunk in chunks]) if chunks else np.empty(0, dtype=object)
+    codes, vocabulary = pd.factorize(details)
+    columns['detail'] = codes.astype(EVENT_COLUMNS['detail'])
+    return columns, [str(value) for value in vocabulary]
+
+
+# TABEL EVENT DI DISK
+class MatchEvents:
+    """
+    Tabel event pertandingan dalam format kolumnar: satu file .npy per kolom
+    (dibuka sebagai memmap) dan kosakata keterangan event di meta.json.
+    """
+
+    def __init__(self, path, columns, meta):
+        self.path = path
+        self.columns = columns
+        self.meta = meta
+        self.details = meta['details']
+
+    def __len__(self):
+        return len(self.columns['match_api_id'])
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        columns = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+            for name in EVENT_COLUMNS
+        }
+        return cls(path, columns, meta)
+
+    def to_frame(self, kinds=None):
+        """
+        DataFrame event (opsional hanya jenis tertentu) dengan kolom `kind`
+        dan `detail` sebagai kategori.
+        """
+        mask = slice(None)
+        if kinds is not None:
+            mask = np.isin(self.columns['kind'], [EVENT_KINDS.index(kind) for kind in kinds])
+        df = pd.DataFrame({name: np.asarray(values[mask]) for name, values in self.columns.items()})
+        df['kind'] = pd.Categorical.from_codes(df['kind'], EVENT_KINDS)
+        df['detail'] = pd.Categorical.from_codes(df['detail'], self.details)
+        return df
+
+
+def write_match_events(path, columns, details, source):
+    """
+    Menulis tabel event ke direktori sementara lalu me-rename-nya menjadi
+    `path/<versi>/` (versi = hash database). Manifest yang menunjuk versi
+    aktif ditulis atomik setelahnya, sehingga pembaca tidak pernah melihat
+    direktori yang hilang atau setengah jadi.
+    """
+    version = f"{source['db_hash'][:16]}-v{EVENTS_FORMAT_VERSION}"
+    version_dir = os.path.join(path, version)
+    tmp_dir = os.path.join(path, f".tmp-{version}-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name in EVENT_COLUMNS:
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), columns[name])
+    meta = {
+        'format_version': EVENTS_FORMAT_VERSION,
+        'details': details,
+        'n_events': int(len(columns['match_api_id'])),
+    }
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    try:
+        os.rename(tmp_dir, version_dir)
+    except OSError:
+        # Proses lain sudah menyelesaikan versi yang sama
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    write_manifest(path, {'format_version': EVENTS_FORMAT_VERSION, 'version': version, 'source': source})
+    remove_old_versions(path, keep=version)
+    return MatchEvents.load(version_dir)
+
+
+def _read_manifest(path):
+    try:
+        with open(os.path.join(path, 'manifest.json')) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def load_or_build_match_events(db_path=DEFAULT_DB_PATH, path=DEFAULT_EVENTS_DIR, max_workers=None, force=False):
+    """
+    Membuka tabel event yang sudah diurai. Parsing ulang hanya dilakukan jika
+    isi database berubah (cek mtime/ukuran dulu, lalu hash isi) atau format
+    tabel event berubah.
+    """
+    mtime_ns, size = database_signature(db_path)
+    manifest = _read_manifest(path)
+    valid = (
+        not force and manifest is not None and manifest['format_version'] == EVENTS_FORMAT_VERSION
+        and os.path.isdir(os.path.join(path, manifest['version']))
+    )
+    if valid:
+        version_dir = os.path.join(path, manifest['version'])
+        source = manifest['source']
+        if (source['mtime_ns'], source['size']) == (mtime_ns, size):
+            return MatchEvents.load(version_dir)
+        db_hash = hash_file(db_path)
+        if source['db_hash'] == db_hash:
+            # Isi sama (mis. file hanya disalin ulang): cukup perbarui signature
+            source.update(mtime_ns=mtime_ns, size=size)
+            write_manifest(path, manifest)
+            return MatchEvents.load(version_dir)
+    else:
+        db_hash = hash_file(db_path)
+
+    columns, details = parse_match_events(db_path, max_workers=max_workers)
+    source = {'db_path': os.path.abspath(db_path), 'db_hash': db_hash, 'mtime_ns': mtime_ns, 'size': size}
+    return write_match_events(path, columns, details, source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mengurai kolom XML tabel Match menjadi tabel event kolumnar.")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="Path database SQLite")
+    parser.add_argument('--events-dir', default=DEFAULT_EVENTS_DIR, help="Direktori tabel event")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses parsing")
+    parser.add_argument('--force', action='store_true', help="Urai ulang walaupun database tidak berubah")
+    args = parser.parse_args()
+
+    events = load_or_build_match_events(args.db, args.events_dir, args.workers, args.force)
+    print(f"{len(events)} event tersimpan di {events.path}")
+
+
+if __name__ == '__main__':
+    main()
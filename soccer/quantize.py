@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+
+from soccer.similarity import top_k_indices
+
+
+QUANTIZED_FILENAME = 'normalized_q8.npy'
+QUANTIZED_PARAMS_FILENAME = 'normalized_q8_params.npz'
+
+
+# MATRIKS TERKUANTISASI INT8
+class QuantizedMatrix:
+    """
+    Kuantisasi skalar int8 per fitur: x ~= code * scale + offset.
+    Memakai 1 byte per nilai (4x lebih kecil dari float32, 8x dari float64).
+    Skor perkiraan dihitung langsung dari kode int8, lalu kandidat teratas
+    di-ranking ulang dengan vektor float yang eksak.
+    """
+
+    def __init__(self, codes, scale, offset):
+        self.codes = codes
+        self.scale = scale
+        self.offset = offset
+
+    def __len__(self):
+        return len(self.codes)
+
+    @classmethod
+    def build(cls, matrix, chunk_size=65536):
+        """
+        Mengkuantisasi matriks float menggunakan rentang min-max setiap kolom.
+        """
+        low = np.asarray(matrix.min(axis=0), dtype=np.float32)
+        high = np.asarray(matrix.max(axis=0), dtype=np.float32)
+        scale = (high - low) / 255
+        scale[scale == 0] = 1.0
+        offset = low + 128 * scale
+
+        quantized = cls(None, scale.astype(np.float32), offset.astype(np.float32))
+        quantized.codes = np.empty(matrix.shape, dtype=np.int8)
+        for start in range(0, len(matrix), chunk_size):
+            quantized.codes[start:start + chunk_size] = quantized.encode(matrix[start:start + chunk_size])
+        return quantized
+
+    def encode(self, rows):
+        """
+        Mengkuantisasi baris baru dengan skala yang sama (nilai di luar rentang dipotong).
+        """
+        rows = np.asarray(rows, dtype=np.float32)
+        return np.clip(np.rint((rows - self.offset) / self.scale), -128, 127).astype(np.int8)
+
+    def save(self, path):
+        np.save(os.path.join(path, QUANTIZED_FILENAME), self.codes)
+        np.savez(os.path.join(path, QUANTIZED_PARAMS_FILENAME), scale=self.scale, offset=self.offset)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        codes = np.load(os.path.join(path, QUANTIZED_FILENAME), mmap_mode='r' if mmap else None)
+        with np.load(os.path.join(path, QUANTIZED_PARAMS_FILENAME)) as params:
+            return cls(codes, params['scale'], params['offset'])
+
+    def approximate_scores(self, query, chunk_size=65536):
+        """
+        Perkiraan dot product setiap baris dengan `query`:
+        codes @ (scale * q) + offset . q, dihitung per potongan.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        scaled_query = self.scale * query
+        bias = float(self.offset @ query)
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), chunk_size):
+            block = self.codes[start:start + chunk_size].astype(np.float32)
+            scores[start:start + chunk_size] = block @ scaled_query + bias
+        return scores
+
+
+def top_k_similar_quantized(quantized, normalized, query_idx, k, rerank_factor=4):
+    """
+    Top-k cosine similarity dengan penilaian awal dari matriks int8, lalu
+    `k * rerank_factor` kandidat teratas dinilai ulang secara eksak dengan
+    vektor float (hanya baris tersebut yang dibaca dari memmap).
+    """
+    query = np.asarray(normalized[query_idx], dtype=np.float32)
+    scores = quantized.approximate_scores(query)
+    scores[query_idx] = -np.inf
+    # Baris diurutkan agar pembacaan memmap berurutan
+    candidates = np.sort(top_k_indices(scores, k * rerank_factor))
+    # Jika k * rerank_factor >= n, baris acuan (skor -inf) ikut terpilih
+    candidates = candidates[candidates != query_idx]
+
+    exact = np.asarray(normalized[candidates], dtype=np.float32) @ query
+    best = top_k_indices(exact, k)
+    return candidates[best], exact[best]
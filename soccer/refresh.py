@@ -0,0 +1,150 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from soccer.ann import IVFIndex, assign_to_centroids, read_index_meta
+from soccer.db import attribute_high_water_mark, load_changed_player_ids, load_latest_player_attributes
+from soccer.features import NUMERIC_FEATURES
+from soccer.quantize import QuantizedMatrix
+from soccer.similarity import normalize_rows
+from soccer.store import (
+    DEFAULT_DB_PATH, DEFAULT_STORE_DIR, FEATURE_DTYPE, FeatureStore, activate_version,
+    build_feature_store, hash_file, read_manifest, store_version, write_version,
+)
+
+
+# Pergeseran statistik (relatif terhadap skala) yang masih ditoleransi
+# sebelum seluruh matriks distandardisasi ulang
+RESCALE_TOLERANCE = 0.01
+
+
+# REFRESH INKREMENTAL FEATURE STORE
+def running_mean_scale(running):
+    """
+    Rata-rata dan standar deviasi (populasi, seperti StandardScaler) dari
+    statistik berjalan {n, sum, sumsq}.
+    """
+    n = running['n']
+    mean = np.asarray(running['sum']) / n
+    variance = np.maximum(np.asarray(running['sumsq']) / n - mean * mean, 0.0)
+    scale = np.sqrt(variance)
+    scale[scale == 0] = 1.0
+    return mean, scale
+
+
+def refresh_feature_store(db_path=DEFAULT_DB_PATH, store_dir=DEFAULT_STORE_DIR, rescale_tolerance=RESCALE_TOLERANCE):
+    """
+    Memperbarui feature store aktif dengan baris Player_Attributes baru
+    (berdasarkan high-water mark id dan tanggal) tanpa menjalankan ulang
+    pipeline lengkap. Hanya vektor pemain yang terdampak yang dihitung ulang;
+    statistik scaler diperbarui sebagai rata-rata/varian berjalan. Matriks
+    baru distandardisasi ulang seluruhnya hanya jika statistik bergeser
+    melebihi `rescale_tolerance`. Jika baris lama berubah atau terhapus,
+    dilakukan build ulang penuh.
+    """
+    manifest = read_manifest(store_dir)
+    if manifest is None or not os.path.isdir(os.path.join(store_dir, manifest['version'])):
+        return build_feature_store(db_path, store_dir)
+    store = FeatureStore(os.path.join(store_dir, manifest['version']), manifest)
+
+    db_hash = hash_file(db_path)
+    if db_hash == manifest['db_hash']:
+        return activate_version(store_dir, store.version, db_path, db_hash)
+
+    high_water_mark = attribute_high_water_mark(db_path)
+    changed_ids = load_changed_player_ids(db_path, store.source['high_water_mark'])
+    if changed_ids is None:
+        return build_feature_store(db_path, store_dir, db_hash=db_hash)
+    if not changed_ids:
+        return activate_version(store_dir, store.version, db_path, db_hash)
+
+    # Atribut terbaru hanya untuk pemain yang terdampak
+    latest = load_latest_player_attributes(db_path, player_ids=changed_ids)
+    latest['passing'] = (latest['short_passing'] + latest['long_passing']) / 2
+    medians = pd.Series(store.scaler_stats['medians'], index=NUMERIC_FEATURES)
+    new_raw = latest[NUMERIC_FEATURES].astype(np.float64).fillna(medians).to_numpy()
+    latest['full_name_and_id'] = latest['player_name'] + ' - ' + latest['player_api_id'].astype(str)
+
+    positions, found = store.indices_of(latest['player_api_id'].to_numpy())
+    updated_pos = positions[found]
+    old_mean = np.asarray(store.scaler_stats['mean'])
+    old_scale = np.asarray(store.scaler_stats['scale'])
+
+    # Statistik berjalan: keluarkan kontribusi vektor lama, masukkan yang baru
+    running = dict(store.scaler_stats['running'])
+    old_raw = np.asarray(store.features[updated_pos], dtype=np.float64) * old_scale + old_mean
+    running['n'] += int((~found).sum())
+    running['sum'] = (np.asarray(running['sum']) - old_raw.sum(axis=0) + new_raw.sum(axis=0)).tolist()
+    running['sumsq'] = (np.asarray(running['sumsq']) - (old_raw * old_raw).sum(axis=0) + (new_raw * new_raw).sum(axis=0)).tolist()
+    new_mean, new_scale = running_mean_scale(running)
+
+    drift = max(np.max(np.abs(new_mean - old_mean) / old_scale), np.max(np.abs(new_scale / old_scale - 1)))
+    rescale = drift > rescale_tolerance
+    mean, scale = (new_mean, new_scale) if rescale else (old_mean, old_scale)
+
+    # Tabel pemain: perbarui baris lama, tambahkan pemain baru, urutkan berdasarkan id
+    players = store.players.copy()
+    for col in players.columns:
+        players.iloc[updated_pos, players.columns.get_loc(col)] = latest.loc[found, col].to_numpy()
+    players = pd.concat([players, latest.loc[~found, players.columns]], ignore_index=True)
+    order = np.argsort(players['player_api_id'].to_numpy(), kind='stable')
+    players = players.iloc[order].reset_index(drop=True)
+
+    # Matriks fitur: hanya baris terdampak yang dihitung ulang kecuali perlu standardisasi ulang
+    new_scaled = ((new_raw - mean) / scale).astype(FEATURE_DTYPE)
+    if rescale:
+        raw = np.asarray(store.features, dtype=np.float64) * old_scale + old_mean
+        features = ((raw - mean) / scale).astype(FEATURE_DTYPE)
+    else:
+        features = np.array(store.features)
+    features[updated_pos] = new_scaled[found]
+    features = np.concatenate([features, new_scaled[~found]])[order]
+
+    changed_rows = np.flatnonzero(np.isin(players['player_api_id'].to_numpy(), latest['player_api_id'].to_numpy()))
+    if rescale:
+        normalized = normalize_rows(features, dtype=FEATURE_DTYPE)
+        quantized = QuantizedMatrix.build(normalized)
+    else:
+        normalized = np.concatenate([np.array(store.normalized), np.zeros((int((~found).sum()), features.shape[1]), FEATURE_DTYPE)])[order]
+        normalized[changed_rows] = normalize_rows(features[changed_rows], dtype=FEATURE_DTYPE)
+        codes = np.concatenate([np.array(store.quantized.codes), np.zeros((int((~found).sum()), features.shape[1]), np.int8)])[order]
+        quantized = QuantizedMatrix(codes, store.quantized.scale, store.quantized.offset)
+        quantized.codes[changed_rows] = quantized.encode(normalized[changed_rows])
+
+    scaler_stats = dict(store.scaler_stats, mean=mean.tolist(), scale=scale.tolist(), running=running)
+    version = store_version(db_hash)
+
+    def update_ivf_index(tmp_dir):
+        """
+        Indeks IVF lama dipakai ulang: centroid tetap, hanya baris terdampak
+        yang ditempatkan ulang. Dilewati jika matriks distandardisasi ulang
+        (indeks akan dibangun ulang saat dibutuhkan).
+        """
+        old_index_dir = os.path.join(store.path, 'ivf')
+        if rescale or read_index_meta(old_index_dir) is None:
+            return
+        old_index = IVFIndex.load(old_index_dir)
+        labels = np.concatenate([old_index.labels(), np.zeros(int((~found).sum()), np.int32)])[order]
+        labels[changed_rows] = assign_to_centroids(normalized[changed_rows], old_index.centroids)
+        IVFIndex.from_assignments(normalized, np.asarray(old_index.centroids), labels).save(
+            os.path.join(tmp_dir, 'ivf'), signature=version
+        )
+
+    write_version(
+        store_dir, version, players, features, scaler_stats, {'high_water_mark': high_water_mark},
+        normalized=normalized, quantized=quantized, extra=update_ivf_index,
+        archetype_centroids=None if rescale else np.asarray(store.archetypes.index.centroids)
+    )
+    return activate_version(store_dir, version, db_path, db_hash)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Refresh inkremental feature store setelah data atribut baru dimuat.")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="Path database SQLite")
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help="Folder artefak")
+    args = parser.parse_args()
+
+    store = refresh_feature_store(args.db, args.store)
+    print(f"Feature store versi {store.version}: {len(store)} pemain di {store.path}")
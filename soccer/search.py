@@ -0,0 +1,83 @@
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import numpy as np
+
+
+# NORMALISASI NAMA
+def normalize_name(name):
+    """
+    Menyamakan variasi penulisan nama: aksen dihapus (Müller -> muller),
+    huruf kecil, dan hanya huruf/angka yang dipertahankan.
+    """
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r'[^0-9a-z]+', ' ', text.lower())
+    return text.strip()
+
+
+def trigrams(text):
+    """
+    Trigram karakter dari teks yang sudah dinormalisasi. Padding spasi
+    membuat awal kata (prefix) ikut terwakili.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# INDEKS PENCARIAN NAMA PEMAIN
+class NameSearchIndex:
+    """
+    Inverted index trigram atas nama pemain. Query dinilai dalam dua tahap:
+    jumlah trigram yang sama memilih sekumpulan kecil kandidat, lalu skor
+    fuzzy hanya dihitung untuk kandidat tersebut.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.normalized = [normalize_name(name) for name in self.names]
+
+        postings = defaultdict(list)
+        for idx, text in enumerate(self.normalized):
+            for gram in trigrams(text):
+                postings[gram].append(idx)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, limit=20, max_candidates=200, min_score=0.3):
+        """
+        Mengembalikan daftar (indeks, skor) untuk `limit` nama terbaik,
+        diurutkan dari skor tertinggi. Kandidat dengan skor di bawah
+        `min_score` dianggap tidak relevan.
+        """
+        text = normalize_name(query)
+        if not text:
+            return []
+        grams = trigrams(text)
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not hits:
+            return []
+
+        # Tahap 1: kandidat dengan trigram bersama terbanyak
+        ids, counts = np.unique(np.concatenate(hits), return_counts=True)
+        if len(ids) > max_candidates:
+            keep = np.argpartition(counts, -max_candidates)[-max_candidates:]
+            ids, counts = ids[keep], counts[keep]
+
+        # Tahap 2: skor fuzzy hanya untuk kandidat
+        results = []
+        for idx, shared in zip(ids.tolist(), counts.tolist()):
+            name = self.normalized[idx]
+            overlap = 2 * shared / (len(grams) + len(trigrams(name)))
+            ratio = SequenceMatcher(None, text, name).ratio()
+            score = 0.5 * ratio + 0.5 * overlap
+            if name.startswith(text) or f" {text}" in f" {name}":
+                score += 0.25
+            if score >= min_score:
+                results.append((idx, score))
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results[:limit]
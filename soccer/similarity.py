@@ -0,0 +1,146 @@
+import numpy as np
+
+
+# NORMALISASI VEKTOR FITUR
+def normalize_rows(features, dtype=np.float64):
+    """
+    Menormalisasi setiap baris (L2) agar cosine similarity cukup dihitung
+    dengan satu perkalian matriks-vektor.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    # Hindari pembagian dengan nol untuk vektor kosong
+    norms[norms == 0] = 1.0
+    return (features / norms).astype(dtype, copy=False)
+
+
+# PEMILIHAN TOP-K
+def top_k_indices(scores, k):
+    """
+    Mengambil indeks k skor tertinggi (urut menurun) dengan seleksi parsial,
+    tanpa mengurutkan seluruh array.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(scores, -k)[-k:]
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+
+# QUERY KESAMAAN UNTUK SATU PEMAIN
+def top_k_similar(normalized, query_idx, k, exclude_self=True):
+    """
+    Menghitung cosine similarity antara satu pemain dan seluruh pemain lain
+    pada matriks yang sudah dinormalisasi, lalu mengembalikan k indeks teratas
+    beserta skornya.
+    """
+    scores = normalized @ normalized[query_idx]
+    if exclude_self:
+        scores[query_idx] = -np.inf
+    indices = top_k_indices(scores, k)
+    return indices, scores[indices]
+
+
+# QUERY KESAMAAN UNTUK BANYAK PEMAIN SEKALIGUS
+def top_k_similar_batch(normalized, query_indices, k, exclude_self=True, max_block_bytes=256 << 20):
+    """
+    Menghitung top-k pemain serupa untuk banyak pemain dengan perkalian
+    matriks-matriks per blok. Ukuran blok query dibatasi sehingga matriks
+    skor sementara tidak melebihi `max_block_bytes`.
+    Mengembalikan (indeks [m, k], skor [m, k]).
+    """
+    query_indices = np.asarray(query_indices, dtype=np.int64)
+    n = len(normalized)
+    k = min(k, n - 1 if exclude_self else n)
+    if k <= 0:
+        # Tidak ada pemain lain untuk dibandingkan (misalnya hanya satu baris)
+        return (np.empty((len(query_indices), 0), dtype=np.int64),
+                np.empty((len(query_indices), 0), dtype=normalized.dtype))
+    chunk_size = max(1, max_block_bytes // (n * np.dtype(normalized.dtype).itemsize))
+
+    all_indices = np.empty((len(query_indices), k), dtype=np.int64)
+    all_scores = np.empty((len(query_indices), k), dtype=normalized.dtype)
+    for start in range(0, len(query_indices), chunk_size):
+        block = query_indices[start:start + chunk_size]
+        scores = np.asarray(normalized[block]) @ np.asarray(normalized).T
+        rows = np.arange(len(block))
+        if exclude_self:
+            scores[rows, block] = -np.inf
+
+        # Seleksi parsial per baris, lalu urutkan hanya k kandidat
+        candidates = np.argpartition(scores, -k, axis=1)[:, -k:]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(candidate_scores, axis=1)[:, ::-1]
+        all_indices[start:start + len(block)] = np.take_along_axis(candidates, order, axis=1)
+        all_scores[start:start + len(block)] = np.take_along_axis(candidate_scores, order, axis=1)
+    return all_indices, all_scores
+
+
+# QUERY KESAMAAN PADA SUBSET KANDIDAT
+def top_k_similar_among(normalized, query_idx, candidates, k):
+    """
+    Sama seperti `top_k_similar`, tetapi hanya menilai baris `candidates`
+    (misalnya hasil filter bitmap).
+    """
+    candidates = np.asarray(candidates, dtype=np.int64)
+    candidates = candidates[candidates != query_idx]
+    scores = np.asarray(normalized[candidates]) @ normalized[query_idx]
+    best = top_k_indices(scores, k)
+    return candidates[best], scores[best]
+
+
+# QUERY KESAMAAN DENGAN BOBOT ATRIBUT
+def top_k_weighted_similar(features, query_idx, weights, k, candidates=None, chunk_size=65536):
+    """
+    Cosine similarity berbobot di atas matriks fitur terstandardisasi:
+    sum(w * x * q) / (sqrt(sum(w * x^2)) * sqrt(sum(w * q^2))).
+    Bobot diterapkan saat query, sehingga matriks tidak perlu diskalakan
+    ulang. Norma berbobot dihitung per potongan agar memori tetap terbatas.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    query = np.asarray(features[query_idx], dtype=np.float64)
+    weighted_query = weights * query
+    query_norm = np.sqrt(weighted_query @ query) or 1.0
+
+    if candidates is None:
+        candidates = np.arange(len(features))
+    candidates = np.asarray(candidates, dtype=np.int64)
+    candidates = candidates[candidates != query_idx]
+
+    scores = np.empty(len(candidates))
+    for start in range(0, len(candidates), chunk_size):
+        rows = np.asarray(features[candidates[start:start + chunk_size]], dtype=np.float64)
+        row_norms = np.sqrt((rows * rows) @ weights)
+        row_norms[row_norms == 0] = 1.0
+        scores[start:start + chunk_size] = (rows @ weighted_query) / (row_norms * query_norm)
+
+    best = top_k_indices(scores, k)
+    return candidates[best], scores[best]
+
+
+# PENJELASAN SKOR KESAMAAN
+def similarity_contributions(query, rows, weights=None):
+    """
+    Kontribusi setiap atribut terhadap skor cosine (berbobot) untuk semua
+    hasil sekaligus: w * x * q / (|x|_w * |q|_w). Jumlah per baris sama
+    dengan skor kesamaannya. Mengembalikan matriks [k, n_fitur].
+    """
+    query = np.asarray(query, dtype=np.float64)
+    rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+    weights = np.ones(len(query)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    query_norm = np.sqrt((weights * query) @ query) or 1.0
+    row_norms = np.sqrt((rows * rows) @ weights)
+    row_norms[row_norms == 0] = 1.0
+    return rows * (weights * query) / (row_norms[:, None] * query_norm)
+
+
+def top_contributions(contributions, feature_names, n=3):
+    """
+    Nama dan nilai `n` atribut dengan kontribusi terbesar untuk setiap hasil.
+    """
+    n = min(n, contributions.shape[1])
+    top = np.argsort(-contributions, axis=1)[:, :n]
+    values = np.take_along_axis(contributions, top, axis=1)
+    names = np.asarray(feature_names)[top]
+    return [list(zip(row_names.tolist(), row_values.tolist())) for row_names, row_values in zip(names, values)]
@@ -0,0 +1,279 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from soccer.archetypes import ARCHETYPES_DIRNAME, ArchetypeIndex, build_archetypes
+from soccer.connection import database_signature
+from soccer.db import attribute_high_water_mark, ensure_latest_attributes_index, load_latest_player_attributes
+from soccer.features import NUMERIC_FEATURES, prepare_player_features
+from soccer.filters import FilterIndex
+from soccer.quantize import QuantizedMatrix
+from soccer.similarity import normalize_rows
+
+
+DEFAULT_DB_PATH = os.path.join("Data", "database.sqlite")
+DEFAULT_STORE_DIR = os.path.join("Data", "recommender_store")
+STORE_FORMAT_VERSION = 5
+
+# Matriks fitur disimpan sebagai float32 (setengah ukuran float64)
+FEATURE_DTYPE = np.float32
+
+# Kolom tabel lookup pemain yang disimpan bersama matriks fitur
+PLAYER_COLUMNS = ['player_api_id', 'player_name', 'full_name_and_id', 'overall_rating', 'potential', 'preferred_foot']
+
+# Jumlah versi lama yang tetap disimpan (bisa masih dipetakan oleh proses lain)
+KEEP_VERSIONS = 2
+
+
+# HASH DATABASE
+def hash_file(path, chunk_size=1 << 20):
+    """
+    Menghitung hash SHA-256 isi file secara bertahap.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_version(db_hash):
+    """
+    Versi artefak ditentukan oleh isi database, format store, dan daftar fitur.
+    """
+    payload = json.dumps([db_hash, STORE_FORMAT_VERSION, NUMERIC_FEATURES])
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+# FEATURE STORE
+class FeatureStore:
+    """
+    Artefak rekomendasi yang sudah dihitung: matriks fitur terstandardisasi,
+    matriks ternormalisasi (L2) beserta versi int8-nya, tabel lookup pemain,
+    statistik scaler, dan bitmap filter atribut.
+    Matriks dibuka sebagai memmap read-only sehingga dapat dibagi antar proses.
+    """
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+        self.version = manifest['version']
+        self.features = np.load(os.path.join(path, 'features.npy'), mmap_mode='r')
+        self.normalized = np.load(os.path.join(path, 'normalized.npy'), mmap_mode='r')
+        self.players = pd.read_pickle(os.path.join(path, 'players.pkl'))
+        with open(os.path.join(path, 'scaler.json')) as f:
+            self.scaler_stats = json.load(f)
+        with open(os.path.join(path, 'source.json')) as f:
+            self.source = json.load(f)
+        self.filters = FilterIndex.load(path)
+        self.quantized = QuantizedMatrix.load(path)
+        self.archetypes = ArchetypeIndex.load(os.path.join(path, ARCHETYPES_DIRNAME))
+        self._player_ids = self.players['player_api_id'].to_numpy()
+
+    def __len__(self):
+        return len(self.players)
+
+    @property
+    def feature_names(self):
+        return self.scaler_stats['features']
+
+    def index_of(self, player_api_id):
+        """
+        Mengembalikan posisi baris untuk player_api_id (tabel terurut berdasarkan id).
+        """
+        pos = int(np.searchsorted(self._player_ids, player_api_id))
+        if pos >= len(self._player_ids) or self._player_ids[pos] != player_api_id:
+            raise KeyError(player_api_id)
+        return pos
+
+    def indices_of(self, player_api_ids):
+        """
+        Versi vektor dari `index_of`. Mengembalikan (posisi, mask ditemukan).
+        """
+        player_api_ids = np.asarray(player_api_ids, dtype=self._player_ids.dtype)
+        positions = np.searchsorted(self._player_ids, player_api_ids)
+        positions = np.minimum(positions, len(self._player_ids) - 1)
+        found = self._player_ids[positions] == player_api_ids
+        return positions, found
+
+
+def read_manifest(store_dir):
+    """
+    Membaca manifest store, atau None jika belum ada / formatnya lama.
+    """
+    try:
+        with open(os.path.join(store_dir, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if manifest.get('format_version') != STORE_FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(store_dir, manifest):
+    """
+    Menulis manifest secara atomik agar pembaca tidak melihat file setengah jadi.
+    """
+    tmp_path = os.path.join(store_dir, f"manifest.json.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(store_dir, 'manifest.json'))
+
+
+def write_version(store_dir, version, players, features, scaler_stats, source, normalized=None, quantized=None,
+                  archetype_centroids=None, extra=None):
+    """
+    Menulis satu versi artefak ke folder sementara lalu me-rename-nya menjadi
+    `store_dir/<versi>/`, sehingga build bersamaan tetap aman. Centroid
+    arketipe dapat dipakai ulang dari versi sebelumnya. `extra` (opsional)
+    dipanggil dengan folder sementara untuk artefak tambahan.
+    """
+    version_dir = os.path.join(store_dir, version)
+    tmp_dir = os.path.join(store_dir, f".tmp-{version}-{os.getpid()}")
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    features = np.asarray(features, dtype=FEATURE_DTYPE)
+    if normalized is None:
+        normalized = normalize_rows(features, dtype=FEATURE_DTYPE)
+    if quantized is None:
+        quantized = QuantizedMatrix.build(normalized)
+    np.save(os.path.join(tmp_dir, 'features.npy'), features)
+    np.save(os.path.join(tmp_dir, 'normalized.npy'), normalized)
+    quantized.save(tmp_dir)
+    players = players[PLAYER_COLUMNS].reset_index(drop=True)
+    players.to_pickle(os.path.join(tmp_dir, 'players.pkl'))
+    FilterIndex.build(players).save(tmp_dir)
+    build_archetypes(os.path.join(tmp_dir, ARCHETYPES_DIRNAME), normalized, features, centroids=archetype_centroids)
+    with open(os.path.join(tmp_dir, 'scaler.json'), 'w') as f:
+        json.dump(scaler_stats, f)
+    with open(os.path.join(tmp_dir, 'source.json'), 'w') as f:
+        json.dump(source, f)
+    if extra is not None:
+        extra(tmp_dir)
+
+    try:
+        os.rename(tmp_dir, version_dir)
+    except OSError:
+        # Proses lain sudah menyelesaikan versi yang sama
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return version_dir
+
+
+def activate_version(store_dir, version, db_path, db_hash):
+    """
+    Menjadikan sebuah versi sebagai versi aktif (menulis manifest) dan
+    membersihkan versi lama.
+    """
+    mtime_ns, size = database_signature(db_path)
+    manifest = {
+        'format_version': STORE_FORMAT_VERSION,
+        'version': version,
+        'db_mtime_ns': mtime_ns,
+        'db_size': size,
+        'db_hash': db_hash,
+        'created_at': time.time(),
+    }
+    write_manifest(store_dir, manifest)
+    remove_old_versions(store_dir, keep=version)
+    return FeatureStore(os.path.join(store_dir, version), manifest)
+
+
+def build_feature_store(db_path=DEFAULT_DB_PATH, store_dir=DEFAULT_STORE_DIR, db_hash=None, force=False):
+    """
+    Menjalankan pipeline fitur lengkap sekali dan menyimpan hasilnya sebagai
+    artefak berversi di `store_dir/<versi>/`.
+    """
+    if db_hash is None:
+        db_hash = hash_file(db_path)
+    version = store_version(db_hash)
+    version_dir = os.path.join(store_dir, version)
+    if force:
+        shutil.rmtree(version_dir, ignore_errors=True)
+
+    if not os.path.isdir(version_dir):
+        # Penanda dibaca lebih dulu: baris yang masuk setelahnya diproses refresh berikutnya
+        high_water_mark = attribute_high_water_mark(db_path)
+        latest_player_df = load_latest_player_attributes(db_path)
+        combined_df, scaled_features, scaler = prepare_player_features(latest_player_df)
+
+        # Statistik berjalan (jumlah dan jumlah kuadrat) untuk refresh inkremental
+        raw = combined_df[NUMERIC_FEATURES].to_numpy(dtype=np.float64)
+        scaler_stats = {
+            'features': NUMERIC_FEATURES,
+            'mean': scaler.mean_.tolist(),
+            'scale': scaler.scale_.tolist(),
+            'medians': combined_df[NUMERIC_FEATURES].median().tolist(),
+            'running': {
+                'n': len(raw),
+                'sum': raw.sum(axis=0).tolist(),
+                'sumsq': (raw * raw).sum(axis=0).tolist(),
+            },
+        }
+        write_version(store_dir, version, combined_df, scaled_features, scaler_stats, {'high_water_mark': high_water_mark})
+
+    return activate_version(store_dir, version, db_path, db_hash)
+
+
+def remove_old_versions(store_dir, keep):
+    """
+    Menghapus folder versi lama, menyisakan beberapa versi terbaru karena
+    mungkin masih dipetakan oleh proses lain.
+    """
+    versions = [
+        entry for entry in os.scandir(store_dir)
+        if entry.is_dir() and not entry.name.startswith('.') and entry.name != keep
+    ]
+    versions.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in versions[KEEP_VERSIONS - 1:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def open_feature_store(db_path=DEFAULT_DB_PATH, store_dir=DEFAULT_STORE_DIR):
+    """
+    Membuka artefak yang masih valid untuk database saat ini. Jika mtime dan
+    ukuran file berubah, hash isi database dibandingkan; artefak hanya
+    dibangun ulang bila isinya benar-benar berubah.
+    """
+    manifest = read_manifest(store_dir)
+    if manifest is not None:
+        version_dir = os.path.join(store_dir, manifest['version'])
+        if os.path.isdir(version_dir):
+            mtime_ns, size = database_signature(db_path)
+            if (manifest['db_mtime_ns'], manifest['db_size']) == (mtime_ns, size):
+                return FeatureStore(version_dir, manifest)
+
+            db_hash = hash_file(db_path)
+            if db_hash == manifest['db_hash']:
+                manifest.update(db_mtime_ns=mtime_ns, db_size=size)
+                write_manifest(store_dir, manifest)
+                return FeatureStore(version_dir, manifest)
+            return build_feature_store(db_path, store_dir, db_hash=db_hash)
+    return build_feature_store(db_path, store_dir)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Membangun feature store sistem rekomendasi pemain.")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="Path database SQLite")
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help="Folder artefak")
+    parser.add_argument('--force', action='store_true', help="Bangun ulang walaupun artefak masih valid")
+    parser.add_argument(
+        '--create-index', action='store_true',
+        help="Buat indeks atribut terbaru di database sebelum build (mengubah file database)"
+    )
+    args = parser.parse_args()
+
+    if args.create_index:
+        ensure_latest_attributes_index(args.db)
+
+    if args.force:
+        store = build_feature_store(args.db, args.store, force=True)
+    else:
+        store = open_feature_store(args.db, args.store)
+    print(f"Feature store versi {store.version}: {len(store)} pemain di {store.path}")
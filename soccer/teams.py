@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+from soccer.connection import query_df, select_columns
+
+
+# Kolom tabel Match yang dibutuhkan analitik tim (tanpa kolom XML dan odds)
+MATCH_COLUMNS = [
+    'match_api_id', 'league_id', 'season', 'stage', 'date',
+    'home_team_api_id', 'away_team_api_id', 'home_team_goal', 'away_team_goal',
+]
+
+MATCH_DTYPES = {
+    'match_api_id': 'int64', 'league_id': 'int64', 'stage': 'int16',
+    'home_team_api_id': 'int64', 'away_team_api_id': 'int64',
+    'home_team_goal': 'int16', 'away_team_goal': 'int16',
+}
+
+# Batas menit untuk distribusi gol
+MINUTE_BINS = [0, 15, 30, 45, 60, 75, 90, 200]
+MINUTE_LABELS = ['0-15', '16-30', '31-45', '46-60', '61-75', '76-90', '90+']
+
+
+# MEMUAT DATA TIM DAN PERTANDINGAN
+def load_leagues(db_path):
+    """
+    Daftar liga beserta nama negaranya.
+    """
+    return query_df(
+        db_path,
+        "SELECT l.id AS league_id, l.name AS league_name, c.name AS country_name "
+        "FROM League AS l JOIN Country AS c ON c.id = l.country_id ORDER BY c.name",
+        dtypes={'league_id': 'int64'}
+    )
+
+
+def load_teams(db_path):
+    """
+    Tabel lookup tim (team_api_id -> nama).
+    """
+    return select_columns(
+        db_path, 'Team', ['team_api_id', 'team_long_name', 'team_short_name'],
+        dtypes={'team_api_id': 'int64'}
+    )
+
+
+def load_matches(db_path):
+    """
+    Hasil seluruh pertandingan, hanya kolom yang dibutuhkan.
+    """
+    matches = select_columns(db_path, 'Match', MATCH_COLUMNS, dtypes=MATCH_DTYPES, order_by=['date'])
+    matches['date'] = pd.to_datetime(matches['date'])
+    return matches
+
+
+# KLASEMEN DAN REKAP TIM
+def team_results(matches):
+    """
+    Mengubah tabel pertandingan menjadi dua baris per pertandingan (kandang dan
+    tandang) dari sudut pandang masing-masing tim.
+    """
+    home = pd.DataFrame({
+        'match_api_id': matches['match_api_id'], 'league_id': matches['league_id'],
+        'season': matches['season'], 'date': matches['date'],
+        'team_api_id': matches['home_team_api_id'], 'opponent_api_id': matches['away_team_api_id'],
+        'goals_for': matches['home_team_goal'], 'goals_against': matches['away_team_goal'],
+        'venue': 'home',
+    })
+    away = pd.DataFrame({
+        'match_api_id': matches['match_api_id'], 'league_id': matches['league_id'],
+        'season': matches['season'], 'date': matches['date'],
+        'team_api_id': matches['away_team_api_id'], 'opponent_api_id': matches['home_team_api_id'],
+        'goals_for': matches['away_team_goal'], 'goals_against': matches['home_team_goal'],
+        'venue': 'away',
+    })
+    results = pd.concat([home, away], ignore_index=True)
+    diff = results['goals_for'] - results['goals_against']
+    results['result'] = np.select([diff > 0, diff < 0], ['W', 'L'], 'D')
+    results['points'] = np.select([diff > 0, diff < 0], [3, 0], 1)
+    return results.sort_values(['date', 'match_api_id'], ignore_index=True)
+
+
+def league_table(results, league_id, season):
+    """
+    Klasemen satu liga pada satu musim, diurutkan seperti aturan liga
+    (poin, selisih gol, gol memasukkan).
+    """
+    subset = results[(results['league_id'] == league_id) & (results['season'] == season)]
+    table = subset.groupby('team_api_id').agg(
+        played=('match_api_id', 'size'),
+        won=('result', lambda r: int((r == 'W').sum())),
+        drawn=('result', lambda r: int((r == 'D').sum())),
+        lost=('result', lambda r: int((r == 'L').sum())),
+        goals_for=('goals_for', 'sum'),
+        goals_against=('goals_against', 'sum'),
+        points=('points', 'sum'),
+    )
+    table['goal_difference'] = table['goals_for'] - table['goals_against']
+    return table.sort_values(['points', 'goal_difference', 'goals_for'], ascending=False).reset_index()
+
+
+# STATISTIK DARI TABEL EVENT
+def team_event_summary(events, match_ids, team_api_id):
+    """
+    Statistik event tim pada sekumpulan pertandingan: tembakan tepat sasaran,
+    kartu kuning/merah, dan distribusi menit gol. Kartu kuning kedua (`y2`)
+    dihitung sebagai kartu merah saja, karena kuning pertamanya sudah
+    tercatat sebagai event `y` tersendiri.
+    `events` adalah DataFrame dari MatchEvents.to_frame().
+    """
+    events = events[events['match_api_id'].isin(match_ids)]
+    own = events[events['team_api_id'] == team_api_id]
+    cards = own[own['kind'] == 'card']
+
+    goals = own[(own['kind'] == 'goal') & (own['elapsed'] >= 0)]
+    goal_minutes = pd.cut(goals['elapsed'], MINUTE_BINS, labels=MINUTE_LABELS, include_lowest=True)
+    goals_by_minute = goal_minutes.value_counts().reindex(MINUTE_LABELS, fill_value=0)
+
+    return {
+        'shots_on_target': int((own['kind'] == 'shoton').sum()),
+        'yellow_cards': int((cards['detail'] == 'y').sum()),
+        'red_cards': int(cards['detail'].isin(['r', 'y2']).sum()),
+        'goals_by_minute': goals_by_minute,
+    }
+
+
+def match_possession(events):
+    """
+    Penguasaan bola akhir per pertandingan (catatan possession dengan menit
+    terbesar), kolom match_api_id, homepos, awaypos.
+    """
+    possession = events[(events['kind'] == 'possession') & (events['homepos'] >= 0)]
+    latest = possession.sort_values(['match_api_id', 'elapsed', 'elapsed_plus']).groupby('match_api_id').tail(1)
+    return latest[['match_api_id', 'homepos', 'awaypos']].reset_index(drop=True)
+
+
+def average_possession(results, possession):
+    """
+    Rata-rata penguasaan bola tim pada baris-baris `results` yang memiliki
+    data possession.
+    """
+    merged = results.merge(possession, on='match_api_id')
+    if merged.empty:
+        return None
+    team_possession = np.where(merged['venue'] == 'home', merged['homepos'], merged['awaypos'])
+    return float(np.mean(team_possession))
+
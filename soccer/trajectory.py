@@ -0,0 +1,235 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from soccer.history import load_or_build_point_in_time_index
+
+
+TRAJECTORY_DIRNAME = 'trajectories'
+
+# Jumlah snapshot terbaru yang disimpan per pemain
+MAX_LENGTH = 64
+
+# Lebar pita Sakoe-Chiba minimum (dalam jumlah snapshot)
+DEFAULT_WINDOW = 4
+
+# Jumlah kandidat yang dihitung DTW-nya sekaligus
+DTW_BATCH_SIZE = 32
+
+
+# BATAS BAWAH DTW
+def lb_kim(query, sequences, lengths):
+    """
+    Batas bawah LB_Kim: setiap jalur DTW selalu melewati pasangan titik awal
+    dan pasangan titik akhir, sehingga jumlah jarak keduanya tidak mungkin
+    melebihi DTW.
+    """
+    rows = np.arange(len(sequences))
+    first = ((sequences[:, 0] - query[0]) ** 2).sum(axis=1)
+    last = ((sequences[rows, lengths - 1] - query[-1]) ** 2).sum(axis=1)
+    single_cell = (lengths == 1) & (len(query) == 1)
+    return np.where(single_cell, first, first + last)
+
+
+def query_envelope(query, length, window):
+    """
+    Amplop atas/bawah query untuk kandidat sepanjang `length`: titik kandidat
+    ke-j hanya boleh dipasangkan dengan titik query dalam pita [j - w, j + w].
+    """
+    n = len(query)
+    upper = np.empty((length, query.shape[1]), dtype=query.dtype)
+    lower = np.empty_like(upper)
+    for j in range(length):
+        lo, hi = max(0, j - window), min(n - 1, j + window)
+        upper[j] = query[lo:hi + 1].max(axis=0)
+        lower[j] = query[lo:hi + 1].min(axis=0)
+    return upper, lower
+
+
+def band_width(query_length, lengths, window):
+    """
+    Lebar pita per kandidat; minimal selisih panjang agar titik akhir terjangkau.
+    """
+    return np.maximum(window, np.abs(lengths - query_length))
+
+
+def lb_keogh(query, sequences, lengths, window):
+    """
+    Batas bawah LB_Keogh: jarak setiap titik kandidat ke amplop query.
+    Kandidat dikelompokkan menurut panjangnya sehingga amplop cukup
+    dihitung sekali per panjang dan perhitungan tetap tervektorisasi.
+    """
+    bounds = np.zeros(len(sequences))
+    widths = band_width(len(query), lengths, window)
+    for length in np.unique(lengths):
+        members = np.flatnonzero(lengths == length)
+        upper, lower = query_envelope(query, int(length), int(widths[members[0]]))
+        segment = sequences[members, :length]
+        above = np.maximum(segment - upper, 0)
+        below = np.maximum(lower - segment, 0)
+        bounds[members] = (above ** 2 + below ** 2).sum(axis=(1, 2))
+    return bounds
+
+
+# DTW DENGAN EARLY ABANDONING
+def dtw_batch(query, sequences, lengths, window, threshold=np.inf):
+    """
+    DTW (jarak kuadrat Euclidean per titik) antara query dan sekumpulan
+    kandidat sekaligus, dengan pita Sakoe-Chiba. Setelah setiap baris
+    matriks DP, kandidat yang nilai minimum barisnya sudah melebihi
+    `threshold` dihentikan (early abandoning) dan diberi jarak inf.
+    """
+    n, max_length = len(query), int(lengths.max())
+    widths = band_width(n, lengths, window)
+    columns = np.arange(max_length)
+    result = np.full(len(sequences), np.inf)
+    alive = np.arange(len(sequences))
+
+    previous = None
+    for i in range(n):
+        cost = ((sequences[alive, :max_length] - query[i]) ** 2).sum(axis=2)
+        outside = (np.abs(columns - i) > widths[alive, None]) | (columns >= lengths[alive, None])
+        cost[outside] = np.inf
+
+        if previous is None:
+            current = np.cumsum(cost, axis=1)
+        else:
+            current = np.empty_like(cost)
+            current[:, 0] = cost[:, 0] + previous[:, 0]
+            for j in range(1, max_length):
+                best = np.minimum(np.minimum(previous[:, j], previous[:, j - 1]), current[:, j - 1])
+                current[:, j] = cost[:, j] + best
+
+        keep = current.min(axis=1) <= threshold
+        if not keep.all():
+            alive, current = alive[keep], current[keep]
+            if len(alive) == 0:
+                return result
+        previous = current
+
+    result[alive] = previous[np.arange(len(alive)), lengths[alive] - 1]
+    return result
+
+
+# INDEKS TRAJEKTORI RATING
+class TrajectoryIndex:
+    """
+    Trajektori overall_rating/potential setiap pemain dalam satu array
+    padded (pemain x snapshot x 2, int8) beserta panjang aslinya.
+    """
+
+    def __init__(self, path):
+        load = lambda name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+        self.path = path
+        self.sequences = load('sequences')
+        self.lengths = load('lengths')
+        self.player_ids = load('player_ids')
+        with open(os.path.join(path, 'trajectories.json')) as f:
+            self.meta = json.load(f)
+
+    def position_of(self, player_api_id):
+        pos = int(np.searchsorted(self.player_ids, player_api_id))
+        if pos >= len(self.player_ids) or self.player_ids[pos] != player_api_id:
+            raise KeyError(player_api_id)
+        return pos
+
+    def trajectory(self, player_api_id):
+        """
+        Trajektori satu pemain tanpa padding (snapshot x [overall, potential]).
+        """
+        pos = self.position_of(player_api_id)
+        return np.asarray(self.sequences[pos, :self.lengths[pos]])
+
+    def search(self, player_api_id, k=10, window=DEFAULT_WINDOW, batch_size=DTW_BATCH_SIZE):
+        """
+        Mencari k pemain dengan perkembangan rating paling mirip (DTW).
+        Kandidat diurutkan menurut batas bawah max(LB_Kim, LB_Keogh); DTW
+        hanya dihitung selama batas bawah kandidat berikutnya masih lebih
+        kecil dari jarak ke-k terbaik, dan dihentikan lebih awal jika
+        melebihinya. Mengembalikan (player_api_id, jarak, statistik).
+        """
+        query_pos = self.position_of(player_api_id)
+        sequences = np.asarray(self.sequences, dtype=np.float32)
+        lengths = np.asarray(self.lengths, dtype=np.int64)
+        query = sequences[query_pos, :lengths[query_pos]]
+
+        bounds = np.maximum(lb_kim(query, sequences, lengths), lb_keogh(query, sequences, lengths, window))
+        bounds[query_pos] = np.inf
+        order = np.argsort(bounds, kind='stable')
+        order = order[np.isfinite(bounds[order])]
+
+        best_rows = np.empty(0, dtype=np.int64)
+        best_distances = np.empty(0)
+        n_computed = n_abandoned = 0
+        for start in range(0, len(order), batch_size):
+            threshold = best_distances[-1] if len(best_distances) == k else np.inf
+            batch = order[start:start + batch_size]
+            batch = batch[bounds[batch] < threshold]
+            if len(batch) == 0:
+                break
+            distances = dtw_batch(query, sequences[batch], lengths[batch], window, threshold)
+            n_computed += len(batch)
+            n_abandoned += int(np.isinf(distances).sum())
+
+            rows = np.concatenate([best_rows, batch])
+            candidates = np.concatenate([best_distances, distances])
+            top = np.argsort(candidates, kind='stable')[:k]
+            top = top[np.isfinite(candidates[top])]
+            best_rows, best_distances = rows[top], candidates[top]
+
+        stats = {
+            'candidates': len(self.player_ids) - 1,
+            'dtw_computed': n_computed,
+            'dtw_abandoned': n_abandoned,
+            'pruned_by_lower_bound': len(self.player_ids) - 1 - n_computed,
+        }
+        return np.asarray(self.player_ids[best_rows]), np.sqrt(best_distances), stats
+
+
+def build_trajectory_index(history_index, path, max_length=MAX_LENGTH):
+    """
+    Menyusun array trajektori dari baris-baris indeks riwayat (sudah terurut
+    per pemain lalu tanggal). Snapshot tanpa rating dilewati dan hanya
+    `max_length` snapshot terbaru yang disimpan.
+    """
+    ratings = np.asarray(history_index.row_ratings)
+    player_ids = np.asarray(history_index.row_player_ids)
+    valid = (ratings > 0).all(axis=1)
+    ratings, player_ids = ratings[valid], player_ids[valid]
+
+    starts = np.flatnonzero(np.r_[True, player_ids[1:] != player_ids[:-1]])
+    ends = np.r_[starts[1:], len(player_ids)]
+    lengths = np.minimum(ends - starts, max_length)
+    sequences = np.zeros((len(starts), int(lengths.max()) if len(starts) else 0, 2), dtype=np.int8)
+    # Posisi dalam trajektori: jumlah snapshot dihitung mundur dari snapshot terakhir
+    offset_from_end = np.arange(len(player_ids)) - np.repeat(ends, ends - starts)
+    keep = offset_from_end >= -np.repeat(lengths, ends - starts)
+    group = np.repeat(np.arange(len(starts)), ends - starts)
+    positions = np.repeat(lengths, ends - starts) + offset_from_end
+    sequences[group[keep], positions[keep]] = ratings[keep]
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    np.save(os.path.join(tmp_path, 'sequences.npy'), sequences)
+    np.save(os.path.join(tmp_path, 'lengths.npy'), lengths.astype(np.int16))
+    np.save(os.path.join(tmp_path, 'player_ids.npy'), player_ids[starts].astype(np.int64))
+    with open(os.path.join(tmp_path, 'trajectories.json'), 'w') as f:
+        json.dump({'columns': ['overall_rating', 'potential'], 'max_length': max_length}, f)
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return TrajectoryIndex(path)
+
+
+def load_or_build_trajectory_index(db_path, store):
+    """
+    Memuat indeks trajektori dari folder versi store, atau membangunnya sekali
+    dari indeks riwayat.
+    """
+    path = os.path.join(store.path, TRAJECTORY_DIRNAME)
+    if os.path.isdir(path):
+        return TrajectoryIndex(path)
+    return build_trajectory_index(load_or_build_point_in_time_index(db_path, store), path)
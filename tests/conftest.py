@@ -0,0 +1,73 @@
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Tes dijalankan dari root repo tanpa instalasi paket
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# DATABASE PEMAIN SINTETIS
+def make_player_db(path, n_players=400, max_snapshots=4, seed=0):
+    """
+    Database SQLite kecil dengan tabel Player dan Player_Attributes
+    (beberapa snapshot per pemain, tanpa nilai hilang).
+    """
+    from soccer.db import ATTRIBUTE_COLUMNS
+
+    rng = np.random.default_rng(seed)
+    numeric = [col for col in ATTRIBUTE_COLUMNS if col != 'preferred_foot']
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Player (id INTEGER PRIMARY KEY, player_api_id INTEGER UNIQUE, player_name TEXT)")
+    conn.execute(
+        "CREATE TABLE Player_Attributes (id INTEGER PRIMARY KEY, player_api_id INTEGER, date TEXT, "
+        + ", ".join(f"{col} {'TEXT' if col == 'preferred_foot' else 'INTEGER'}" for col in ATTRIBUTE_COLUMNS) + ")"
+    )
+    conn.executemany(
+        "INSERT INTO Player VALUES (?, ?, ?)",
+        [(i + 1, 1000 + i, f"Player {i}") for i in range(n_players)]
+    )
+    rows = []
+    for i in range(n_players):
+        base = rng.integers(30, 90, len(numeric))
+        foot = 'left' if rng.random() < 0.3 else 'right'
+        for season in range(int(rng.integers(1, max_snapshots + 1))):
+            values = np.clip(base + rng.integers(-3, 4, len(numeric)), 1, 99)
+            rows.append((len(rows) + 1, 1000 + i, f"{2008 + season}-02-01 00:00:00", foot, *values.tolist()))
+    conn.executemany(f"INSERT INTO Player_Attributes VALUES ({', '.join('?' * (3 + len(ATTRIBUTE_COLUMNS)))})", rows)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def player_db(tmp_path):
+    return make_player_db(str(tmp_path / 'database.sqlite'))
+
+
+# PERTANDINGAN SINTETIS
+def make_matches(n_teams=12, n_rounds=40, seed=0):
+    """
+    Tabel pertandingan (kolom seperti teams.load_matches) dengan beberapa
+    pertandingan pada tanggal yang sama.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for round_no in range(n_rounds):
+        teams = rng.permutation(n_teams)
+        date = pd.Timestamp('2014-08-01') + pd.Timedelta(days=7 * round_no)
+        for home, away in zip(teams[::2], teams[1::2]):
+            rows.append({
+                'match_api_id': 100_000 + len(rows), 'date': date,
+                'home_team_api_id': 9000 + int(home), 'away_team_api_id': 9000 + int(away),
+                'home_team_goal': int(rng.poisson(1.5)), 'away_team_goal': int(rng.poisson(1.1)),
+            })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def matches():
+    return make_matches()
@@ -0,0 +1,98 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from soccer.elo import build_team_ratings, extend_team_ratings, load_or_update_team_ratings
+
+
+def insert_matches(path, matches):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS Match (id INTEGER PRIMARY KEY, league_id INTEGER, season TEXT, stage INTEGER, "
+        "date TEXT, match_api_id INTEGER UNIQUE, home_team_api_id INTEGER, away_team_api_id INTEGER, "
+        "home_team_goal INTEGER, away_team_goal INTEGER)"
+    )
+    conn.executemany(
+        "INSERT INTO Match (league_id, season, stage, date, match_api_id, home_team_api_id, away_team_api_id, "
+        "home_team_goal, away_team_goal) VALUES (1, '2014/2015', 1, ?, ?, ?, ?, ?, ?)",
+        [
+            (row.date.strftime('%Y-%m-%d %H:%M:%S'), row.match_api_id, row.home_team_api_id, row.away_team_api_id,
+             row.home_team_goal, row.away_team_goal)
+            for row in matches.itertuples()
+        ]
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def assert_same_ratings(actual, expected):
+    np.testing.assert_array_equal(np.asarray(actual.team_ids), np.asarray(expected.team_ids))
+    np.testing.assert_allclose(actual.final, expected.final, rtol=1e-12)
+    np.testing.assert_array_equal(np.asarray(actual.offsets), np.asarray(expected.offsets))
+    np.testing.assert_allclose(actual.ratings, expected.ratings, rtol=1e-6)
+    assert actual.meta == expected.meta
+    assert actual.version == expected.version
+
+
+@pytest.mark.parametrize('split_round', [1, 20, 39])
+def test_incremental_update_matches_full_recompute(matches, split_round):
+    cutoff = matches['date'].min() + pd.Timedelta(days=7 * split_round)
+    old = matches[matches['date'] < cutoff]
+    extended = extend_team_ratings(build_team_ratings(old), matches[matches['date'] >= cutoff])
+    assert_same_ratings(extended, build_team_ratings(matches))
+
+
+def test_extend_rejects_matches_before_last_processed_day(matches):
+    ratings = build_team_ratings(matches)
+    with pytest.raises(ValueError):
+        extend_team_ratings(ratings, matches.tail(3))
+
+
+def test_ratings_as_of_matches_per_team_lookup(matches):
+    ratings = build_team_ratings(matches)
+    team_ids = np.r_[np.asarray(ratings.team_ids), [1, 10**9]]
+    for date in ['2000-01-01', '2014-08-01', '2014-08-05', '2014-12-31', '2030-01-01']:
+        day = np.datetime64(pd.Timestamp(date).date(), 'D').astype(np.int64)
+        expected = []
+        for team_api_id in team_ids:
+            try:
+                history = ratings.series(team_api_id)
+            except KeyError:
+                expected.append(ratings.initial)
+                continue
+            played = history[history['date'].to_numpy().astype('datetime64[D]').astype(np.int64) <= day]
+            expected.append(played['elo'].iloc[-1] if len(played) else ratings.initial)
+        np.testing.assert_allclose(ratings.ratings_as_of(date, team_ids).to_numpy(), expected, rtol=1e-6)
+
+
+def test_saved_ratings_are_extended_with_new_matches(matches, tmp_path):
+    cutoff = matches['date'].min() + pd.Timedelta(days=7 * 30)
+    db_path = insert_matches(str(tmp_path / 'database.sqlite'), matches[matches['date'] < cutoff])
+    ratings_dir = str(tmp_path / 'ratings')
+    load_or_update_team_ratings(db_path, ratings_dir)
+
+    insert_matches(db_path, matches[matches['date'] >= cutoff])
+    updated = load_or_update_team_ratings(db_path, ratings_dir)
+    full_db = insert_matches(str(tmp_path / 'full.sqlite'), matches)
+    assert_same_ratings(updated, load_or_update_team_ratings(full_db, str(tmp_path / 'full_ratings')))
+
+
+def test_changed_score_triggers_full_recompute(matches, tmp_path):
+    db_path = insert_matches(str(tmp_path / 'database.sqlite'), matches)
+    ratings_dir = str(tmp_path / 'ratings')
+    before = load_or_update_team_ratings(db_path, ratings_dir)
+
+    first_match = int(matches['match_api_id'].iloc[0])
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE Match SET home_team_goal = home_team_goal + 3 WHERE match_api_id = ?", (first_match,))
+    conn.commit()
+    conn.close()
+
+    after = load_or_update_team_ratings(db_path, ratings_dir)
+    changed = matches.copy()
+    changed.loc[changed['match_api_id'] == first_match, 'home_team_goal'] += 3
+    assert after.version != before.version
+    assert_same_ratings(after, build_team_ratings(changed))
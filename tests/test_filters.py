@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from soccer.filters import FilterIndex
+
+
+@pytest.fixture(scope='module')
+def players():
+    rng = np.random.default_rng(0)
+    n = 1003
+    overall = rng.integers(35, 95, n)
+    return pd.DataFrame({
+        'overall_rating': overall,
+        'potential': np.clip(overall + rng.integers(-5, 15, n), 35, 99),
+        'preferred_foot': rng.choice(['left', 'right', None], n, p=[0.3, 0.65, 0.05]),
+    })
+
+
+def brute_force_mask(players, preferred_foot=None, min_overall=None, min_potential=None, potential_above_overall=False):
+    mask = np.ones(len(players), dtype=bool)
+    if preferred_foot is not None:
+        mask &= (players['preferred_foot'] == preferred_foot).to_numpy()
+    if min_overall:
+        mask &= (players['overall_rating'] >= min_overall).to_numpy()
+    if min_potential:
+        mask &= (players['potential'] >= min_potential).to_numpy()
+    if potential_above_overall:
+        mask &= (players['potential'] > players['overall_rating']).to_numpy()
+    return np.flatnonzero(mask)
+
+
+@pytest.mark.parametrize('filters', [
+    {'preferred_foot': 'left'},
+    {'preferred_foot': 'right', 'min_overall': 70},
+    {'min_overall': 73},
+    {'min_potential': 38},
+    {'min_overall': 81, 'min_potential': 86},
+    {'potential_above_overall': True},
+    {'preferred_foot': 'left', 'min_overall': 62, 'min_potential': 64, 'potential_above_overall': True},
+    {'min_overall': 99},
+])
+def test_candidates_match_brute_force_mask(players, filters):
+    index = FilterIndex.build(players)
+    np.testing.assert_array_equal(index.candidates(**filters), brute_force_mask(players, **filters))
+
+
+def test_no_active_filter_returns_none(players):
+    assert FilterIndex.build(players).candidates() is None
+
+
+def test_saved_index_gives_same_candidates(players, tmp_path):
+    FilterIndex.build(players).save(str(tmp_path))
+    loaded = FilterIndex.load(str(tmp_path))
+    filters = {'preferred_foot': 'right', 'min_overall': 67}
+    np.testing.assert_array_equal(loaded.candidates(**filters), brute_force_mask(players, **filters))
@@ -0,0 +1,37 @@
+import io
+import os
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+
+from ml_pipeline import incremental
+from ml_pipeline.incremental import is_holdout, train_incremental
+from ml_pipeline.ingest import ingest_csv
+
+
+CALIFORNIA_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'Data', 'california_dataset.csv')
+
+
+@pytest.fixture(scope='module')
+def california(tmp_path_factory):
+    with open(CALIFORNIA_CSV, 'rb') as f:
+        data = io.BytesIO(f.read())
+    return ingest_csv(data, 'house_price', 'Regresi', str(tmp_path_factory.mktemp('california')))
+
+
+@pytest.mark.parametrize('chunk_rows', [1_000, 100_000])
+def test_out_of_core_regression_close_to_in_memory_linear_model(california, chunk_rows, monkeypatch):
+    # Random forest pembanding tidak diuji di sini; sampel kecil agar tes cepat
+    monkeypatch.setattr(incremental, 'COMPARISON_SAMPLE_ROWS', 1_000)
+    _, report = train_incremental(california, chunk_rows=chunk_rows)
+
+    X = california.features().to_numpy(dtype=np.float64)
+    y = california.target().to_numpy(dtype=np.float64)
+    holdout = is_holdout(np.arange(california.n_rows))
+    in_memory = LinearRegression().fit(X[~holdout], y[~holdout])
+    in_memory_r2 = r2_score(y[holdout], in_memory.predict(X[holdout]))
+
+    assert report['n_holdout'] == int(holdout.sum())
+    assert report['holdout']['r2'] >= in_memory_r2 - 0.05
@@ -0,0 +1,74 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_pipeline.ingest import ingest_csv
+from ml_pipeline.preprocess import preprocess_dataset
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'Data')
+
+
+def synthetic_csv():
+    """
+    CSV dengan nilai hilang di kolom numerik dan kategorikal, target teks,
+    dan kolom yang baru berisi teks setelah sampel awal.
+    """
+    rng = np.random.default_rng(0)
+    n = 12_000
+    df = pd.DataFrame({
+        'amount': rng.gamma(2.0, 50.0, n),
+        'visits': rng.integers(0, 30, n).astype(float),
+        'plan': rng.choice(['basic', 'plus', 'pro'], n).astype(object),
+        'late_text': pd.Series([np.nan] * n, dtype=object),
+        'label': rng.choice(['no', 'yes'], n).astype(object),
+    })
+    df.loc[rng.random(n) < 0.05, 'amount'] = np.nan
+    df.loc[rng.random(n) < 0.05, 'plan'] = np.nan
+    df.loc[11_000:, 'late_text'] = 'promo'
+    return df.to_csv(index=False).encode()
+
+
+def read_bundled(name):
+    with open(os.path.join(DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('data, target_column, problem_type', [
+    (lambda: read_bundled('Telco_customer_churn.csv'), 'Churn Label', 'Klasifikasi'),
+    (lambda: read_bundled('california_dataset.csv'), 'house_price', 'Regresi'),
+    (synthetic_csv, 'label', 'Klasifikasi'),
+])
+def test_columnar_dataset_matches_preprocess_dataset(data, target_column, problem_type, tmp_path):
+    data = data()
+    dataset = ingest_csv(io.BytesIO(data), target_column, problem_type, str(tmp_path), chunk_rows=1_000)
+    X, y, label_encoders = dataset.to_training_data()
+    expected_X, expected_y, expected_encoders = preprocess_dataset(pd.read_csv(io.BytesIO(data)), target_column, problem_type)
+
+    assert list(X.columns) == list(expected_X.columns)
+    assert sorted(label_encoders) == sorted(expected_encoders)
+    for col, encoder in expected_encoders.items():
+        assert list(label_encoders[col].classes_) == [str(value) for value in encoder.classes_]
+    for col in expected_X.columns:
+        # Median kolom numerik diperkirakan dari sketsa kuantil
+        np.testing.assert_allclose(
+            X[col].to_numpy(np.float64), expected_X[col].to_numpy(np.float64), rtol=1e-2, atol=1e-4, err_msg=col
+        )
+    np.testing.assert_allclose(y.to_numpy(np.float64), expected_y.to_numpy(np.float64), rtol=1e-6)
+
+
+def test_text_after_sample_makes_column_categorical(tmp_path):
+    dataset = ingest_csv(io.BytesIO(synthetic_csv()), 'label', 'Klasifikasi', str(tmp_path), chunk_rows=1_000)
+    assert dataset.schema['late_text'] == 'category'
+    assert dataset.meta['reinferred_columns'] == ['late_text']
+    assert dataset.meta['vocabularies']['late_text'] == ['missing', 'promo']
+
+
+def test_text_regression_target_is_rejected(tmp_path):
+    df = pd.DataFrame({'x': np.arange(12_000, dtype=float), 'y': np.arange(12_000, dtype=float).astype(object)})
+    df.loc[11_500, 'y'] = 'unknown'
+    with pytest.raises(ValueError, match='harus numerik'):
+        ingest_csv(io.BytesIO(df.to_csv(index=False).encode()), 'y', 'Regresi', str(tmp_path), chunk_rows=1_000)
@@ -0,0 +1,81 @@
+import shutil
+import sqlite3
+
+import numpy as np
+import pytest
+
+from soccer.db import ATTRIBUTE_COLUMNS
+from soccer.refresh import refresh_feature_store
+from soccer.store import build_feature_store, open_feature_store
+
+
+def add_snapshots(db_path, player_api_ids, date='2017-03-01 00:00:00', seed=1):
+    """
+    Menambah satu snapshot atribut untuk setiap pemain; pemain yang belum
+    ada di tabel Player ikut ditambahkan.
+    """
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(db_path)
+    next_id = conn.execute("SELECT MAX(id) FROM Player_Attributes").fetchone()[0] + 1
+    for offset, player_api_id in enumerate(player_api_ids):
+        conn.execute("INSERT OR IGNORE INTO Player (player_api_id, player_name) VALUES (?, ?)", (player_api_id, f"New {player_api_id}"))
+        values = rng.integers(20, 99, len(ATTRIBUTE_COLUMNS) - 1).tolist()
+        conn.execute(
+            f"INSERT INTO Player_Attributes VALUES ({', '.join('?' * (3 + len(ATTRIBUTE_COLUMNS)))})",
+            (next_id + offset, player_api_id, date, 'left', *values)
+        )
+    conn.commit()
+    conn.close()
+
+
+def assert_same_store(refreshed, rebuilt, atol=1e-5):
+    np.testing.assert_array_equal(refreshed.players['player_api_id'].to_numpy(), rebuilt.players['player_api_id'].to_numpy())
+    assert (refreshed.players['full_name_and_id'] == rebuilt.players['full_name_and_id']).all()
+    np.testing.assert_allclose(refreshed.scaler_stats['mean'], rebuilt.scaler_stats['mean'], rtol=1e-9)
+    np.testing.assert_allclose(refreshed.scaler_stats['scale'], rebuilt.scaler_stats['scale'], rtol=1e-9)
+    np.testing.assert_allclose(refreshed.features, rebuilt.features, atol=atol)
+    np.testing.assert_allclose(refreshed.normalized, rebuilt.normalized, atol=atol)
+    np.testing.assert_array_equal(refreshed.filters.overall, rebuilt.filters.overall)
+
+
+@pytest.mark.parametrize('rescale_tolerance', [0.0, 1.0])
+def test_refresh_matches_full_rebuild(player_db, tmp_path, rescale_tolerance):
+    store_dir = str(tmp_path / 'store')
+    initial = open_feature_store(player_db, store_dir)
+    add_snapshots(player_db, [1000, 1010, 1200, 9000, 9001])
+
+    refreshed = refresh_feature_store(player_db, store_dir, rescale_tolerance=rescale_tolerance)
+    rebuilt = build_feature_store(player_db, str(tmp_path / 'rebuilt'))
+    assert len(refreshed) == len(initial) + 2
+
+    if rescale_tolerance == 0.0:
+        # Distandardisasi ulang: matriks identik dengan build penuh
+        assert_same_store(refreshed, rebuilt)
+    else:
+        # Skala lama dipakai ulang: nilai mentah tetap identik dengan build penuh
+        mean = np.asarray(refreshed.scaler_stats['mean'])
+        scale = np.asarray(refreshed.scaler_stats['scale'])
+        raw = np.asarray(refreshed.features, dtype=np.float64) * scale + mean
+        expected = np.asarray(rebuilt.features, dtype=np.float64) * np.asarray(rebuilt.scaler_stats['scale']) + rebuilt.scaler_stats['mean']
+        np.testing.assert_allclose(raw, expected, atol=1e-3)
+        running = refreshed.scaler_stats['running']
+        np.testing.assert_allclose(np.asarray(running['sum']) / running['n'], rebuilt.scaler_stats['mean'], rtol=1e-9)
+
+
+def test_refresh_rebuilds_when_old_rows_change(player_db, tmp_path):
+    store_dir = str(tmp_path / 'store')
+    open_feature_store(player_db, store_dir)
+    conn = sqlite3.connect(player_db)
+    conn.execute("UPDATE Player_Attributes SET overall_rating = overall_rating + 5 WHERE player_api_id = 1003")
+    conn.commit()
+    conn.close()
+
+    refreshed = refresh_feature_store(player_db, store_dir)
+    shutil.rmtree(tmp_path / 'rebuilt', ignore_errors=True)
+    assert_same_store(refreshed, build_feature_store(player_db, str(tmp_path / 'rebuilt')))
+
+
+def test_refresh_without_changes_keeps_version(player_db, tmp_path):
+    store_dir = str(tmp_path / 'store')
+    initial = open_feature_store(player_db, store_dir)
+    assert refresh_feature_store(player_db, store_dir).version == initial.version
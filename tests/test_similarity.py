@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from soccer.ann import IVFIndex
+from soccer.quantize import QuantizedMatrix, top_k_similar_quantized
+from soccer.similarity import (
+    normalize_rows, top_k_similar, top_k_similar_among, top_k_similar_batch, top_k_weighted_similar,
+)
+
+
+K = 10
+
+
+@pytest.fixture(scope='module')
+def normalized():
+    rng = np.random.default_rng(0)
+    return normalize_rows(rng.normal(size=(2000, 31)), dtype=np.float32)
+
+
+def exact_top_k(normalized, query_idx, k, candidates=None):
+    """
+    Pencarian brute-force: urutkan seluruh skor cosine kandidat.
+    """
+    if candidates is None:
+        candidates = np.arange(len(normalized))
+    candidates = candidates[candidates != query_idx]
+    scores = normalized[candidates].astype(np.float64) @ normalized[query_idx].astype(np.float64)
+    return candidates[np.argsort(-scores, kind='stable')[:k]]
+
+
+@pytest.mark.parametrize('query_idx', [0, 17, 1999])
+def test_top_k_similar_matches_exact(normalized, query_idx):
+    indices, scores = top_k_similar(normalized, query_idx, K)
+    np.testing.assert_array_equal(indices, exact_top_k(normalized, query_idx, K))
+    np.testing.assert_allclose(scores, normalized[indices] @ normalized[query_idx], rtol=1e-6)
+
+
+def test_top_k_similar_among_matches_exact(normalized):
+    candidates = np.arange(0, len(normalized), 3)
+    indices, _ = top_k_similar_among(normalized, 3, candidates, K)
+    np.testing.assert_array_equal(indices, exact_top_k(normalized, 3, K, candidates))
+
+
+def test_weighted_similarity_with_unit_weights_matches_exact(normalized):
+    indices, _ = top_k_weighted_similar(normalized, 5, np.ones(normalized.shape[1]), K)
+    np.testing.assert_array_equal(indices, exact_top_k(normalized, 5, K))
+
+
+def test_batch_matches_single_queries(normalized):
+    queries = np.array([0, 5, 17, 500, 1999])
+    # Blok kecil memaksa beberapa iterasi blok query
+    indices, scores = top_k_similar_batch(normalized, queries, K, max_block_bytes=2 * len(normalized) * 4)
+    assert indices.shape == scores.shape == (len(queries), K)
+    for row, query_idx in enumerate(queries):
+        np.testing.assert_array_equal(indices[row], exact_top_k(normalized, query_idx, K))
+        assert query_idx not in indices[row]
+
+
+def test_batch_without_other_rows_is_empty():
+    indices, scores = top_k_similar_batch(normalize_rows(np.ones((1, 3))), [0], K)
+    assert indices.shape == scores.shape == (1, 0)
+
+
+def test_int8_with_full_rerank_matches_exact(normalized):
+    quantized = QuantizedMatrix.build(normalized)
+    for query_idx in (0, 17, 1999):
+        indices, _ = top_k_similar_quantized(quantized, normalized, query_idx, K, rerank_factor=len(normalized))
+        np.testing.assert_array_equal(indices, exact_top_k(normalized, query_idx, K))
+
+
+def test_int8_default_rerank_has_high_recall(normalized):
+    quantized = QuantizedMatrix.build(normalized)
+    hits = 0
+    for query_idx in range(0, len(normalized), 100):
+        indices, _ = top_k_similar_quantized(quantized, normalized, query_idx, K)
+        assert query_idx not in indices
+        hits += len(np.intersect1d(indices, exact_top_k(normalized, query_idx, K)))
+    assert hits / (K * 20) >= 0.95
+
+
+def test_ivf_probing_all_lists_matches_exact(normalized):
+    index = IVFIndex.build(normalized, n_lists=16)
+    for query_idx in (0, 17, 1999):
+        indices, _ = index.search(normalized[query_idx], K, n_probe=index.n_lists, exclude=query_idx)
+        np.testing.assert_array_equal(indices, exact_top_k(normalized, query_idx, K))
+
+
+def test_ivf_lists_cover_every_row_once(normalized):
+    index = IVFIndex.build(normalized, n_lists=16)
+    np.testing.assert_array_equal(np.sort(index.ids), np.arange(len(normalized)))
+    np.testing.assert_array_equal(np.asarray(index.vectors)[np.argsort(index.ids)], normalized)
@@ -0,0 +1,91 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from soccer.trajectory import TrajectoryIndex, band_width, dtw_batch, lb_keogh, lb_kim
+
+
+WINDOW = 2
+
+
+@pytest.fixture(scope='module')
+def trajectories():
+    """
+    Trajektori acak (random walk) dengan panjang berbeda, padded nol
+    seperti di TrajectoryIndex.
+    """
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(1, 13, 300)
+    sequences = np.zeros((len(lengths), lengths.max(), 2), dtype=np.float32)
+    for i, length in enumerate(lengths):
+        start = rng.integers(45, 80, 2)
+        sequences[i, :length] = np.clip(start + np.cumsum(rng.integers(-3, 4, (length, 2)), axis=0), 1, 99)
+    return sequences, lengths.astype(np.int64)
+
+
+def naive_dtw(query, candidate, window):
+    """
+    DTW referensi dengan pita Sakoe-Chiba (lebar seperti band_width).
+    """
+    n, m = len(query), len(candidate)
+    w = int(band_width(n, np.array([m]), window)[0])
+    cost = np.full((n + 1, m + 1), np.inf)
+    cost[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(max(1, i - w), min(m, i + w) + 1):
+            distance = float(((query[i - 1] - candidate[j - 1]) ** 2).sum())
+            cost[i, j] = distance + min(cost[i - 1, j], cost[i, j - 1], cost[i - 1, j - 1])
+    return cost[n, m]
+
+
+def test_dtw_batch_matches_naive_dtw(trajectories):
+    sequences, lengths = trajectories
+    for query_pos in (0, 7, 42):
+        query = sequences[query_pos, :lengths[query_pos]]
+        distances = dtw_batch(query, sequences, lengths, WINDOW)
+        expected = [naive_dtw(query, sequences[i, :lengths[i]], WINDOW) for i in range(len(sequences))]
+        np.testing.assert_allclose(distances, expected, rtol=1e-5)
+
+
+def test_lower_bounds_never_exceed_dtw(trajectories):
+    sequences, lengths = trajectories
+    for query_pos in range(0, len(sequences), 10):
+        query = sequences[query_pos, :lengths[query_pos]]
+        distances = dtw_batch(query, sequences, lengths, WINDOW)
+        tolerance = 1e-4 * (1 + distances)
+        assert np.all(lb_kim(query, sequences, lengths) <= distances + tolerance)
+        assert np.all(lb_keogh(query, sequences, lengths, WINDOW) <= distances + tolerance)
+
+
+def test_early_abandoning_only_drops_candidates_above_threshold(trajectories):
+    sequences, lengths = trajectories
+    query = sequences[3, :lengths[3]]
+    exact = dtw_batch(query, sequences, lengths, WINDOW)
+    threshold = float(np.median(exact))
+    abandoned = dtw_batch(query, sequences, lengths, WINDOW, threshold)
+    kept = np.isfinite(abandoned)
+    np.testing.assert_allclose(abandoned[kept], exact[kept])
+    assert np.all(exact[~kept] > threshold)
+    assert np.all(kept[exact <= threshold])
+
+
+def test_search_matches_brute_force(trajectories, tmp_path):
+    sequences, lengths = trajectories
+    player_ids = np.arange(5000, 5000 + len(lengths), dtype=np.int64)
+    np.save(tmp_path / 'sequences.npy', sequences.astype(np.int8))
+    np.save(tmp_path / 'lengths.npy', lengths.astype(np.int16))
+    np.save(tmp_path / 'player_ids.npy', player_ids)
+    with open(os.path.join(tmp_path, 'trajectories.json'), 'w') as f:
+        json.dump({'columns': ['overall_rating', 'potential'], 'max_length': int(lengths.max())}, f)
+    index = TrajectoryIndex(str(tmp_path))
+
+    query_pos = 11
+    query = sequences[query_pos, :lengths[query_pos]]
+    exact = dtw_batch(query, sequences, lengths, WINDOW)
+    exact[query_pos] = np.inf
+    found_ids, found_distances, stats = index.search(player_ids[query_pos], k=5, window=WINDOW, batch_size=8)
+    np.testing.assert_allclose(found_distances, np.sqrt(np.sort(exact)[:5]), rtol=1e-5)
+    assert player_ids[query_pos] not in found_ids
+    assert stats['dtw_computed'] + stats['pruned_by_lower_bound'] == len(player_ids) - 1